@@ -0,0 +1,16 @@
+
+import asyncio
+
+
+async def get_prod_and_div(x, y):
+    await asyncio.sleep(0)
+    return {"prod": x * y, "div": x / y}
+
+
+async def get_sum(x, y):
+    await asyncio.sleep(0)
+    return x + y
+
+
+def get_square(x):
+    return x ** 2
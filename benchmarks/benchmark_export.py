@@ -0,0 +1,149 @@
+"""
+Export a synthetic workflow, which sums up pairs of numbers in a binary tree,
+through the write_workflow_json() function of each workflow engine:
+
+    python benchmarks/benchmark_export.py --nodes 50000 --engines jobflow pyiron_base
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from importlib import import_module
+
+
+def add(x, y):
+    return x + y
+
+
+def _get_tree(number_of_nodes: int, get_leaf, get_node) -> list:
+    # leaves add two distinct inputs, every other node adds two results
+    node_lst = [get_leaf(2 * i, 2 * i + 1) for i in range(number_of_nodes // 2 + 1)]
+    layer_lst = node_lst
+    while len(layer_lst) > 1:
+        layer_lst = [
+            (
+                get_node(layer_lst[i], layer_lst[i + 1])
+                if i + 1 < len(layer_lst)
+                else layer_lst[i]
+            )
+            for i in range(0, len(layer_lst), 2)
+        ]
+        node_lst += layer_lst
+    return node_lst
+
+
+def export_jobflow(number_of_nodes: int, file_name: str) -> float:
+    # the engines are optional, so each one is only imported when it is benchmarked
+    jobflow = import_module("jobflow")
+    write_workflow_json = import_module(
+        "python_workflow_definition.jobflow"
+    ).write_workflow_json
+
+    add_job = jobflow.job(add)
+    job_lst = list(
+        dict.fromkeys(
+            _get_tree(
+                number_of_nodes=number_of_nodes,
+                get_leaf=lambda x, y: add_job(x=x, y=y),
+                get_node=lambda a, b: add_job(x=a.output, y=b.output),
+            )
+        )
+    )
+    flow = jobflow.Flow(job_lst)
+    start = time.perf_counter()
+    write_workflow_json(flow=flow, file_name=file_name)
+    return time.perf_counter() - start
+
+
+def export_pyiron_base(number_of_nodes: int, file_name: str) -> float:
+    job = import_module("pyiron_base").job
+    write_workflow_json = import_module(
+        "python_workflow_definition.pyiron_base"
+    ).write_workflow_json
+
+    add_job = job(add)
+    node_lst = _get_tree(
+        number_of_nodes=number_of_nodes,
+        get_leaf=lambda x, y: add_job(x=x, y=y),
+        get_node=lambda a, b: add_job(x=a, y=b),
+    )
+    start = time.perf_counter()
+    write_workflow_json(delayed_object=node_lst[-1], file_name=file_name)
+    return time.perf_counter() - start
+
+
+def export_aiida(number_of_nodes: int, file_name: str) -> float:
+    aiida = import_module("aiida")
+    orm = import_module("aiida.orm")
+    WorkGraph = import_module("aiida_workgraph").WorkGraph
+    write_workflow_json = import_module(
+        "python_workflow_definition.aiida"
+    ).write_workflow_json
+
+    aiida.load_profile()
+    wg = WorkGraph("benchmark")
+    _get_tree(
+        number_of_nodes=number_of_nodes,
+        get_leaf=lambda x, y: wg.add_task(add, x=orm.Int(x), y=orm.Int(y)),
+        get_node=lambda a, b: wg.add_task(add, x=a.outputs.result, y=b.outputs.result),
+    )
+    start = time.perf_counter()
+    write_workflow_json(wg=wg, file_name=file_name)
+    return time.perf_counter() - start
+
+
+def export_pyiron_workflow(number_of_nodes: int, file_name: str) -> float:
+    legacy = import_module("pyiron_workflow._legacy")
+    Workflow, to_function_node = legacy.Workflow, legacy.to_function_node
+    write_workflow_json = import_module(
+        "python_workflow_definition.pyiron_workflow"
+    ).write_workflow_json
+
+    add_node = to_function_node("add", add, "add")
+    wf = Workflow("benchmark")
+    counter_lst = [0]
+
+    def get_node(x, y):
+        counter_lst[0] += 1
+        node = add_node(x=x, y=y)
+        wf.add_child(child=node, label="add_" + str(counter_lst[0]))
+        return node
+
+    _get_tree(number_of_nodes=number_of_nodes, get_leaf=get_node, get_node=get_node)
+    start = time.perf_counter()
+    write_workflow_json(graph_as_dict=wf.graph_as_dict, file_name=file_name)
+    return time.perf_counter() - start
+
+
+EXPORT_FUNCTION_DICT = {
+    "jobflow": export_jobflow,
+    "pyiron_base": export_pyiron_base,
+    "aiida": export_aiida,
+    "pyiron_workflow": export_pyiron_workflow,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=50000)
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        choices=list(EXPORT_FUNCTION_DICT.keys()),
+        default=list(EXPORT_FUNCTION_DICT.keys()),
+    )
+    args = parser.parse_args()
+
+    print(f"function nodes:    {args.nodes}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        for engine in args.engines:
+            run_time = EXPORT_FUNCTION_DICT[engine](
+                number_of_nodes=args.nodes, file_name=engine + ".json"
+            )
+            print(f"{engine + ':':18} {run_time:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Compare loading a large synthetic workflow with the pydantic models, with the fast
+path which skips the models and with the streaming parser:
+
+    python benchmarks/benchmark_load_json.py --edges 100000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import timeit
+import tracemalloc
+
+from python_workflow_definition.models import PythonWorkflowDefinitionWorkflow
+
+
+def get_synthetic_workflow(number_of_edges: int) -> dict:
+    # every function node sums the results of the two previous function nodes
+    nodes_lst = [
+        {"id": 0, "type": "input", "name": "x", "value": 1},
+        {"id": 1, "type": "input", "name": "y", "value": 2},
+    ]
+    edges_lst = []
+    while len(edges_lst) < number_of_edges - 1:
+        target = len(nodes_lst)
+        nodes_lst.append({"id": target, "type": "function", "value": "operator.add"})
+        edges_lst.append(
+            {
+                "target": target,
+                "targetPort": "a",
+                "source": target - 2,
+                "sourcePort": None,
+            }
+        )
+        edges_lst.append(
+            {
+                "target": target,
+                "targetPort": "b",
+                "source": target - 1,
+                "sourcePort": None,
+            }
+        )
+    nodes_lst.append({"id": len(nodes_lst), "type": "output", "name": "result"})
+    edges_lst.append(
+        {
+            "target": len(nodes_lst) - 1,
+            "targetPort": None,
+            "source": len(nodes_lst) - 2,
+            "sourcePort": None,
+        }
+    )
+    return {"version": "0.1.0", "nodes": nodes_lst, "edges": edges_lst}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--edges", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_name = os.path.join(tmp_dir, "workflow.json")
+        with open(file_name, "w") as f:
+            json.dump(get_synthetic_workflow(number_of_edges=args.edges), f)
+
+        print(f"edges:             {args.edges}")
+        for label, kwargs in [
+            ("model_dump()", {}),
+            ("fast=True", {"fast": True}),
+            ("stream=True", {"stream": True}),
+        ]:
+            run_time = min(
+                timeit.repeat(
+                    lambda kwargs=kwargs: PythonWorkflowDefinitionWorkflow.load_json_file(
+                        file_name, **kwargs
+                    ),
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+            tracemalloc.start()
+            PythonWorkflowDefinitionWorkflow.load_json_file(file_name, **kwargs)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(
+                f"{label + ':':18} {run_time:.3f} s, peak {peak_memory / 2**20:.0f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
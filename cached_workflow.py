@@ -0,0 +1,22 @@
+
+import os
+
+
+def _log(name):
+    with open("calls.txt", "a") as f:
+        f.write(name + "\n")
+
+
+def get_prod_and_div(x, y):
+    _log("get_prod_and_div")
+    return {"prod": x * y, "div": x / y}
+
+
+def get_sum(x, y):
+    _log("get_sum")
+    return x + y
+
+
+def get_square(x):
+    _log("get_square")
+    return x ** 2
@@ -0,0 +1,7 @@
+
+def get_prod_and_div(x, y):
+    return {"prod": x * y, "div": x / y}
+
+
+def get_total(data):
+    return sum(data["values"]) + data["offset"]
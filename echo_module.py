@@ -0,0 +1,3 @@
+
+def echo(filename):
+    return filename
@@ -1,6 +1,5 @@
 import traceback
 from dataclasses import replace
-from importlib import import_module
 from typing import Any
 
 from aiida import orm
@@ -20,6 +19,9 @@ from python_workflow_definition.shared import (
     VERSION_LABEL,
     VERSION_NUMBER,
     convert_nodes_list_to_dict,
+    get_function,
+    get_value_hash,
+    import_modules,
     set_result_node,
     update_node_names,
 )
@@ -32,6 +34,7 @@ def load_workflow_json(file_name: str) -> WorkGraph:
     wg = WorkGraph()
     task_name_mapping = {}
 
+    import_modules(nodes_list=data[NODES_LABEL])
     nodes_types_dict = {int(n["id"]): n["type"] for n in data[NODES_LABEL]}
     for id, identifier in convert_nodes_list_to_dict(
         nodes_list=data[NODES_LABEL]
@@ -41,9 +44,7 @@ def load_workflow_json(file_name: str) -> WorkGraph:
             and isinstance(identifier, str)
             and "." in identifier
         ):
-            p, m = identifier.rsplit(".", 1)
-            mod = import_module(p)
-            func = getattr(mod, m)
+            func = get_function(function_path=identifier)
             decorated_func = task(outputs=namespace())(func)
             new_task = wg.add_task(decorated_func)
             new_task.spec = replace(new_task.spec, schema_source=SchemaSource.EMBEDDED)
@@ -95,6 +96,7 @@ def write_workflow_json(wg: WorkGraph, file_name: str) -> None:
     data: dict[str, Any] = {NODES_LABEL: [], EDGES_LABEL: []}
     node_name_mapping = {}
     data_node_name_mapping = {}
+    intern_dict: dict[bytes, int] = {}
     i = 0
     GRAPH_LEVEL_NAMES = ["graph_inputs", "graph_outputs", "graph_ctx"]
 
@@ -136,12 +138,16 @@ def write_workflow_json(wg: WorkGraph, file_name: str) -> None:
                         raw_value.pop("node_type", None)
                     else:
                         raw_value = input.value.value
-                    data[NODES_LABEL].append(
-                        {"id": i, "type": "input", "value": raw_value}
-                    )
-                    input_node_name = i
+                    # data nodes with the same value share one input node
+                    value_hash = get_value_hash(raw_value)
+                    if value_hash not in intern_dict:
+                        data[NODES_LABEL].append(
+                            {"id": i, "type": "input", "value": raw_value}
+                        )
+                        intern_dict[value_hash] = i
+                        i += 1
+                    input_node_name = intern_dict[value_hash]
                     data_node_name_mapping[input.value.uuid] = input_node_name
-                    i += 1
                 else:
                     input_node_name = data_node_name_mapping[input.value.uuid]
                 data[EDGES_LABEL].append(
@@ -0,0 +1,143 @@
+import asyncio
+from collections.abc import Coroutine
+from concurrent.futures import Executor
+from functools import partial
+from inspect import iscoroutinefunction, isfunction
+from typing import Any
+
+from python_workflow_definition.models import PythonWorkflowDefinitionWorkflow
+from python_workflow_definition.shared import (
+    FUNCTION_LABEL,
+    KWARGS_LABEL,
+    NODES_LABEL,
+    SOURCE_LABEL,
+    SOURCE_PORT_LABEL,
+    WorkflowGraph,
+    convert_nodes_list_to_dict,
+    get_container_nodes,
+    get_function,
+    get_output_link,
+    import_modules,
+    inline_container_nodes,
+    remove_result,
+    topological_sort,
+)
+
+
+async def _get_value(task_dict: dict, nodes_new_dict: dict, link_dict: dict):
+    source, source_handle = link_dict[SOURCE_LABEL], link_dict[SOURCE_PORT_LABEL]
+    if source in task_dict:
+        result = await task_dict[source]
+    elif source in nodes_new_dict:
+        result = nodes_new_dict[source]
+    else:
+        raise KeyError()
+    if source_handle is None:
+        return result
+    else:
+        return result[source_handle]
+
+
+async def _resolve_link(task_dict: dict, nodes_new_dict: dict, link_dict: dict):
+    if KWARGS_LABEL in link_dict:
+        return link_dict[FUNCTION_LABEL](
+            **{
+                k: await _resolve_link(
+                    task_dict=task_dict, nodes_new_dict=nodes_new_dict, link_dict=v
+                )
+                for k, v in link_dict[KWARGS_LABEL].items()
+            }
+        )
+    else:
+        return await _get_value(
+            task_dict=task_dict, nodes_new_dict=nodes_new_dict, link_dict=link_dict
+        )
+
+
+async def _get_kwargs(task_dict: dict, nodes_new_dict: dict, link_dict: dict) -> dict:
+    return {
+        k: await _resolve_link(
+            task_dict=task_dict, nodes_new_dict=nodes_new_dict, link_dict=v
+        )
+        for k, v in link_dict.items()
+    }
+
+
+async def _run_node(
+    node,
+    kwargs: Coroutine[Any, Any, dict],
+    semaphore: asyncio.Semaphore,
+    exe: Executor | None,
+):
+    kwargs_dict = await kwargs
+    async with semaphore:
+        if iscoroutinefunction(node):
+            return await node(**kwargs_dict)
+        else:
+            return await asyncio.get_running_loop().run_in_executor(
+                exe, partial(node, **kwargs_dict)
+            )
+
+
+async def load_workflow_json(
+    file_name: str,
+    max_concurrency: int = 100,
+    exe: Executor | None = None,
+    inline_containers: bool = False,
+):
+    """
+    Execute a workflow as asyncio task graph, each node starts as soon as its inputs
+    are available.
+
+    Args:
+        file_name: Path to the workflow JSON file.
+        max_concurrency: Maximum number of nodes which are executed at the same time.
+        exe: Executor for functions which are not coroutine functions, the default
+             executor of the event loop is used if None.
+        inline_containers: Fold get_dict() and get_list() nodes into the arguments of
+                           the nodes which consume them instead of creating tasks.
+
+    Returns:
+        The result connected to the output node of the workflow.
+    """
+    workflow_dict = PythonWorkflowDefinitionWorkflow.load_json_file(file_name=file_name)
+    output_link = get_output_link(workflow_dict=workflow_dict)
+    content = remove_result(workflow_dict=workflow_dict)
+
+    nodes_new_dict = {}
+    import_modules(nodes_list=content[NODES_LABEL])
+    nodes_types_dict = {int(n["id"]): n["type"] for n in content[NODES_LABEL]}
+    for k, v in convert_nodes_list_to_dict(nodes_list=content[NODES_LABEL]).items():
+        if nodes_types_dict[int(k)] == "function" and isinstance(v, str) and "." in v:
+            nodes_new_dict[int(k)] = get_function(function_path=v)
+        else:
+            nodes_new_dict[int(k)] = v
+
+    total_dict = WorkflowGraph(workflow_dict=content).get_total_dict()
+    if inline_containers:
+        total_dict = inline_container_nodes(
+            total_dict=total_dict,
+            container_dict=get_container_nodes(nodes_list=content[NODES_LABEL]),
+        )
+    semaphore = asyncio.Semaphore(max_concurrency)
+    task_dict: dict[Any, asyncio.Task] = {}
+    for ind in topological_sort(total_dict=total_dict, nodes_dict=nodes_new_dict):
+        node = nodes_new_dict[ind]
+        if isfunction(node):
+            task_dict[ind] = asyncio.create_task(
+                _run_node(
+                    node=node,
+                    kwargs=_get_kwargs(
+                        task_dict=task_dict,
+                        nodes_new_dict=nodes_new_dict,
+                        link_dict=total_dict[ind],
+                    ),
+                    semaphore=semaphore,
+                    exe=exe,
+                )
+            )
+
+    await asyncio.gather(*task_dict.values())
+    return await _get_value(
+        task_dict=task_dict, nodes_new_dict=nodes_new_dict, link_dict=output_link
+    )
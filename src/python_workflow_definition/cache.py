@@ -0,0 +1,168 @@
+import contextlib
+import hashlib
+import marshal
+import os
+import pickle
+from functools import cache
+from inspect import getsource
+from pathlib import Path
+from typing import Any
+
+from python_workflow_definition.shared import (
+    FUNCTION_LABEL,
+    KWARGS_LABEL,
+    SOURCE_LABEL,
+    SOURCE_PORT_LABEL,
+    get_value_hash,
+)
+
+
+@cache
+def get_function_hash(function) -> str:
+    """
+    Hash the dotted path and the implementation of a python function.
+
+    Args:
+        function: Python function of a function node.
+
+    Returns:
+        Hexadecimal SHA-256 digest of the dotted path and the source code, the
+        bytecode is used when the source code is not available.
+    """
+    try:
+        implementation = getsource(function).encode("utf-8")
+    except (OSError, TypeError):
+        implementation = marshal.dumps(function.__code__)
+    hash_obj = hashlib.sha256()
+    hash_obj.update((function.__module__ + "." + function.__qualname__).encode("utf-8"))
+    hash_obj.update(implementation)
+    return hash_obj.hexdigest()
+
+
+def _get_link_hash(link_dict: dict, hash_dict: dict) -> list:
+    if KWARGS_LABEL in link_dict:
+        return [
+            get_function_hash(function=link_dict[FUNCTION_LABEL]),
+            {
+                k: _get_link_hash(link_dict=v, hash_dict=hash_dict)
+                for k, v in link_dict[KWARGS_LABEL].items()
+            },
+        ]
+    else:
+        return [hash_dict[link_dict[SOURCE_LABEL]], link_dict[SOURCE_PORT_LABEL]]
+
+
+def get_node_hash(function, link_dict: dict, hash_dict: dict) -> str:
+    """
+    Hash a function node based on its function and the hashes of its inputs.
+
+    Args:
+        function: Python function of the function node.
+        link_dict: Keyword arguments of the function node as returned by get_kwargs().
+        hash_dict: Hashes of the source nodes.
+
+    Returns:
+        Hexadecimal SHA-256 digest which is used as cache key.
+    """
+    return get_value_hash(
+        {
+            "function": get_function_hash(function=function),
+            "inputs": {
+                k: _get_link_hash(link_dict=v, hash_dict=hash_dict)
+                for k, v in link_dict.items()
+            },
+        }
+    ).hex()
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache for the results of function nodes.
+
+    Results are stored as pickle files named by their cache key. When the total size
+    of the cache exceeds max_size, the least recently used results are removed.
+    """
+
+    def __init__(self, directory: str | Path = "cache", max_size: int | None = None):
+        """
+        Args:
+            directory: Directory to store the cached results in.
+            max_size: Maximum size of the cache in bytes, None for no limit.
+        """
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        # upper bound of the size of the cache, the directory is only scanned when
+        # it exceeds max_size
+        self._total_size: int | None = None
+
+    def _get_file_name(self, key: str) -> Path:
+        return self._directory / (key + ".pickle")
+
+    def __contains__(self, key: str) -> bool:
+        return self._get_file_name(key=key).exists()
+
+    def load(self, key: str) -> Any:
+        """
+        Load a cached result and mark it as recently used. A file which is removed
+        or not completely written by another process is treated as a miss.
+
+        Raises:
+            KeyError: If no result is cached for the key.
+        """
+        file_name = self._get_file_name(key=key)
+        try:
+            with open(file_name, "rb") as f:
+                value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            raise KeyError(key) from None
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(file_name)
+        return value
+
+    def store(self, key: str, value: Any) -> None:
+        """
+        Store a result and evict the least recently used results if the cache is
+        larger than max_size.
+        """
+        file_name = self._get_file_name(key=key)
+        tmp_file_name = file_name.with_suffix(".tmp" + str(os.getpid()))
+        with open(tmp_file_name, "wb") as f:
+            pickle.dump(value, f)
+            file_size = f.tell()
+        os.replace(tmp_file_name, file_name)
+        if self._max_size is not None:
+            if self._total_size is None:
+                self._total_size = sum(size for _, size, _ in self._get_entry_lst())
+            else:
+                self._total_size += file_size
+            if self._total_size > self._max_size:
+                self._total_size = self._evict()
+
+    def invalidate(self, key: str | None = None) -> None:
+        """
+        Remove a single result or, if no key is given, all results from the cache.
+        """
+        if key is None:
+            for file_name in self._directory.glob("*.pickle"):
+                file_name.unlink(missing_ok=True)
+        else:
+            self._get_file_name(key=key).unlink(missing_ok=True)
+
+    def _get_entry_lst(self) -> list:
+        entry_lst = []
+        for file_name in self._directory.glob("*.pickle"):
+            with contextlib.suppress(FileNotFoundError):
+                stat = file_name.stat()
+                entry_lst.append((stat.st_mtime, stat.st_size, file_name))
+        return entry_lst
+
+    def _evict(self) -> int:
+        entry_lst = self._get_entry_lst()
+        total_size = sum(size for _, size, _ in entry_lst)
+        for _, size, file_name in sorted(entry_lst, key=lambda x: x[0]):
+            if self._max_size is None or total_size <= self._max_size:
+                break
+            file_name.unlink(missing_ok=True)
+            total_size -= size
+        return total_size
@@ -1,21 +1,29 @@
+import filecmp
 import json
-import pickle
+import os
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
 from pathlib import Path
 from typing import Any
 
 from yaml import CDumper as Dumper
 from yaml import dump
 
-from python_workflow_definition.purepython import group_edges, resort_total_lst
+from python_workflow_definition.cwl.serializer import (
+    DEFAULT_SERIALIZER,
+    dump_value,
+    get_serializer_extension,
+    get_serializer_reference,
+)
 from python_workflow_definition.shared import (
-    EDGES_LABEL,
     NODES_LABEL,
     SOURCE_LABEL,
     SOURCE_PORT_LABEL,
-    TARGET_LABEL,
     TARGET_PORT_LABEL,
+    WorkflowGraph,
     convert_nodes_list_to_dict,
     remove_result,
+    topological_sort,
 )
 
 
@@ -41,47 +49,272 @@ def _get_function_template(function_name: str) -> dict:
     }
 
 
-def _get_output_name(output_name: str) -> dict:
+def _get_chain_template(chain_lst: list) -> dict:
+    return {
+        "chain": {
+            "default": json.dumps(chain_lst),
+            "inputBinding": {"position": 3, "prefix": "--chain=", "separate": False},
+            "type": "string",
+        },
+    }
+
+
+def _get_serializer_template(serializer_dict: dict) -> dict:
+    return {
+        "serializer": {
+            "default": json.dumps(serializer_dict),
+            "inputBinding": {
+                "position": 3,
+                "prefix": "--serializer=",
+                "separate": False,
+            },
+            "type": "string",
+        },
+    }
+
+
+def _get_serializer_import_template(reference_dict: dict) -> dict:
+    return {
+        "serializer_import": {
+            "default": json.dumps(reference_dict),
+            "inputBinding": {
+                "position": 3,
+                "prefix": "--serializer-import=",
+                "separate": False,
+            },
+            "type": "string",
+        },
+    }
+
+
+def _get_output_name(output_name: str, serializer: str = DEFAULT_SERIALIZER) -> dict:
     output_dict = {
         "type": "File",
-        "outputBinding": {"glob": output_name + ".pickle"},
+        "outputBinding": {
+            "glob": output_name + get_serializer_extension(name=serializer)
+        },
     }
     return {output_name + "_file": output_dict}
 
 
-def _get_function(workflow):
+def _get_function(workflow, graph: WorkflowGraph):
     function_nodes_dict = {
         n["id"]: n["value"] for n in workflow[NODES_LABEL] if n["type"] == "function"
     }
     funct_dict = {}
     for funct_id in function_nodes_dict:
-        target_ports = list(
-            {
-                e[TARGET_PORT_LABEL]
-                for e in workflow[EDGES_LABEL]
-                if e["target"] == funct_id
-            }
-        )
-        source_ports = list(
-            {
-                e[SOURCE_PORT_LABEL]
-                for e in workflow[EDGES_LABEL]
-                if e["source"] == funct_id
-            }
-        )
         funct_dict[funct_id] = {
-            "targetPorts": target_ports,
-            "sourcePorts": source_ports,
+            "targetPorts": graph.get_target_ports(funct_id),
+            "sourcePorts": graph.get_source_ports(funct_id),
         }
     return function_nodes_dict, funct_dict
 
 
-def _write_function_cwl(workflow, directory_path: str = "."):
-    function_nodes_dict, funct_dict = _get_function(workflow)
+def _get_user_module(function_name: str) -> set:
+    module_name = function_name.split(".", maxsplit=1)[0]
+    return set() if module_name == "python_workflow_definition" else {module_name}
+
+
+def _get_chain_lst(
+    workflow, fuse: bool = False, graph: WorkflowGraph | None = None
+) -> list:
+    """
+    Group the function nodes in linear chains, in which every node is the only
+    function feeding the next node and the next node is its only consumer.
+
+    Args:
+        workflow (dict): Workflow dictionary.
+        fuse (bool): Group the function nodes in chains, otherwise every function
+                     node forms a chain of its own.
+        graph (WorkflowGraph): Index of the workflow, which is built if not given.
+
+    Returns:
+        list: List of chains, each chain is a list of node ids in execution order.
+    """
+    function_nodes_dict = {
+        n["id"]: n["value"] for n in workflow[NODES_LABEL] if n["type"] == "function"
+    }
+    if not fuse:
+        return [[i] for i in function_nodes_dict]
+    if graph is None:
+        graph = WorkflowGraph(workflow_dict=workflow)
+    next_dict = {}
+    for i in function_nodes_dict:
+        successor_lst = graph.get_successors(i)
+        if (
+            len(successor_lst) == 1
+            and successor_lst[0] in function_nodes_dict
+            and [
+                j
+                for j in graph.get_predecessors(successor_lst[0])
+                if j in function_nodes_dict
+            ]
+            == [i]
+        ):
+            next_dict[i] = successor_lst[0]
+    fused_set = set(next_dict.values())
+    chain_lst = []
+    for i, function_name in function_nodes_dict.items():
+        if i in fused_set:
+            continue
+        chain = [i]
+        module_set = _get_user_module(function_name=function_name)
+        while chain[-1] in next_dict:
+            j = next_dict[chain[-1]]
+            module_set_new = module_set | _get_user_module(
+                function_name=function_nodes_dict[j]
+            )
+            # each step loads a single workflow module
+            if len(module_set_new) > 1:
+                chain_lst.append(chain)
+                chain = [j]
+                module_set = _get_user_module(function_name=function_nodes_dict[j])
+            else:
+                chain.append(j)
+                module_set = module_set_new
+        chain_lst.append(chain)
+    return chain_lst
+
+
+def _get_argument_name(port, node_id: int, chain: list) -> str:
+    if len(chain) == 1:
+        return str(port)
+    else:
+        return str(port) + "_" + str(node_id)
+
+
+def _get_external_edges(graph: WorkflowGraph, chain: list) -> list:
+    return [
+        [k, e]
+        for k in chain
+        for e in graph.get_in_edges(k)
+        if e[SOURCE_LABEL] not in chain
+    ]
+
+
+def _get_chain_spec(graph: WorkflowGraph, chain: list, function_nodes_dict: dict):
+    chain_spec_lst = []
+    for k in chain:
+        kwargs = {}
+        for e in graph.get_in_edges(k):
+            if e[SOURCE_LABEL] in chain:
+                kwargs[e[TARGET_PORT_LABEL]] = {
+                    "step": chain.index(e[SOURCE_LABEL]),
+                    "port": e[SOURCE_PORT_LABEL],
+                }
+            else:
+                kwargs[e[TARGET_PORT_LABEL]] = {
+                    "argument": _get_argument_name(
+                        port=e[TARGET_PORT_LABEL], node_id=k, chain=chain
+                    )
+                }
+        chain_spec_lst.append({"function": function_nodes_dict[k], "kwargs": kwargs})
+    return chain_spec_lst
+
+
+def _write_file(file_name: Path, content: bytes) -> bool:
+    # skip unchanged files, so a re-export only touches the files which changed
+    if (
+        file_name.exists()
+        and file_name.stat().st_size == len(content)
+        and file_name.read_bytes() == content
+    ):
+        return False
+    file_name.write_bytes(content)
+    return True
+
+
+def _write_files(file_dict: dict):
+    with ThreadPoolExecutor() as exe:
+        list(exe.map(_write_file, file_dict.keys(), file_dict.values()))
+
+
+def _write_input_file(value: Any, file_stem: str, serializer: str) -> str:
+    file_name = file_stem + get_serializer_extension(name=serializer)
+    tmp_file_name = dump_value(
+        value=value, file_stem=file_stem + ".tmp" + str(os.getpid()), name=serializer
+    )
+    if os.path.exists(file_name) and filecmp.cmp(
+        tmp_file_name, file_name, shallow=False
+    ):
+        os.remove(tmp_file_name)
+    else:
+        os.replace(tmp_file_name, file_name)
+    return file_name
+
+
+def _dump_yaml(template: dict, yaml_dict: dict) -> bytes:
+    # identical templates, like the tools of the same function, are dumped once
+    key = json.dumps(template, sort_keys=True)
+    if key not in yaml_dict:
+        yaml_dict[key] = dump(template, Dumper=Dumper).encode()
+    return yaml_dict[key]
+
+
+def _get_tool_name(function_name: str, tool_name_set: set) -> str:
+    # the same function with a different port signature requires a separate tool,
+    # and workflow.cwl is reserved for the workflow itself
+    short_name = function_name.rsplit(".", maxsplit=1)[-1]
+    tool_name = short_name + ".cwl"
+    index = 1
+    while tool_name in tool_name_set or tool_name == "workflow.cwl":
+        tool_name = short_name + "_" + str(index) + ".cwl"
+        index += 1
+    return tool_name
+
+
+def _check_serializer_dict(workflow, funct_dict: dict, serializer_dict: dict):
+    # a key which matches no input node or output port would be ignored silently
+    key_set = {n["name"] for n in workflow[NODES_LABEL] if n["type"] == "input"}
+    key_set.update(
+        (k, port) for k, v in funct_dict.items() for port in v["sourcePorts"]
+    )
+    unknown_lst = [k for k in serializer_dict if k not in key_set]
+    if len(unknown_lst) > 0:
+        raise ValueError(
+            "The serializer_dict keys "
+            + ", ".join(repr(k) for k in unknown_lst)
+            + " are neither the name of an input node nor a (node id, source port) "
+            + "tuple of a function node."
+        )
+
+
+def _write_function_cwl(
+    workflow,
+    directory_path: str = ".",
+    worker: bool = False,
+    fuse: bool = False,
+    serializer_dict: dict | None = None,
+) -> dict:
+    """
+    Write one CommandLineTool for each unique combination of the function, the
+    ports and the options of the steps.
+
+    Returns:
+        dict: Mapping of the last node id of each step to the file name of its tool.
+    """
+    if serializer_dict is None:
+        serializer_dict = {}
+    graph = WorkflowGraph(workflow_dict=workflow)
+    function_nodes_dict, funct_dict = _get_function(workflow=workflow, graph=graph)
+    _check_serializer_dict(
+        workflow=workflow, funct_dict=funct_dict, serializer_dict=serializer_dict
+    )
     export_path = Path(directory_path)
     export_path.mkdir(parents=True, exist_ok=True)
+    # every step registers the custom serializers, as it might load their files
+    reference_dict = {
+        name: reference
+        for name in dict.fromkeys(serializer_dict.values())
+        if (reference := get_serializer_reference(name=name)) is not None
+    }
 
-    for i in function_nodes_dict:
+    file_dict: dict[Path, bytes] = {}
+    yaml_dict: dict[str, bytes] = {}
+    tool_name_dict: dict[bytes, str] = {}
+    tool_dict: dict[int, str] = {}
+    for chain in _get_chain_lst(workflow=workflow, fuse=fuse, graph=graph):
+        i = chain[-1]
         template: dict[str, Any] = {
             "cwlVersion": "v1.2",
             "class": "CommandLineTool",
@@ -104,49 +337,111 @@ def _write_function_cwl(workflow, directory_path: str = "."):
             },
             "outputs": {},
         }
-        file_name = export_path / (
-            function_nodes_dict[i].split(".")[-1] + "_" + str(i) + ".cwl"
+        module_set = set().union(
+            *[_get_user_module(function_name=function_nodes_dict[k]) for k in chain]
         )
-        if function_nodes_dict[i].split(".")[0] != "python_workflow_definition":
+        if len(module_set) > 0:
             template["inputs"]["workflowfile"]["default"]["location"] = (
-                function_nodes_dict[i].split(".")[0] + ".py"
+                module_set.pop() + ".py"
             )
         else:
             del template["inputs"]["workflowfile"]
-        template["inputs"].update(
-            _get_function_template(function_name=function_nodes_dict[i])
+        if worker:
+            # the client only imports the standard library, it forwards the step
+            template["inputs"]["wrapper"][
+                "default"
+            ] = "python_workflow_definition.cwl_worker"
+        if len(chain) == 1:
+            template["inputs"].update(
+                _get_function_template(function_name=function_nodes_dict[i])
+            )
+        else:
+            template["inputs"].update(
+                _get_chain_template(
+                    chain_lst=_get_chain_spec(
+                        graph=graph,
+                        chain=chain,
+                        function_nodes_dict=function_nodes_dict,
+                    )
+                )
+            )
+        argument_lst = list(
+            dict.fromkeys(
+                _get_argument_name(port=e[TARGET_PORT_LABEL], node_id=k, chain=chain)
+                for k, e in _get_external_edges(graph=graph, chain=chain)
+            )
         )
-        for j, arg in enumerate(funct_dict[i]["targetPorts"]):
+        for j, arg in enumerate(argument_lst):
             template["inputs"].update(
                 _get_function_argument(argument=arg, position=4 + j)
             )
+        output_serializer_dict = {}
         for out in funct_dict[i]["sourcePorts"]:
-            if out is None:
-                template["outputs"].update(_get_output_name(output_name="result"))
-            else:
-                template["outputs"].update(_get_output_name(output_name=out))
-        with open(file_name, "w") as f:
-            dump(template, f, Dumper=Dumper)
+            output_name = "result" if out is None else out
+            serializer = serializer_dict.get((i, out), DEFAULT_SERIALIZER)
+            template["outputs"].update(
+                _get_output_name(output_name=output_name, serializer=serializer)
+            )
+            if serializer != DEFAULT_SERIALIZER:
+                output_serializer_dict[output_name] = serializer
+        if len(output_serializer_dict) > 0:
+            template["inputs"].update(
+                _get_serializer_template(serializer_dict=output_serializer_dict)
+            )
+        if len(reference_dict) > 0:
+            template["inputs"].update(
+                _get_serializer_import_template(reference_dict=reference_dict)
+            )
+        content = _dump_yaml(template=template, yaml_dict=yaml_dict)
+        if content not in tool_name_dict:
+            tool_name_dict[content] = _get_tool_name(
+                function_name=function_nodes_dict[i],
+                tool_name_set=set(tool_name_dict.values()),
+            )
+            file_dict[export_path / tool_name_dict[content]] = content
+        tool_dict[i] = tool_name_dict[content]
+    _write_files(file_dict=file_dict)
+    return tool_dict
 
 
-def _write_workflow_config(workflow, directory_path: str = "."):
+def _write_workflow_config(
+    workflow, directory_path: str = ".", serializer_dict: dict | None = None
+):
+    if serializer_dict is None:
+        serializer_dict = {}
     input_dict = {
         n["name"]: n["value"] for n in workflow[NODES_LABEL] if n["type"] == "input"
     }
     export_path = Path(directory_path)
     export_path.mkdir(parents=True, exist_ok=True)
-    with open(export_path / "workflow.yml", "w") as f:
-        dump(
-            {k + "_file": {"class": "File", "path": k + ".pickle"} for k in input_dict},
-            f,
-            Dumper=Dumper,
+    with ThreadPoolExecutor() as exe:
+        file_name_dict = dict(
+            zip(
+                input_dict.keys(),
+                exe.map(
+                    _write_input_file,
+                    input_dict.values(),
+                    [str(export_path / k) for k in input_dict],
+                    [serializer_dict.get(k, DEFAULT_SERIALIZER) for k in input_dict],
+                ),
+                strict=True,
+            )
         )
-    for k, v in input_dict.items():
-        with open(export_path / (k + ".pickle"), "wb") as f:
-            pickle.dump(v, f)
+    _write_file(
+        file_name=export_path / "workflow.yml",
+        content=dump(
+            {
+                k + "_file": {"class": "File", "path": Path(v).name}
+                for k, v in file_name_dict.items()
+            },
+            Dumper=Dumper,
+        ).encode(),
+    )
 
 
-def _write_workflow(workflow, directory_path: str = "."):
+def _write_workflow(
+    workflow, tool_dict: dict, directory_path: str = ".", fuse: bool = False
+):
     workflow_template: dict[str, Any] = {
         "cwlVersion": "v1.2",
         "class": "Workflow",
@@ -157,11 +452,10 @@ def _write_workflow(workflow, directory_path: str = "."):
     input_dict = {
         n["name"]: n["value"] for n in workflow[NODES_LABEL] if n["type"] == "input"
     }
-    function_nodes_dict, funct_dict = _get_function(workflow)
+    graph = WorkflowGraph(workflow_dict=workflow)
+    function_nodes_dict, funct_dict = _get_function(workflow=workflow, graph=graph)
     result_id = [n["id"] for n in workflow[NODES_LABEL] if n["type"] == "output"][0]
-    last_compute_id = [
-        e[SOURCE_LABEL] for e in workflow[EDGES_LABEL] if e[TARGET_LABEL] == result_id
-    ][0]
+    last_compute_id = graph.get_predecessors(result_id)[0]
     workflow_template["inputs"].update({k + "_file": "File" for k in input_dict})
     if funct_dict[last_compute_id]["sourcePorts"] == [None]:
         workflow_template["outputs"] = {
@@ -177,28 +471,39 @@ def _write_workflow(workflow, directory_path: str = "."):
         raise ValueError()
 
     content = remove_result(workflow_dict=workflow)
-    edges_new_lst = content[EDGES_LABEL]
-    total_lst = group_edges(edges_new_lst)
+    content_graph = WorkflowGraph(workflow_dict=content)
+    total_dict = content_graph.get_total_dict()
     nodes_new_dict = {
         int(k): v
         for k, v in convert_nodes_list_to_dict(nodes_list=content[NODES_LABEL]).items()
     }
-    total_new_lst = resort_total_lst(total_lst=total_lst, nodes_dict=nodes_new_dict)
+    total_new_lst = [
+        [ind, total_dict[ind]]
+        for ind in topological_sort(total_dict=total_dict, nodes_dict=nodes_new_dict)
+    ]
     step_name_lst = {
         t[0]: function_nodes_dict[t[0]].split(".")[-1] for t in total_new_lst
     }
     input_id_dict = {
         n["id"]: n["name"] for n in workflow[NODES_LABEL] if n["type"] == "input"
     }
+    chain_dict = {
+        chain[-1]: chain
+        for chain in _get_chain_lst(workflow=workflow, fuse=fuse, graph=graph)
+    }
     for t in total_new_lst:
         ind = t[0]
-        node_script = step_name_lst[ind] + "_" + str(ind) + ".cwl"
+        if ind not in chain_dict:
+            continue
         output = [
             o + "_file" if o is not None else "result_file"
             for o in funct_dict[ind]["sourcePorts"]
         ]
         in_dict = {}
-        for k, v in t[1].items():
+        for n, v in _get_external_edges(graph=content_graph, chain=chain_dict[ind]):
+            k = _get_argument_name(
+                port=v[TARGET_PORT_LABEL], node_id=n, chain=chain_dict[ind]
+            )
             if v[SOURCE_LABEL] in input_id_dict:
                 in_dict[k + "_file"] = input_id_dict[v[SOURCE_LABEL]] + "_file"
             elif v["sourcePort"] is None:
@@ -218,7 +523,7 @@ def _write_workflow(workflow, directory_path: str = "."):
                     + "_file"
                 )
         step_dict = {
-            "run": node_script,
+            "run": tool_dict[ind],
             "in": in_dict,
             "out": output,
         }
@@ -227,14 +532,63 @@ def _write_workflow(workflow, directory_path: str = "."):
         )
     export_path = Path(directory_path)
     export_path.mkdir(parents=True, exist_ok=True)
-    with open(export_path / "workflow.cwl", "w") as f:
-        dump(workflow_template, f, Dumper=Dumper)
+    _write_file(
+        file_name=export_path / "workflow.cwl",
+        content=dump(workflow_template, Dumper=Dumper).encode(),
+    )
+
+
+def _load_workflow(file_name: str) -> dict:
+    # every step imports this package, so pydantic is only imported for the export
+    models = import_module("python_workflow_definition.models")
+    return models.PythonWorkflowDefinitionWorkflow.load_json_file(
+        file_name=file_name, fast=True
+    )
 
 
-def write_workflow(file_name: str, directory_path: str = "."):
-    with open(file_name) as f:
-        workflow = json.load(f)
+def write_workflow(
+    file_name: str,
+    directory_path: str = ".",
+    worker: bool = False,
+    fuse: bool = False,
+    serializer_dict: dict | None = None,
+):
+    """
+    Export a workflow to the common workflow language (CWL).
 
-    _write_function_cwl(workflow=workflow, directory_path=directory_path)
-    _write_workflow_config(workflow=workflow, directory_path=directory_path)
-    _write_workflow(workflow=workflow, directory_path=directory_path)
+    Args:
+        file_name (str): JSON file of the workflow, or binary file with one of the
+                         BINARY_FILE_EXTENSIONS.
+        directory_path (str): Directory to write the CWL files to.
+        worker (bool): Execute the steps in a persistent worker process, which keeps
+                       the imported modules warm, rather than starting a new Python
+                       interpreter for every step.
+        fuse (bool): Execute linear chains of function nodes in a single step, so
+                     only the inputs and outputs of the chain are serialized.
+        serializer_dict (dict): Serializer of the files, which pass the values between
+                                the steps, for the names of the input nodes and the
+                                (node id, source port) tuples of the function nodes,
+                                with the source port None for a single output. The
+                                available serializers are pickle (default), pickle5,
+                                npy, gzip and the ones added with
+                                register_serializer().
+    """
+    workflow = _load_workflow(file_name=file_name)
+    tool_dict = _write_function_cwl(
+        workflow=workflow,
+        directory_path=directory_path,
+        worker=worker,
+        fuse=fuse,
+        serializer_dict=serializer_dict,
+    )
+    _write_workflow_config(
+        workflow=workflow,
+        directory_path=directory_path,
+        serializer_dict=serializer_dict,
+    )
+    _write_workflow(
+        workflow=workflow,
+        tool_dict=tool_dict,
+        directory_path=directory_path,
+        fuse=fuse,
+    )
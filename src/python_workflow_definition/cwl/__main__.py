@@ -1,37 +1,160 @@
+import contextlib
+import hashlib
 import importlib.util
-import pickle
+import json
+import os
+import signal
+import socket
 import sys
+import traceback
 from ast import literal_eval
+from multiprocessing.connection import Connection
+
+from python_workflow_definition.cwl.serializer import (
+    DEFAULT_SERIALIZER,
+    dump_value,
+    get_serializer_name,
+    import_serializers,
+    load_value,
+)
+from python_workflow_definition.cwl_worker import (
+    _check_worker_directory,
+    _connect,
+    submit_step,
+)
+
+WORKER_IDLE_TIMEOUT = 60.0
+WORKER_IMPORT_TIMEOUT = 10.0
+
+_module_dict: dict = {}
+
+
+def load_module(file_name):
+    # modules are cached by their content, as CWL stages the same file in different directories
+    with open(file_name, "rb") as f:
+        module_hash = hashlib.sha256(f.read()).hexdigest()
+    if module_hash not in _module_dict:
+        spec = importlib.util.spec_from_file_location("workflow", file_name)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["workflow"] = module
+        spec.loader.exec_module(module)
+        _module_dict[module_hash] = module
+    sys.modules["workflow"] = _module_dict[module_hash]
+    return _module_dict[module_hash]
 
 
 def load_function(file_name, funct):
-    spec = importlib.util.spec_from_file_location("workflow", file_name)
-    module = importlib.util.module_from_spec(spec)
-    sys.modules["workflow"] = module
-    spec.loader.exec_module(module)
-    return getattr(module, funct.split(".")[-1])
+    return getattr(load_module(file_name=file_name), funct.split(".")[-1])
 
 
 def convert_argument(arg):
-    if ".pickle" in arg:
-        with open(arg, "rb") as f:
-            return pickle.load(f)
+    if get_serializer_name(file_name=arg) is not None:
+        return load_value(file_name=arg)
     else:
         return literal_eval(arg)
 
 
-if __name__ == "__main__":
-    # load input
-    argument_lst = sys.argv[1:]
+def _get_function(funct: str, file_lst: list):
+    if len(file_lst) > 0 and not funct.startswith("python_workflow_definition."):
+        return load_function(file_name=file_lst[0], funct=funct), False
+    else:
+        m, p = funct.rsplit(".", 1)
+        return getattr(importlib.import_module(m), p), True
+
+
+def _get_chain_lst(argument_lst: list) -> list:
+    return [
+        json.loads(arg.split("=", 1)[-1])
+        for arg in argument_lst
+        if arg.startswith("--chain=")
+    ]
+
+
+def get_workflow_function(argument_lst: list):
     funct_lst = [arg.split("=")[-1] for arg in argument_lst if "--function=" in arg]
     file_lst = [arg.split("=")[-1] for arg in argument_lst if "--workflowfile=" in arg]
-    if len(file_lst) > 0:
-        workflow_function = load_function(file_name=file_lst[0], funct=funct_lst[0])
-        internal_function = False
+    return _get_function(funct=funct_lst[0], file_lst=file_lst)
+
+
+def _get_serializer_dict(argument_lst: list) -> dict:
+    serializer_lst = [
+        json.loads(arg.split("=", 1)[-1])
+        for arg in argument_lst
+        if arg.startswith("--serializer=")
+    ]
+    return serializer_lst[0] if len(serializer_lst) > 0 else {}
+
+
+def _import_serializers(argument_lst: list):
+    for arg in argument_lst:
+        if arg.startswith("--serializer-import="):
+            import_serializers(reference_dict=json.loads(arg.split("=", 1)[-1]))
+
+
+def _store_result(result, internal_function: bool, serializer_dict: dict):
+    if isinstance(result, dict) and not internal_function:
+        for k, v in result.items():
+            dump_value(
+                value=v,
+                file_stem=k,
+                name=serializer_dict.get(k, DEFAULT_SERIALIZER),
+            )
     else:
-        m, p = funct_lst[0].rsplit(".", 1)
-        workflow_function = getattr(importlib.import_module(m), p)
-        internal_function = True
+        dump_value(
+            value=result,
+            file_stem="result",
+            name=serializer_dict.get("result", DEFAULT_SERIALIZER),
+        )
+
+
+def run_chain(argument_lst: list):
+    """
+    Evaluate a chain of functions in a single process, only the arguments of the
+    chain are loaded from and the result of the last function is stored to files.
+
+    Args:
+        argument_lst (list): Command line arguments of the step, including the
+                             --chain= argument with the JSON encoded chain.
+    """
+    chain_lst = _get_chain_lst(argument_lst=argument_lst)[0]
+    file_lst = [arg.split("=")[-1] for arg in argument_lst if "--workflowfile=" in arg]
+    argument_dict = {
+        arg.split("=")[0][6:]: convert_argument(arg=arg.split("=")[-1])
+        for arg in argument_lst
+        if "--arg_" in arg
+    }
+    result_lst: list = []
+    internal_function = True
+    for step_dict in chain_lst:
+        workflow_function, internal_function = _get_function(
+            funct=step_dict["function"], file_lst=file_lst
+        )
+        kwargs = {}
+        for k, v in step_dict["kwargs"].items():
+            if "argument" in v:
+                kwargs[k] = argument_dict[v["argument"]]
+            elif v["port"] is None:
+                kwargs[k] = result_lst[v["step"]]
+            else:
+                kwargs[k] = result_lst[v["step"]][v["port"]]
+        result_lst.append(workflow_function(**kwargs))
+    _store_result(
+        result=result_lst[-1],
+        internal_function=internal_function,
+        serializer_dict=_get_serializer_dict(argument_lst=argument_lst),
+    )
+
+
+def run_step(argument_lst: list):
+    # the custom serializers are required to load the input files
+    _import_serializers(argument_lst=argument_lst)
+    if len(_get_chain_lst(argument_lst=argument_lst)) > 0:
+        return run_chain(argument_lst=argument_lst)
+
+    # load input
+    workflow_function, internal_function = get_workflow_function(
+        argument_lst=argument_lst
+    )
     kwargs = {
         arg.split("=")[0][6:]: convert_argument(arg=arg.split("=")[-1])
         for arg in argument_lst
@@ -42,10 +165,132 @@ if __name__ == "__main__":
     result = workflow_function(**kwargs)
 
     # store output
-    if isinstance(result, dict) and not internal_function:
-        for k, v in result.items():
-            with open(k + ".pickle", "wb") as f:
-                pickle.dump(v, f)
+    _store_result(
+        result=result,
+        internal_function=internal_function,
+        serializer_dict=_get_serializer_dict(argument_lst=argument_lst),
+    )
+
+
+def _import_functions(argument_lst: list):
+    chain_lst = _get_chain_lst(argument_lst=argument_lst)
+    if len(chain_lst) > 0:
+        file_lst = [
+            arg.split("=")[-1] for arg in argument_lst if "--workflowfile=" in arg
+        ]
+        for step_dict in chain_lst[0]:
+            _get_function(funct=step_dict["function"], file_lst=file_lst)
+    else:
+        get_workflow_function(argument_lst=argument_lst)
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError
+
+
+def _warm_up(request_dict: dict, timeout: float = WORKER_IMPORT_TIMEOUT):
+    """
+    Import the modules of a step in the server, so every forked step starts warm.
+    A module which raises, exits or blocks must not stop the server, the forked step
+    imports it again and reports the error.
+
+    Args:
+        request_dict (dict): Request of the step with the arguments and the cwd.
+        timeout (float): Seconds after which the import is interrupted.
+    """
+    previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+    with contextlib.suppress(BaseException):
+        try:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+            os.chdir(request_dict["cwd"])
+            _import_functions(argument_lst=request_dict["argv"])
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    signal.signal(signal.SIGALRM, previous_handler)
+
+
+def _serve_request(client: socket.socket, server: socket.socket):
+    _, fd_lst, _, _ = socket.recv_fds(client, 1, 2)
+    connection = Connection(client.detach())
+    request_dict = connection.recv()
+    _warm_up(request_dict=request_dict)
+    if os.fork() == 0:
+        exit_code = 1
+        try:
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            server.close()
+            os.dup2(fd_lst[0], 1)
+            os.dup2(fd_lst[1], 2)
+            os.environ.clear()
+            os.environ.update(request_dict["environ"])
+            os.chdir(request_dict["cwd"])
+            sys.path.insert(0, request_dict["cwd"])
+            run_step(argument_lst=request_dict["argv"])
+            exit_code = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                connection.send(exit_code)
+            finally:
+                os._exit(exit_code)
+    for fd in fd_lst:
+        os.close(fd)
+    connection.close()
+
+
+def serve(address: str, idle_timeout: float = WORKER_IDLE_TIMEOUT):
+    """
+    Serve workflow steps from a warm interpreter, by forking one child process per
+    step. The server exits after idle_timeout seconds without requests.
+
+    Args:
+        address (str): Path of the unix socket to listen on.
+        idle_timeout (float): Seconds without requests before the server exits.
+    """
+    _check_worker_directory(address=address)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(address)
+    except OSError:
+        try:
+            _connect(address=address).close()
+            server.close()
+            return  # another worker is already serving this address
+        except OSError:
+            os.unlink(address)
+            server.bind(address)
+    server.listen()
+    server.settimeout(idle_timeout)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    try:
+        while True:
+            try:
+                client, _ = server.accept()
+            except TimeoutError:
+                break
+            try:
+                _serve_request(client=client, server=server)
+            except (OSError, EOFError):
+                client.close()
+    finally:
+        server.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(address)
+
+
+if __name__ == "__main__":
+    argument_lst = sys.argv[1:]
+    serve_lst = [
+        arg.split("=", 1)[-1] for arg in argument_lst if arg.startswith("--serve=")
+    ]
+    if len(serve_lst) > 0:
+        serve(address=serve_lst[0])
+    elif "--worker" in argument_lst:
+        sys.exit(
+            submit_step(argument_lst=[arg for arg in argument_lst if arg != "--worker"])
+        )
     else:
-        with open("result.pickle", "wb") as f:
-            pickle.dump(result, f)
+        run_step(argument_lst=argument_lst)
@@ -0,0 +1,240 @@
+import gzip
+import mmap
+import pickle
+import struct
+from collections.abc import Callable
+from functools import reduce
+from importlib import import_module
+from typing import Any
+
+import numpy as np
+
+DEFAULT_SERIALIZER = "pickle"
+
+# out-of-band buffers are aligned, so the memory mapped arrays are aligned as well
+_BUFFER_ALIGNMENT = 64
+
+_serializer_dict: dict[str, tuple[str, Callable, Callable]] = {}
+
+
+def register_serializer(
+    name: str,
+    extension: str,
+    dump: Callable[[Any, str], None],
+    load: Callable[[str], Any],
+):
+    """
+    Register a serializer for the files, which pass values between the CWL steps.
+    The steps import the dump and the load function again, so both have to be
+    defined in a module which is importable in the environment of the steps.
+
+    Args:
+        name (str): Name of the serializer, as used in the serializer_dict.
+        extension (str): File extension, which identifies the serializer on load.
+        dump (callable): Function dump(value, file_name) writing the value to a file.
+        load (callable): Function load(file_name) reading the value from a file.
+    """
+    _serializer_dict[name] = (extension, dump, load)
+
+
+def get_serializer_extension(name: str) -> str:
+    """
+    Args:
+        name (str): Name of the serializer.
+
+    Returns:
+        str: File extension of the serializer.
+    """
+    if name not in _serializer_dict:
+        raise ValueError(
+            "Unknown serializer "
+            + name
+            + ", the available serializers are "
+            + ", ".join(_serializer_dict)
+            + "."
+        )
+    return _serializer_dict[name][0]
+
+
+def get_serializer_name(file_name: str) -> str | None:
+    """
+    Args:
+        file_name (str): Name of a serialized file.
+
+    Returns:
+        str: Name of the serializer with the longest matching file extension, None
+             if the file extension does not match any serializer.
+    """
+    name_lst = [
+        name for name, v in _serializer_dict.items() if file_name.endswith(v[0])
+    ]
+    if len(name_lst) == 0:
+        return None
+    return max(name_lst, key=lambda name: len(_serializer_dict[name][0]))
+
+
+def get_serializer_reference(name: str) -> list | None:
+    """
+    Args:
+        name (str): Name of the serializer.
+
+    Returns:
+        list: File extension and the module:qualname references of the dump and the
+              load function of a registered serializer, None for the serializers
+              which are built into this module.
+
+    Raises:
+        ValueError: If the functions of the serializer can not be imported by the
+                    CWL steps.
+    """
+    extension = get_serializer_extension(name=name)
+    if _serializer_dict[name] == _builtin_serializer_dict.get(name):
+        return None
+    return [extension] + [
+        _get_reference(function=f) for f in _serializer_dict[name][1:]
+    ]
+
+
+def import_serializers(reference_dict: dict):
+    """
+    Register the serializers in the process of a CWL step.
+
+    Args:
+        reference_dict (dict): Mapping of the serializer names to the references
+                               returned by get_serializer_reference().
+    """
+    for name, (extension, dump, load) in reference_dict.items():
+        register_serializer(
+            name=name,
+            extension=extension,
+            dump=_import_reference(reference=dump),
+            load=_import_reference(reference=load),
+        )
+
+
+def _get_reference(function: Callable) -> str:
+    module_name, qualname = function.__module__, function.__qualname__
+    if module_name == "__main__" or "<" in qualname:
+        raise ValueError(
+            "The serializer function "
+            + qualname
+            + " can not be imported by the CWL steps, it has to be defined in an "
+            + "importable module."
+        )
+    return module_name + ":" + qualname
+
+
+def _import_reference(reference: str) -> Callable:
+    module_name, qualname = reference.split(":")
+    obj: Any = import_module(module_name)
+    return reduce(getattr, qualname.split("."), obj)
+
+
+def dump_value(value: Any, file_stem: str, name: str = DEFAULT_SERIALIZER) -> str:
+    """
+    Args:
+        value: Value to serialize.
+        file_stem (str): File name without the extension of the serializer.
+        name (str): Name of the serializer.
+
+    Returns:
+        str: Name of the written file.
+    """
+    file_name = file_stem + get_serializer_extension(name=name)
+    _serializer_dict[name][1](value, file_name)
+    return file_name
+
+
+def load_value(file_name: str) -> Any:
+    """
+    Load a value with the serializer matching the file extension.
+
+    Args:
+        file_name (str): Name of the serialized file.
+
+    Returns:
+        The deserialized value.
+    """
+    name = get_serializer_name(file_name=file_name)
+    if name is None:
+        raise ValueError("No serializer is registered for the file " + file_name + ".")
+    return _serializer_dict[name][2](file_name)
+
+
+def _dump_pickle(value: Any, file_name: str):
+    with open(file_name, "wb") as f:
+        pickle.dump(value, f)
+
+
+def _load_pickle(file_name: str) -> Any:
+    with open(file_name, "rb") as f:
+        return pickle.load(f)
+
+
+def _dump_pickle5(value: Any, file_name: str):
+    # header: size of the pickle stream, number of buffers and the size of each buffer
+    buffer_lst: list = []
+    data = pickle.dumps(value, protocol=5, buffer_callback=buffer_lst.append)
+    raw_lst = [buffer.raw() for buffer in buffer_lst]
+    with open(file_name, "wb") as f:
+        f.write(struct.pack("<QQ", len(data), len(raw_lst)))
+        f.write(struct.pack("<" + "Q" * len(raw_lst), *[r.nbytes for r in raw_lst]))
+        f.write(data)
+        for raw in raw_lst:
+            f.write(b"\0" * (-f.tell() % _BUFFER_ALIGNMENT))
+            f.write(raw)
+
+
+def _load_pickle5(file_name: str) -> Any:
+    with open(file_name, "rb") as f:
+        data_size, buffer_count = struct.unpack("<QQ", f.read(16))
+        size_lst = struct.unpack("<" + "Q" * buffer_count, f.read(8 * buffer_count))
+        data = f.read(data_size)
+        if buffer_count == 0:
+            return pickle.loads(data)
+        offset = f.tell()
+        # copy on write, so the functions can still modify their arguments in place
+        file_view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY))
+    buffer_lst = []
+    for size in size_lst:
+        offset += -offset % _BUFFER_ALIGNMENT
+        buffer_lst.append(file_view[offset : offset + size])
+        offset += size
+    return pickle.loads(data, buffers=buffer_lst)
+
+
+def _dump_npy(value: Any, file_name: str):
+    # array like values, for example the lists of the JSON input nodes, are converted
+    np.save(file_name, np.asarray(value), allow_pickle=False)
+
+
+def _load_npy(file_name: str) -> np.ndarray:
+    try:
+        return np.load(file_name, mmap_mode="c", allow_pickle=False)
+    except ValueError:  # empty arrays can not be memory mapped
+        return np.load(file_name, allow_pickle=False)
+
+
+def _dump_gzip(value: Any, file_name: str):
+    with gzip.open(file_name, "wb", compresslevel=1) as f:
+        pickle.dump(value, f, protocol=5)
+
+
+def _load_gzip(file_name: str) -> Any:
+    with gzip.open(file_name, "rb") as f:
+        return pickle.load(f)
+
+
+register_serializer(
+    name="pickle", extension=".pickle", dump=_dump_pickle, load=_load_pickle
+)
+register_serializer(
+    name="pickle5", extension=".pickle5", dump=_dump_pickle5, load=_load_pickle5
+)
+register_serializer(name="npy", extension=".npy", dump=_dump_npy, load=_load_npy)
+register_serializer(
+    name="gzip", extension=".pickle.gz", dump=_dump_gzip, load=_load_gzip
+)
+
+# registered again under the same name, a serializer is no longer built in
+_builtin_serializer_dict = dict(_serializer_dict)
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import socket
+import stat
+import subprocess
+import sys
+import time
+from importlib import import_module
+from multiprocessing.connection import Connection
+
+# the client is started for every step, so it only imports the standard library
+WORKER_START_TIMEOUT = 30.0
+
+
+def get_worker_address() -> str:
+    # one worker per Python environment, so the steps run with their own interpreter
+    environment_hash = hashlib.sha256(
+        (sys.executable + "\0" + sys.prefix).encode()
+    ).hexdigest()[:16]
+    return os.path.join(
+        "/tmp",
+        "python_workflow_definition_" + str(os.getuid()),
+        "worker_" + environment_hash + ".sock",
+    )
+
+
+def _check_worker_directory(address: str):
+    # only the current user may connect, as the worker executes arbitrary functions
+    directory = os.path.dirname(address)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    directory_stat = os.stat(directory)
+    if directory_stat.st_uid != os.getuid() or stat.S_IMODE(directory_stat.st_mode) & (
+        stat.S_IRWXG | stat.S_IRWXO
+    ):
+        raise PermissionError(
+            "The worker directory " + directory + " is accessible to other users."
+        )
+
+
+def _connect(address: str) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _start_worker(address: str) -> socket.socket:
+    subprocess.Popen(
+        [sys.executable, "-m", "python_workflow_definition.cwl", "--serve=" + address],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    start_time = time.monotonic()
+    while True:
+        try:
+            return _connect(address=address)
+        except OSError:
+            if time.monotonic() - start_time > WORKER_START_TIMEOUT:
+                raise
+            time.sleep(0.01)
+
+
+def submit_step(argument_lst: list, address: str | None = None) -> int:
+    """
+    Execute a workflow step in the persistent worker, which is started on demand.
+
+    Args:
+        argument_lst (list): Command line arguments of the step.
+        address (str): Path of the unix socket of the worker.
+
+    Returns:
+        int: Exit code of the step.
+    """
+    if not hasattr(os, "fork") or not hasattr(socket, "AF_UNIX"):
+        import_module("python_workflow_definition.cwl.__main__").run_step(
+            argument_lst=argument_lst
+        )
+        return 0
+    if address is None:
+        address = get_worker_address()
+    _check_worker_directory(address=address)
+    try:
+        sock = _connect(address=address)
+    except OSError:
+        sock = _start_worker(address=address)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    socket.send_fds(sock, [b"\0"], [sys.stdout.fileno(), sys.stderr.fileno()])
+    with Connection(sock.detach()) as connection:
+        connection.send(
+            {"argv": argument_lst, "cwd": os.getcwd(), "environ": dict(os.environ)}
+        )
+        try:
+            return connection.recv()
+        except EOFError:
+            return 1
+
+
+if __name__ == "__main__":
+    sys.exit(submit_step(argument_lst=sys.argv[1:]))
@@ -1,16 +1,24 @@
 from concurrent.futures import Executor
-from importlib import import_module
 from inspect import isfunction
 from typing import Any
 
+from executorlib import BaseExecutor
+
 from python_workflow_definition.models import PythonWorkflowDefinitionWorkflow
-from python_workflow_definition.purepython import group_edges, resort_total_lst
 from python_workflow_definition.shared import (
-    EDGES_LABEL,
+    FUNCTION_LABEL,
+    KWARGS_LABEL,
     NODES_LABEL,
     SOURCE_LABEL,
     SOURCE_PORT_LABEL,
+    WorkflowGraph,
     convert_nodes_list_to_dict,
+    get_container_nodes,
+    get_function,
+    get_ready_sets,
+    get_resources_dict,
+    import_modules,
+    inline_container_nodes,
     remove_result,
 )
 
@@ -19,57 +27,208 @@ def get_item(obj, key):
     return obj[key]
 
 
-def _get_value(result_dict: dict, nodes_new_dict: dict, link_dict: dict, exe: Executor):
+def _get_items(obj, key_lst: list):
+    for key in key_lst:
+        obj = get_item(obj=obj, key=key)
+    return obj
+
+
+def _resolve_argument(kwargs: dict, selector: list | dict):
+    # inlined containers are rebuilt from the resolved values of their inputs
+    if isinstance(selector, dict):
+        return selector[FUNCTION_LABEL](
+            **{
+                k: _resolve_argument(kwargs=kwargs, selector=v)
+                for k, v in selector[KWARGS_LABEL].items()
+            }
+        )
+    else:
+        name, key_lst = selector
+        return _get_items(obj=kwargs[name], key_lst=key_lst)
+
+
+def _call_with_items(function, port_dict: dict, /, **kwargs):
+    return function(
+        **{
+            k: _resolve_argument(kwargs=kwargs, selector=v)
+            for k, v in port_dict.items()
+        }
+    )
+
+
+def _call_batch(function, port_dict_lst: list, /, **kwargs) -> list:
+    return [
+        _call_with_items(function, port_dict, **kwargs) for port_dict in port_dict_lst
+    ]
+
+
+def _get_argument(
+    result_dict: dict, nodes_new_dict: dict, link_dict: dict, kwargs: dict
+) -> list | dict:
+    if KWARGS_LABEL in link_dict:
+        return {
+            FUNCTION_LABEL: link_dict[FUNCTION_LABEL],
+            KWARGS_LABEL: {
+                k: _get_argument(
+                    result_dict=result_dict,
+                    nodes_new_dict=nodes_new_dict,
+                    link_dict=v,
+                    kwargs=kwargs,
+                )
+                for k, v in link_dict[KWARGS_LABEL].items()
+            },
+        }
     source, source_handle = link_dict[SOURCE_LABEL], link_dict[SOURCE_PORT_LABEL]
+    name = f"arg_{len(kwargs)}"
     if source in result_dict:
-        result = result_dict[source]
+        kwargs[name], key_lst = result_dict[source]
+        if source_handle is not None:
+            key_lst = key_lst + [source_handle]
+        return [name, key_lst]
     elif source in nodes_new_dict:
-        result = nodes_new_dict[source]
+        if source_handle is None:
+            kwargs[name] = nodes_new_dict[source]
+        else:
+            kwargs[name] = nodes_new_dict[source][source_handle]
+        return [name, []]
     else:
         raise KeyError()
-    if source_handle is None:
-        return result
-    else:
-        return exe.submit(get_item, obj=result, key=source_handle)
 
 
-def load_workflow_json(file_name: str, exe: Executor):
+def _get_arguments(
+    result_dict: dict, nodes_new_dict: dict, link_dict: dict, kwargs: dict
+) -> dict:
+    # executors only resolve the futures which are passed as keyword arguments, so
+    # every input is added to kwargs and the ports select their value from there
+    return {
+        k: _get_argument(
+            result_dict=result_dict,
+            nodes_new_dict=nodes_new_dict,
+            link_dict=v,
+            kwargs=kwargs,
+        )
+        for k, v in link_dict.items()
+    }
+
+
+def _get_resource_dict(resources: dict) -> dict:
+    # executorlib requests the GPUs per core, the workflow the GPUs of the node. When
+    # the GPUs can not be divided between the cores, every core gets at least one.
+    gpus, cores = resources.get("gpus"), resources.get("cores", 1)
+    resource_dict = {
+        "cores": resources.get("cores"),
+        "threads_per_core": resources.get("threads"),
+        "gpus_per_core": max(1, gpus // cores) if gpus else gpus,
+        "run_time_max": resources.get("walltime"),
+    }
+    return {k: v for k, v in resource_dict.items() if v is not None}
+
+
+def _get_batches(
+    ready_lst: list,
+    nodes_new_dict: dict,
+    resources_dict: dict,
+    batch_size: int,
+    last_key,
+) -> list:
+    batch_lst: list[list] = []
+    group_dict: dict[Any, list] = {}
+    for ind in ready_lst:
+        node = nodes_new_dict[ind]
+        # nodes with a resource request are submitted with their own resource_dict
+        if ind == last_key or ind in resources_dict:
+            batch_lst.append([ind])
+        elif isfunction(node):
+            group_dict.setdefault(node, []).append(ind)
+    for ind_lst in group_dict.values():
+        batch_lst += [
+            ind_lst[i : i + batch_size] for i in range(0, len(ind_lst), batch_size)
+        ]
+    return batch_lst
+
+
+def load_workflow_json(
+    file_name: str, exe: Executor, batch_size: int = 1, inline_containers: bool = False
+):
+    if batch_size < 1:
+        raise ValueError(f"The batch_size has to be at least 1, not {batch_size}.")
     content = remove_result(
         workflow_dict=PythonWorkflowDefinitionWorkflow.load_json_file(
             file_name=file_name
         )
     )
 
-    edges_new_lst = content[EDGES_LABEL]
     nodes_new_dict = {}
 
+    import_modules(nodes_list=content[NODES_LABEL])
     nodes_types_dict = {int(n["id"]): n["type"] for n in content[NODES_LABEL]}
     for k, v in convert_nodes_list_to_dict(nodes_list=content[NODES_LABEL]).items():
         if nodes_types_dict[int(k)] == "function" and isinstance(v, str) and "." in v:
-            p, m = v.rsplit(".", 1)
-            mod = import_module(p)
-            nodes_new_dict[int(k)] = getattr(mod, m)
+            nodes_new_dict[int(k)] = get_function(function_path=v)
         else:
             nodes_new_dict[int(k)] = v
 
-    total_lst = group_edges(edges_new_lst)
-    total_new_lst = resort_total_lst(total_lst=total_lst, nodes_dict=nodes_new_dict)
+    resources_dict = get_resources_dict(nodes_list=content[NODES_LABEL])
+    total_dict = WorkflowGraph(workflow_dict=content).get_total_dict()
+    if inline_containers:
+        total_dict = inline_container_nodes(
+            total_dict=total_dict,
+            container_dict=get_container_nodes(nodes_list=content[NODES_LABEL]),
+        )
+    ready_set_lst = get_ready_sets(total_dict=total_dict, nodes_dict=nodes_new_dict)
+    last_key = [
+        ind
+        for ready_lst in ready_set_lst
+        for ind in ready_lst
+        if isfunction(nodes_new_dict[ind])
+    ][-1]
 
-    result_dict: dict[Any, Any] = {}
-    last_key = None
-    for lst in total_new_lst:
-        node = nodes_new_dict[lst[0]]
-        if isfunction(node):
-            kwargs = {
-                k: _get_value(
+    # map every node to the future which computes it and the keys to its result
+    result_dict: dict[Any, list] = {}
+    for ready_lst in ready_set_lst:
+        for batch_lst in _get_batches(
+            ready_lst=ready_lst,
+            nodes_new_dict=nodes_new_dict,
+            resources_dict=resources_dict,
+            batch_size=batch_size,
+            last_key=last_key,
+        ):
+            node = nodes_new_dict[batch_lst[0]]
+            submit_kwargs = {}
+            # other executors would pass the resource_dict on to the function
+            if batch_lst[0] in resources_dict and isinstance(exe, BaseExecutor):
+                submit_kwargs["resource_dict"] = _get_resource_dict(
+                    resources=resources_dict[batch_lst[0]]
+                )
+            kwargs: dict = {}
+            port_dict_lst = [
+                _get_arguments(
                     result_dict=result_dict,
                     nodes_new_dict=nodes_new_dict,
-                    link_dict=v,
-                    exe=exe,
+                    link_dict=total_dict[ind],
+                    kwargs=kwargs,
                 )
-                for k, v in lst[1].items()
-            }
-            result_dict[lst[0]] = exe.submit(node, **kwargs)
-            last_key = lst[0]
+                for ind in batch_lst
+            ]
+            if len(batch_lst) > 1:
+                future = exe.submit(_call_batch, node, port_dict_lst, **kwargs)
+                # the consumers select the result of their node from the batch
+                for i, ind in enumerate(batch_lst):
+                    result_dict[ind] = [future, [i]]
+            else:
+                port_dict = port_dict_lst[0]
+                if all(
+                    isinstance(v, list) and len(v[1]) == 0 for v in port_dict.values()
+                ):
+                    future = exe.submit(
+                        node,
+                        **{k: kwargs[v[0]] for k, v in port_dict.items()},
+                        **submit_kwargs,
+                    )
+                else:
+                    future = exe.submit(
+                        _call_with_items, node, port_dict, **kwargs, **submit_kwargs
+                    )
+                result_dict[batch_lst[0]] = [future, []]
 
-    return result_dict[last_key]
+    return result_dict[last_key][0]
@@ -1,30 +1,51 @@
-from importlib import import_module
+import warnings
+from datetime import timedelta
 from inspect import isfunction
 from typing import Any
 
 import numpy as np
-from jobflow import Flow, job
+from jobflow import Flow, Job, job
 
-from python_workflow_definition.models import PythonWorkflowDefinitionWorkflow
+from python_workflow_definition.models import (
+    PythonWorkflowDefinitionResources,
+    PythonWorkflowDefinitionWorkflow,
+)
 from python_workflow_definition.shared import (
     EDGES_LABEL,
     NODES_LABEL,
+    RESOURCES_LABEL,
     SOURCE_LABEL,
     SOURCE_PORT_LABEL,
     TARGET_LABEL,
     TARGET_PORT_LABEL,
     VERSION_LABEL,
     VERSION_NUMBER,
+    WorkflowGraph,
     convert_nodes_list_to_dict,
+    get_container_nodes,
     get_dict,
-    get_kwargs,
+    get_function,
+    get_input_value,
     get_list,
-    get_source_handles,
+    get_resources_dict,
+    import_modules,
+    inline_container_nodes,
+    intern_value,
     remove_result,
+    resolve_link,
     set_result_node,
+    topological_sort,
     update_node_names,
 )
 
+# keys of the qtoolkit QResources, which jobflow-remote uses as resources
+_QTOOLKIT_RESOURCES_DICT = {
+    "processes": "cores",
+    "threads_per_process": "threads",
+    "gpus_per_job": "gpus",
+    "time_limit": "walltime",
+}
+
 
 def _get_function_dict(flow: Flow):
     return {j.uuid: j.function for j in flow.jobs}
@@ -58,18 +79,23 @@ def _get_edge_from_dict(
         }
 
 
+def _is_reference(value) -> bool:
+    return (
+        isinstance(value, dict)
+        and "@module" in value
+        and "@class" in value
+        and "@version" in value
+    )
+
+
 def _get_edges_and_extend_nodes(
     flow_dict: dict, nodes_mapping_dict: dict, nodes_dict: dict
 ):
     edges_lst = []
+    intern_dict: dict[str, int] = {}
     for j in flow_dict["jobs"]:
         for k, v in j["function_kwargs"].items():
-            if (
-                isinstance(v, dict)
-                and "@module" in v
-                and "@class" in v
-                and "@version" in v
-            ):
+            if _is_reference(v):
                 edges_lst.append(
                     _get_edge_from_dict(
                         target=nodes_mapping_dict[j["uuid"]],
@@ -78,22 +104,11 @@ def _get_edges_and_extend_nodes(
                         nodes_mapping_dict=nodes_mapping_dict,
                     )
                 )
-            elif isinstance(v, dict) and any(
-                isinstance(el, dict)
-                and "@module" in el
-                and "@class" in el
-                and "@version" in el
-                for el in v.values()
-            ):
+            elif isinstance(v, dict) and any(_is_reference(el) for el in v.values()):
                 node_dict_index = len(nodes_dict)
                 nodes_dict[node_dict_index] = get_dict
                 for kt, vt in v.items():
-                    if (
-                        isinstance(vt, dict)
-                        and "@module" in vt
-                        and "@class" in vt
-                        and "@version" in vt
-                    ):
+                    if _is_reference(vt):
                         edges_lst.append(
                             _get_edge_from_dict(
                                 target=node_dict_index,
@@ -103,18 +118,15 @@ def _get_edges_and_extend_nodes(
                             )
                         )
                     else:
-                        if vt not in nodes_dict.values():
-                            node_index = len(nodes_dict)
-                            nodes_dict[node_index] = vt
-                        else:
-                            node_index = {str(tv): tk for tk, tv in nodes_dict.items()}[
-                                str(vt)
-                            ]
                         edges_lst.append(
                             {
                                 TARGET_LABEL: node_dict_index,
                                 TARGET_PORT_LABEL: kt,
-                                SOURCE_LABEL: node_index,
+                                SOURCE_LABEL: intern_value(
+                                    value=vt,
+                                    nodes_dict=nodes_dict,
+                                    intern_dict=intern_dict,
+                                ),
                                 SOURCE_PORT_LABEL: None,
                             }
                         )
@@ -126,22 +138,11 @@ def _get_edges_and_extend_nodes(
                         SOURCE_PORT_LABEL: None,
                     }
                 )
-            elif isinstance(v, list) and any(
-                isinstance(el, dict)
-                and "@module" in el
-                and "@class" in el
-                and "@version" in el
-                for el in v
-            ):
+            elif isinstance(v, list) and any(_is_reference(el) for el in v):
                 node_list_index = len(nodes_dict)
                 nodes_dict[node_list_index] = get_list
                 for kt, vt in enumerate(v):
-                    if (
-                        isinstance(vt, dict)
-                        and "@module" in vt
-                        and "@class" in vt
-                        and "@version" in vt
-                    ):
+                    if _is_reference(vt):
                         edges_lst.append(
                             _get_edge_from_dict(
                                 target=node_list_index,
@@ -151,18 +152,15 @@ def _get_edges_and_extend_nodes(
                             )
                         )
                     else:
-                        if vt not in nodes_dict.values():
-                            node_index = len(nodes_dict)
-                            nodes_dict[node_index] = vt
-                        else:
-                            node_index = {str(tv): tk for tk, tv in nodes_dict.items()}[
-                                str(vt)
-                            ]
                         edges_lst.append(
                             {
                                 TARGET_LABEL: node_list_index,
                                 TARGET_PORT_LABEL: kt,
-                                SOURCE_LABEL: node_index,
+                                SOURCE_LABEL: intern_value(
+                                    value=vt,
+                                    nodes_dict=nodes_dict,
+                                    intern_dict=intern_dict,
+                                ),
                                 SOURCE_PORT_LABEL: None,
                             }
                         )
@@ -175,59 +173,98 @@ def _get_edges_and_extend_nodes(
                     }
                 )
             else:
-                if v not in nodes_dict.values():
-                    node_index = len(nodes_dict)
-                    nodes_dict[node_index] = v
-                else:
-                    node_index = {tv: tk for tk, tv in nodes_dict.items()}[v]
                 edges_lst.append(
                     {
                         TARGET_LABEL: nodes_mapping_dict[j["uuid"]],
                         TARGET_PORT_LABEL: k,
-                        SOURCE_LABEL: node_index,
+                        SOURCE_LABEL: intern_value(
+                            value=v, nodes_dict=nodes_dict, intern_dict=intern_dict
+                        ),
                         SOURCE_PORT_LABEL: None,
                     }
                 )
     return edges_lst, nodes_dict
 
 
+def _restore_arrays(flow_dict: dict, flow: Flow) -> dict:
+    # Flow.as_dict() converts the arrays to lists, get_input_value() needs the arrays
+    kwargs_dict = {j.uuid: j.function_kwargs for j in flow.jobs if isinstance(j, Job)}
+    for job_dict in flow_dict["jobs"]:
+        for k, v in kwargs_dict.get(job_dict["uuid"], {}).items():
+            if isinstance(v, np.ndarray):
+                job_dict["function_kwargs"][k] = v
+    return flow_dict
+
+
 def _resort_total_lst(total_dict: dict, nodes_dict: dict) -> dict:
-    nodes_with_dep_lst = sorted(total_dict.keys())
-    nodes_without_dep_lst = [k for k in nodes_dict if k not in nodes_with_dep_lst]
-    ordered_lst: list = []
-    total_new_dict: dict[Any, dict] = {}
-    while len(total_new_dict) < len(total_dict):
-        for ind in sorted(total_dict.keys()):
-            connect = total_dict[ind]
-            if ind not in ordered_lst:
-                source_lst = [sd[SOURCE_LABEL] for sd in connect.values()]
-                if all(
-                    s in ordered_lst or s in nodes_without_dep_lst for s in source_lst
-                ):
-                    ordered_lst.append(ind)
-                    total_new_dict[ind] = connect
-    return total_new_dict
-
-
-def _group_edges(edges_lst: list) -> dict:
-    total_dict: dict[Any, dict] = {}
-    for ed_major in edges_lst:
-        target_id = ed_major[TARGET_LABEL]
-        tmp_lst = []
-        if target_id not in total_dict:
-            for ed in edges_lst:
-                if target_id == ed[TARGET_LABEL]:
-                    tmp_lst.append(ed)
-            total_dict[target_id] = get_kwargs(lst=tmp_lst)
-    return total_dict
+    return {
+        ind: total_dict[ind]
+        for ind in topological_sort(
+            total_dict={k: total_dict[k] for k in sorted(total_dict.keys())},
+            nodes_dict=nodes_dict,
+        )
+    }
 
 
 def _get_input_dict(nodes_dict: dict) -> dict:
     return {k: v for k, v in nodes_dict.items() if not isfunction(v)}
 
 
+def _convert_resources(resources: dict) -> dict:
+    # jobflow-remote passes the resources to qtoolkit, so its keys are translated and
+    # the keys without an equivalent in the workflow definition are dropped
+    resources = {k: v for k, v in resources.items() if v is not None}
+    resources_dict = {
+        _QTOOLKIT_RESOURCES_DICT.get(k, k): v
+        for k, v in resources.items()
+        if _QTOOLKIT_RESOURCES_DICT.get(k, k)
+        in PythonWorkflowDefinitionResources.model_fields
+    }
+    if "cores" not in resources_dict and {"nodes", "processes_per_node"} <= set(
+        resources
+    ):
+        resources_dict["cores"] = resources["nodes"] * resources["processes_per_node"]
+    if "memory" not in resources_dict and "memory_per_thread" in resources:
+        resources_dict["memory"] = (
+            resources["memory_per_thread"]
+            * resources_dict.get("cores", 1)
+            * resources_dict.get("threads", 1)
+        )
+    if isinstance(resources_dict.get("walltime"), timedelta):
+        resources_dict["walltime"] = int(resources_dict["walltime"].total_seconds())
+    dropped_lst = [
+        k
+        for k in resources
+        if _QTOOLKIT_RESOURCES_DICT.get(k, k)
+        not in PythonWorkflowDefinitionResources.model_fields
+        and k not in ("nodes", "processes_per_node", "memory_per_thread")
+    ]
+    if len(dropped_lst) > 0:
+        warnings.warn(
+            f"The resources {dropped_lst} have no equivalent in the workflow "
+            "definition and are not exported.",
+            stacklevel=3,
+        )
+    return resources_dict
+
+
+def _get_resources_from_flow(flow: Flow, nodes_mapping_dict: dict) -> dict:
+    resources_dict = {
+        nodes_mapping_dict[j.uuid]: _convert_resources(
+            resources=j.config.manager_config[RESOURCES_LABEL]
+        )
+        for j in flow.jobs
+        if isinstance(j, Job) and RESOURCES_LABEL in j.config.manager_config
+    }
+    return {k: v for k, v in resources_dict.items() if len(v) > 0}
+
+
 def _get_workflow(
-    nodes_dict: dict, input_dict: dict, total_dict: dict, source_handles_dict: dict
+    nodes_dict: dict,
+    input_dict: dict,
+    total_dict: dict,
+    source_handles_dict: dict,
+    resources_dict: dict,
 ) -> list:
     def get_attr_helper(obj, source_handle):
         if source_handle is None:
@@ -235,6 +272,15 @@ def _get_workflow(
         else:
             return getattr(obj.output, source_handle)
 
+    def get_value(link_dict):
+        if link_dict[SOURCE_LABEL] in input_dict:
+            return input_dict[link_dict[SOURCE_LABEL]]
+        else:
+            return get_attr_helper(
+                obj=memory_dict[link_dict[SOURCE_LABEL]],
+                source_handle=link_dict[SOURCE_PORT_LABEL],
+            )
+
     memory_dict: dict[Any, Any] = {}
     for k, subdict in total_dict.items():
         v = nodes_dict[k]
@@ -247,17 +293,15 @@ def _get_workflow(
             else:
                 fn = job(method=v)
             kwargs = {
-                kw: (
-                    input_dict[vw[SOURCE_LABEL]]
-                    if vw[SOURCE_LABEL] in input_dict
-                    else get_attr_helper(
-                        obj=memory_dict[vw[SOURCE_LABEL]],
-                        source_handle=vw[SOURCE_PORT_LABEL],
-                    )
-                )
+                kw: resolve_link(link_dict=vw, get_value=get_value)
                 for kw, vw in subdict.items()
             }
             memory_dict[k] = fn(**kwargs)
+            if k in resources_dict:
+                memory_dict[k].config.manager_config = {
+                    **memory_dict[k].config.manager_config,
+                    RESOURCES_LABEL: resources_dict[k],
+                }
     return list(memory_dict.values())
 
 
@@ -268,7 +312,7 @@ def _get_item_from_tuple(input_obj, index, index_lst):
         return list(input_obj)[index_lst.index(index)]
 
 
-def load_workflow_json(file_name: str) -> Flow:
+def load_workflow_json(file_name: str, inline_containers: bool = False) -> Flow:
     content = remove_result(
         workflow_dict=PythonWorkflowDefinitionWorkflow.load_json_file(
             file_name=file_name
@@ -290,17 +334,24 @@ def load_workflow_json(file_name: str) -> Flow:
             )
 
     nodes_new_dict = {}
+    import_modules(nodes_list=content[NODES_LABEL])
     nodes_types_dict = {int(n["id"]): n["type"] for n in content[NODES_LABEL]}
     for k, v in convert_nodes_list_to_dict(nodes_list=content[NODES_LABEL]).items():
         if nodes_types_dict[int(k)] == "function" and isinstance(v, str) and "." in v:
-            p, m = v.rsplit(".", 1)
-            mod = import_module(p)
-            nodes_new_dict[int(k)] = getattr(mod, m)
+            nodes_new_dict[int(k)] = get_function(function_path=v)
         else:
             nodes_new_dict[int(k)] = v
 
-    source_handles_dict = get_source_handles(edges_lst=edges_new_lst)
-    total_dict = _group_edges(edges_lst=edges_new_lst)
+    graph = WorkflowGraph(
+        workflow_dict={NODES_LABEL: content[NODES_LABEL], EDGES_LABEL: edges_new_lst}
+    )
+    source_handles_dict = graph.get_source_handles()
+    total_dict = graph.get_total_dict()
+    if inline_containers:
+        total_dict = inline_container_nodes(
+            total_dict=total_dict,
+            container_dict=get_container_nodes(nodes_list=content[NODES_LABEL]),
+        )
     input_dict = _get_input_dict(nodes_dict=nodes_new_dict)
     new_total_dict = _resort_total_lst(total_dict=total_dict, nodes_dict=nodes_new_dict)
     task_lst = _get_workflow(
@@ -308,12 +359,15 @@ def load_workflow_json(file_name: str) -> Flow:
         input_dict=input_dict,
         total_dict=new_total_dict,
         source_handles_dict=source_handles_dict,
+        resources_dict=get_resources_dict(nodes_list=content[NODES_LABEL]),
     )
     return Flow(task_lst)
 
 
-def write_workflow_json(flow: Flow, file_name: str = "workflow.json"):
-    flow_dict = flow.as_dict()
+def write_workflow_json(
+    flow: Flow, file_name: str = "workflow.json", array_threshold: int | None = None
+):
+    flow_dict = _restore_arrays(flow_dict=flow.as_dict(), flow=flow)
     function_dict = _get_function_dict(flow=flow)
     nodes_dict, nodes_mapping_dict = _get_nodes_dict(function_dict=function_dict)
     edges_lst, nodes_dict = _get_edges_and_extend_nodes(
@@ -322,16 +376,35 @@ def write_workflow_json(flow: Flow, file_name: str = "workflow.json"):
         nodes_dict=nodes_dict,
     )
 
+    resources_dict = _get_resources_from_flow(
+        flow=flow, nodes_mapping_dict=nodes_mapping_dict
+    )
+
     nodes_store_lst = []
     for k, v in nodes_dict.items():
-        if isfunction(v):
+        if isfunction(v) and k in resources_dict:
+            nodes_store_lst.append(
+                {
+                    "id": k,
+                    "type": "function",
+                    "value": v.__module__ + "." + v.__name__,
+                    RESOURCES_LABEL: resources_dict[k],
+                }
+            )
+        elif isfunction(v):
             nodes_store_lst.append(
                 {"id": k, "type": "function", "value": v.__module__ + "." + v.__name__}
             )
-        elif isinstance(v, np.ndarray):
-            nodes_store_lst.append({"id": k, "type": "input", "value": v.tolist()})
         else:
-            nodes_store_lst.append({"id": k, "type": "input", "value": v})
+            nodes_store_lst.append(
+                {
+                    "id": k,
+                    "type": "input",
+                    "value": get_input_value(
+                        value=v, file_name=file_name, array_threshold=array_threshold
+                    ),
+                }
+            )
 
     PythonWorkflowDefinitionWorkflow(
         **set_result_node(
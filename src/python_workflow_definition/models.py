@@ -1,26 +1,45 @@
+import contextlib
+import gc
 import json
 import logging
+import re
+from collections.abc import Iterator
+from importlib import import_module
 from pathlib import Path
-from typing import Annotated, Any, Literal, TypeVar
+from typing import IO, Annotated, Any, Literal, NotRequired, TypeVar
 
 from pydantic import (
+    AfterValidator,
     BaseModel,
+    ConfigDict,
     Field,
+    NonNegativeInt,
+    PositiveInt,
+    SerializerFunctionWrapHandler,
+    TypeAdapter,
     ValidationError,
     field_serializer,
     field_validator,
+    model_serializer,
 )
-from typing_extensions import TypeAliasType
+from typing_extensions import TypeAliasType, TypedDict
+
+from python_workflow_definition.shared import EdgeTable, load_arrays
 
 logger = logging.getLogger(__name__)
 
 INTERNAL_DEFAULT_HANDLE = "__result__"
+BINARY_FILE_EXTENSIONS = (".msgpack",)
 T = TypeVar("T", bound="PythonWorkflowDefinitionWorkflow")
+_STRING_PATTERN = re.compile(r'["\\]')
+_STRUCTURE_PATTERN = re.compile(r'["[\]{}]')
+_SCALAR_END_PATTERN = re.compile(r"[\s,\]}]")
 
 __all__ = (
     "PythonWorkflowDefinitionInputNode",
     "PythonWorkflowDefinitionOutputNode",
     "PythonWorkflowDefinitionFunctionNode",
+    "PythonWorkflowDefinitionResources",
     "PythonWorkflowDefinitionEdge",
     "PythonWorkflowDefinitionWorkflow",
 )
@@ -33,6 +52,27 @@ AllowableDefaults = TypeAliasType(
 )
 
 
+def _check_function_value(v: str) -> str:
+    if not v or "." not in v or v.startswith(".") or v.endswith("."):
+        msg = (
+            "FunctionNode 'value' must be a non-empty string ",
+            "in 'module.function' format with at least one period.",
+        )
+        raise ValueError(msg)
+    return v
+
+
+def _check_source_port(v: str | None) -> str | None:
+    if v == INTERNAL_DEFAULT_HANDLE:
+        # Disallow explicit use of the internal reserved handle name
+        msg = (
+            f"Explicit use of reserved sourcePort '{INTERNAL_DEFAULT_HANDLE}' "
+            f"is not allowed. Use null/None for default output."
+        )
+        raise ValueError(msg)
+    return v
+
+
 class PythonWorkflowDefinitionBaseNode(BaseModel):
     """Base model for all node types, containing common fields."""
 
@@ -57,6 +97,32 @@ class PythonWorkflowDefinitionOutputNode(PythonWorkflowDefinitionBaseNode):
     name: str
 
 
+class PythonWorkflowDefinitionResources(BaseModel):
+    """
+    Model for the computational resources requested by a function node.
+    Unset resources are left to the defaults of the workflow engine.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    cores: PositiveInt | None = None
+    threads: PositiveInt | None = None  # Threads per core
+    gpus: NonNegativeInt | None = Field(
+        default=None,
+        description="Total number of GPUs of the function node, not per core. "
+        "Backends which request GPUs per core divide it by the cores.",
+    )
+    memory: PositiveInt | None = None  # In megabytes
+    walltime: PositiveInt | None = None  # In seconds
+
+    @model_serializer(mode="wrap")
+    def serialize_resources(self, handler: SerializerFunctionWrapHandler) -> dict:
+        """
+        SERIALIZATION (Output): Only includes the resources which are set.
+        """
+        return {k: v for k, v in handler(self).items() if v is not None}
+
+
 class PythonWorkflowDefinitionFunctionNode(PythonWorkflowDefinitionBaseNode):
     """
     Model for function execution nodes.
@@ -65,17 +131,23 @@ class PythonWorkflowDefinitionFunctionNode(PythonWorkflowDefinitionBaseNode):
 
     type: Literal["function"]
     value: str  # Expected format: 'module.function'
+    resources: PythonWorkflowDefinitionResources | None = None
+
+    @model_serializer(mode="wrap")
+    def serialize_function_node(self, handler: SerializerFunctionWrapHandler) -> dict:
+        """
+        SERIALIZATION (Output): Omits the resources of function nodes without
+        resource requirements.
+        """
+        node_dict = handler(self)
+        if node_dict.get("resources") is None:
+            node_dict.pop("resources", None)
+        return node_dict
 
     @field_validator("value")
     @classmethod
     def check_value_format(cls, v: str):
-        if not v or "." not in v or v.startswith(".") or v.endswith("."):
-            msg = (
-                "FunctionNode 'value' must be a non-empty string ",
-                "in 'module.function' format with at least one period.",
-            )
-            raise ValueError(msg)
-        return v
+        return _check_function_value(v)
 
 
 # Discriminated Union for Nodes
@@ -105,14 +177,7 @@ class PythonWorkflowDefinitionEdge(BaseModel):
         # Allow not specifying the sourcePort -> null gets resolved to __result__
         if v is None:
             return INTERNAL_DEFAULT_HANDLE
-        elif v == INTERNAL_DEFAULT_HANDLE:
-            # Disallow explicit use of the internal reserved handle name
-            msg = (
-                f"Explicit use of reserved sourcePort '{INTERNAL_DEFAULT_HANDLE}' "
-                f"is not allowed. Use null/None for default output."
-            )
-            raise ValueError(msg)
-        return v
+        return _check_source_port(v)
 
     @field_serializer("sourcePort")
     def serialize_source_handle(self, v: str | None) -> str | None:
@@ -125,6 +190,282 @@ class PythonWorkflowDefinitionEdge(BaseModel):
         return v  # Keep other handle names as they are
 
 
+# Plain dictionary schemas mirroring the models above. They are validated with a
+# TypeAdapter, which returns the same dictionaries as model_dump() without building
+# the pydantic models first.
+class _ResourcesDict(TypedDict):
+    __pydantic_config__ = ConfigDict(extra="forbid")  # type: ignore[misc]
+
+    cores: NotRequired[PositiveInt | None]
+    threads: NotRequired[PositiveInt | None]
+    gpus: NotRequired[NonNegativeInt | None]
+    memory: NotRequired[PositiveInt | None]
+    walltime: NotRequired[PositiveInt | None]
+
+
+class _InputNodeDict(TypedDict):
+    id: int
+    type: Literal["input"]
+    name: str
+    value: Annotated[AllowableDefaults | None, Field(default=None)]
+
+
+class _OutputNodeDict(TypedDict):
+    id: int
+    type: Literal["output"]
+    name: str
+
+
+def _drop_unset_resources(resources_dict: dict) -> dict:
+    return {k: v for k, v in resources_dict.items() if v is not None}
+
+
+class _FunctionNodeDict(TypedDict):
+    id: int
+    type: Literal["function"]
+    value: Annotated[str, AfterValidator(_check_function_value)]
+    resources: NotRequired[
+        Annotated[_ResourcesDict, AfterValidator(_drop_unset_resources)] | None
+    ]
+
+
+def _drop_unset_function_resources(node_dict: dict) -> dict:
+    if "resources" in node_dict and node_dict["resources"] is None:
+        del node_dict["resources"]
+    return node_dict
+
+
+class _EdgeDict(TypedDict):
+    target: int
+    targetPort: Annotated[str | None, Field(default=None)]
+    source: int
+    sourcePort: Annotated[
+        str | None, AfterValidator(_check_source_port), Field(default=None)
+    ]
+
+
+_NodeDict = Annotated[
+    _InputNodeDict
+    | _OutputNodeDict
+    | Annotated[_FunctionNodeDict, AfterValidator(_drop_unset_function_resources)],
+    Field(discriminator="type"),
+]
+
+
+class _WorkflowDict(TypedDict):
+    version: str
+    nodes: list[_NodeDict]
+    edges: list[_EdgeDict]
+
+
+_workflow_dict_adapter: TypeAdapter[_WorkflowDict] = TypeAdapter(_WorkflowDict)
+_node_dict_adapter: TypeAdapter[_NodeDict] = TypeAdapter(_NodeDict)
+_edge_dict_adapter: TypeAdapter[_EdgeDict] = TypeAdapter(_EdgeDict)
+
+
+def _load_input_arrays(workflow_dict: dict, directory: Path) -> dict:
+    for node_dict in workflow_dict["nodes"]:
+        if node_dict["type"] == "input" and isinstance(
+            node_dict.get("value"), dict | list
+        ):
+            node_dict["value"] = load_arrays(
+                value=node_dict["value"], directory=str(directory)
+            )
+    return workflow_dict
+
+
+# the edges of the binary format are stored as lists in this order
+_BINARY_EDGE_KEYS = ("target", "targetPort", "source", "sourcePort")
+
+
+def _get_msgpack() -> Any:
+    try:
+        return import_module("msgpack")
+    except ImportError as e:
+        raise ImportError(
+            "The binary workflow format requires msgpack, install it with "
+            "pip install python_workflow_definition[msgpack]."
+        ) from e
+
+
+def _is_binary_file(file_name: str | Path) -> bool:
+    return Path(file_name).suffix in BINARY_FILE_EXTENSIONS
+
+
+def _get_edge_dicts(edges: Any) -> Any:
+    if not isinstance(edges, list):
+        return edges  # raises the validation error
+    return [
+        (
+            {
+                "target": edge[0],
+                "targetPort": edge[1],
+                "source": edge[2],
+                "sourcePort": edge[3],
+            }
+            if isinstance(edge, list) and len(edge) == len(_BINARY_EDGE_KEYS)
+            else edge
+        )
+        for edge in edges
+    ]
+
+
+def _unpack_binary(binary_data: bytes) -> Any:
+    # the garbage collector would traverse the growing number of containers
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _get_msgpack().unpackb(binary_data)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+class _JsonStreamReader:
+    """
+    Decode the values of a JSON document one by one from a file handle. Only the
+    value which is currently decoded is kept in memory.
+    """
+
+    def __init__(self, file_handle: IO[str], chunk_size: int):
+        self._file_handle = file_handle
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._end_of_file = False
+
+    def _read(self) -> str:
+        if self._end_of_file:
+            return ""
+        chunk = self._file_handle.read(self._chunk_size)
+        if len(chunk) == 0:
+            self._end_of_file = True
+        return chunk
+
+    def _read_chunk(self) -> bool:
+        chunk = self._read()
+        if len(chunk) == 0:
+            return False
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+        return True
+
+    def _error(self, msg: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(msg, self._buffer, self._position)
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while (
+                self._position < len(self._buffer)
+                and self._buffer[self._position] in " \t\n\r"
+            ):
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            elif not self._read_chunk():
+                raise self._error("Unexpected end of file")
+
+    def expect(self, characters: str) -> str:
+        """Consume the next non-whitespace character, which has to be in characters."""
+        character = self.peek()
+        if character not in characters:
+            raise self._error(f"Expecting one of {characters!r}")
+        self._position += 1
+        return character
+
+    def _find_end(self) -> int:
+        """
+        Find the end of the value at the current position, the file is read until
+        the value is complete. Every character is scanned once and the chunks are
+        only joined when the value is complete, so large values are read in linear
+        time.
+        """
+        text, index = self._buffer, self._position
+        chunk_lst: list[str] = []
+        offset = -self._position  # position of text in the completed value
+        is_scalar = text[index] not in '[{"'
+        depth, in_string, escape = 0, False, False
+        while True:
+            if is_scalar:
+                match = _SCALAR_END_PATTERN.search(text, index)
+                if match is not None:
+                    index = match.start()
+                    break
+            elif in_string:
+                match = _STRING_PATTERN.search(text, index)
+                if match is not None:
+                    index = match.end()
+                    if match.group() == "\\":
+                        escape = index == len(text)
+                        index = min(index + 1, len(text))
+                        continue
+                    in_string = False
+                    if depth == 0:
+                        break
+                    continue
+            else:
+                match = _STRUCTURE_PATTERN.search(text, index)
+                if match is not None:
+                    index = match.end()
+                    character = match.group()
+                    if character == '"':
+                        in_string = True
+                    elif character in "[{":
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if depth == 0:
+                            break
+                    continue
+            chunk = self._read()
+            if len(chunk) == 0:
+                if is_scalar:
+                    index = len(text)
+                    break
+                raise self._error("Unexpected end of file")
+            offset += len(text)
+            # skip the character after a backslash at the end of the last chunk
+            text, index, escape = chunk, int(escape), False
+            chunk_lst.append(chunk)
+        if len(chunk_lst) == 0:
+            return index
+        self._buffer = self._buffer[self._position :] + "".join(chunk_lst)
+        self._position = 0
+        return offset + index
+
+    def decode(self) -> Any:
+        """Consume and return the next JSON value."""
+        self.peek()
+        with contextlib.suppress(json.JSONDecodeError):
+            value, end = self._decoder.raw_decode(self._buffer, self._position)
+            # numbers and literals at the end of the buffer might be incomplete
+            if end < len(self._buffer) and (
+                self._buffer[self._position] in '[{"'
+                or _SCALAR_END_PATTERN.match(self._buffer, end) is not None
+            ):
+                self._position = end
+                return value
+        # the value continues after the buffer, so it is decoded once it is complete
+        end = self._find_end()
+        value, self._position = self._decoder.raw_decode(self._buffer, self._position)
+        if self._position != end:
+            raise self._error("Extra data")
+        return value
+
+    def iter_array(self) -> Iterator[Any]:
+        """Consume a JSON array and yield its values one by one."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._position += 1
+            return
+        while True:
+            yield self.decode()
+            if self.expect(",]") == "]":
+                return
+
+
 class PythonWorkflowDefinitionWorkflow(BaseModel):
     """The main workflow model."""
 
@@ -175,7 +516,8 @@ class PythonWorkflowDefinitionWorkflow(BaseModel):
         **kwargs,
     ) -> None:
         """
-        Dumps the workflow model to a JSON file.
+        Dumps the workflow model to a JSON file, files with one of the
+        BINARY_FILE_EXTENSIONS are written with dump_binary_file() instead.
 
         Args:
             file_path: Path to the output JSON file.
@@ -184,6 +526,8 @@ class PythonWorkflowDefinitionWorkflow(BaseModel):
                                              from FunctionNode objects.
             **kwargs: Additional keyword arguments passed to Pydantic's model_dump.
         """
+        if _is_binary_file(file_name=file_name):
+            return self.dump_binary_file(file_name=file_name, **kwargs)
         logger.info(f"Dumping workflow model to JSON file: {file_name}")
         # Pass kwargs to dump_json, which passes them to model_dump
         json_string = self.dump_json(
@@ -200,13 +544,56 @@ class PythonWorkflowDefinitionWorkflow(BaseModel):
             )
             raise
 
+    def dump_binary(self, **kwargs) -> bytes:
+        """
+        Dumps the workflow model to the compact binary msgpack format, the edges
+        are stored as lists of target, targetPort, source and sourcePort.
+
+        Args:
+            **kwargs: Additional keyword arguments passed to Pydantic's model_dump.
+
+        Returns:
+            msgpack encoded representation of the workflow.
+        """
+        workflow_dict = self.model_dump(mode="json", **kwargs)
+        workflow_dict["edges"] = [
+            [edge.get(key) for key in _BINARY_EDGE_KEYS]
+            for edge in workflow_dict["edges"]
+        ]
+        return _get_msgpack().packb(workflow_dict, use_bin_type=True)
+
+    def dump_binary_file(self, file_name: str | Path, **kwargs) -> None:
+        """
+        Dumps the workflow model to a binary msgpack file.
+
+        Args:
+            file_name: Path to the output file.
+            **kwargs: Additional keyword arguments passed to Pydantic's model_dump.
+        """
+        logger.info(f"Dumping workflow model to binary file: {file_name}")
+        binary_data = self.dump_binary(**kwargs)
+        try:
+            with open(file_name, "wb") as f:
+                f.write(binary_data)
+            logger.info(f"Successfully wrote workflow model to {file_name}.")
+        except OSError as e:
+            logger.error(
+                f"Error writing workflow model to file {file_name}: {e}", exc_info=True
+            )
+            raise
+
     @classmethod
-    def load_json_str(cls: type[T], json_data: str | bytes) -> dict:
+    def load_json_str(
+        cls: type[T], json_data: str | bytes, *, fast: bool = False
+    ) -> dict:
         """
         Loads and validates workflow data from a JSON string or bytes.
 
         Args:
             json_data: The JSON data as a string or bytes.
+            fast: If True, validate directly into plain dictionaries instead of
+                  building the pydantic models and dumping them again. The result
+                  is the same, only the validation error messages differ.
 
         Returns:
             An instance of PwdWorkflow.
@@ -217,6 +604,12 @@ class PythonWorkflowDefinitionWorkflow(BaseModel):
         """
         logger.info("Loading workflow model from JSON data...")
         try:
+            if fast:
+                workflow_dict = dict(_workflow_dict_adapter.validate_json(json_data))
+                logger.info(
+                    "Successfully loaded and validated workflow data from JSON data."
+                )
+                return workflow_dict
             # Pydantic v2 method handles bytes or str directly
             instance = cls.model_validate_json(json_data)
             # Pydantic v1 equivalent: instance = cls.parse_raw(json_data)
@@ -237,12 +630,126 @@ class PythonWorkflowDefinitionWorkflow(BaseModel):
             raise
 
     @classmethod
-    def load_json_file(cls: type[T], file_name: str | Path) -> dict:
+    def load_binary(cls: type[T], binary_data: bytes, *, fast: bool = False) -> dict:
+        """
+        Loads and validates workflow data from the binary msgpack format.
+
+        Args:
+            binary_data: The msgpack encoded data written by dump_binary().
+            fast: If True, skip building the pydantic models, see load_json_str().
+
+        Returns:
+            The same dictionary as load_json_str() returns for the JSON format.
+
+        Raises:
+            pydantic.ValidationError: If validation fails.
+        """
+        logger.info("Loading workflow model from binary data...")
+        workflow_dict = _unpack_binary(binary_data=binary_data)
+        if isinstance(workflow_dict, dict) and "edges" in workflow_dict:
+            workflow_dict["edges"] = _get_edge_dicts(edges=workflow_dict["edges"])
+        try:
+            if fast:
+                return dict(_workflow_dict_adapter.validate_python(workflow_dict))
+            return cls.model_validate(workflow_dict).model_dump()
+        except ValidationError:
+            logger.error("Workflow model validation failed.", exc_info=True)
+            raise
+
+    @classmethod
+    def load_binary_file(
+        cls: type[T], file_name: str | Path, *, fast: bool = False
+    ) -> dict:
+        """
+        Loads and validates workflow data from a binary msgpack file.
+
+        Args:
+            file_name: The path to the binary file.
+            fast: If True, skip building the pydantic models, see load_json_str().
+
+        Returns:
+            The same dictionary as load_json_file() returns for the JSON format.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+            pydantic.ValidationError: If validation fails.
+        """
+        logger.info(f"Loading workflow model from binary file: {file_name}")
+        workflow_dict = cls.load_binary(Path(file_name).read_bytes(), fast=fast)
+        return _load_input_arrays(
+            workflow_dict=workflow_dict, directory=Path(file_name).parent
+        )
+
+    @classmethod
+    def iter_json_file(
+        cls: type[T], file_name: str | Path, *, chunk_size: int = 65536
+    ) -> Iterator[tuple[str, Any]]:
+        """
+        Incrementally parses and validates workflow data from a JSON file, the file
+        is read in chunks and each node and edge is validated as soon as it is read.
+
+        Args:
+            file_name: The path to the JSON file.
+            chunk_size: Number of characters which are read from the file at once.
+
+        Yields:
+            Tuples of the key and the value for the version, and of the key and the
+            validated dictionary for each node and edge in the order of the file.
+
+        Raises:
+            FileNotFoundError: If the file is not found.
+            pydantic.ValidationError: If validation fails.
+            json.JSONDecodeError: If the file is not valid JSON.
+        """
+        adapter_dict: dict[str, TypeAdapter] = {
+            "nodes": _node_dict_adapter,
+            "edges": _edge_dict_adapter,
+        }
+        found_dict: dict[str, Any] = {}
+        with open(file_name, encoding="utf-8") as f:
+            reader = _JsonStreamReader(file_handle=f, chunk_size=chunk_size)
+            reader.expect("{")
+            if reader.peek() == "}":
+                reader.expect("}")
+            else:
+                while True:
+                    key = reader.decode()
+                    reader.expect(":")
+                    if key in adapter_dict:
+                        found_dict[key] = []
+                        for item in reader.iter_array():
+                            yield key, adapter_dict[key].validate_python(item)
+                    elif key == "version":
+                        found_dict[key] = _workflow_dict_adapter.validate_python(
+                            {"version": reader.decode(), "nodes": [], "edges": []}
+                        )["version"]
+                        yield key, found_dict[key]
+                    else:
+                        reader.decode()
+                    if reader.expect(",}") == "}":
+                        break
+        # raises the validation error for missing keys
+        _workflow_dict_adapter.validate_python(found_dict)
+
+    @classmethod
+    def load_json_file(
+        cls: type[T], file_name: str | Path, *, fast: bool = False, stream: bool = False
+    ) -> dict:
         """
         Loads and validates workflow data from a JSON file.
 
         Args:
             file_path: The path to the JSON file.
+            fast: If True, skip building the pydantic models, see load_json_str().
+            stream: If True, parse the file incrementally with iter_json_file()
+                    instead of reading it at once, this implies fast. The edges
+                    are returned as an EdgeTable, which is built while the file
+                    is read.
+
+        The references to the .npy files written by the exporters with an
+        array_threshold are replaced by the memory mapped arrays. Files with one of
+        the BINARY_FILE_EXTENSIONS are read with load_binary_file(), which always
+        reads the whole file.
 
         Returns:
             An instance of PwdWorkflow.
@@ -253,11 +760,33 @@ class PythonWorkflowDefinitionWorkflow(BaseModel):
             json.JSONDecodeError: If the file is not valid JSON.
             IOError: If there are other file reading issues.
         """
+        if _is_binary_file(file_name=file_name):
+            return cls.load_binary_file(file_name=file_name, fast=fast or stream)
         logger.info(f"Loading workflow model from JSON file: {file_name}")
         try:
-            file_content = Path(file_name).read_text(encoding="utf-8")
-            # Delegate validation to the string loading method
-            return cls.load_json_str(file_content)
+            if stream:
+                workflow_dict: dict[str, Any] = {"version": None, "nodes": []}
+
+                def iter_edges() -> Iterator[dict]:
+                    for key, value in cls.iter_json_file(file_name=file_name):
+                        if key == "edges":
+                            yield value
+                        elif key == "nodes":
+                            workflow_dict[key].append(value)
+                        else:
+                            workflow_dict[key] = value
+
+                # the edges are indexed as they are read, none of the edge
+                # dictionaries are kept
+                workflow_dict["edges"] = EdgeTable.from_edges(iter_edges())
+            else:
+                file_content = Path(file_name).read_text(encoding="utf-8")
+                # Delegate validation to the string loading method
+                workflow_dict = cls.load_json_str(file_content, fast=fast)
+            # arrays stored next to the JSON file are memory mapped
+            return _load_input_arrays(
+                workflow_dict=workflow_dict, directory=Path(file_name).parent
+            )
         except FileNotFoundError:
             logger.error(f"JSON file not found: {file_name}", exc_info=True)
             raise
@@ -4,12 +4,11 @@ import networkx as nx
 from IPython.display import SVG, display
 
 from python_workflow_definition.models import PythonWorkflowDefinitionWorkflow
-from python_workflow_definition.purepython import group_edges
 from python_workflow_definition.shared import (
-    EDGES_LABEL,
     NODES_LABEL,
     SOURCE_LABEL,
     SOURCE_PORT_LABEL,
+    WorkflowGraph,
     convert_nodes_list_to_dict,
 )
 
@@ -19,7 +18,7 @@ def plot(file_name: str):
 
     graph = nx.DiGraph()
     node_dict = convert_nodes_list_to_dict(nodes_list=content[NODES_LABEL])
-    total_lst = group_edges(edges_lst=content[EDGES_LABEL])
+    total_lst = WorkflowGraph(workflow_dict=content).get_total_dict().items()
 
     for node_id, node_name in node_dict.items():
         graph.add_node(node_id, name=str(node_name), label=str(node_name))
@@ -1,52 +1,33 @@
-from importlib import import_module
+import contextlib
+from concurrent.futures import Executor
+from functools import partial
 from inspect import isfunction
 from typing import Any
 
+from python_workflow_definition.cache import (
+    ResultCache,
+    get_function_hash,
+    get_node_hash,
+)
 from python_workflow_definition.models import PythonWorkflowDefinitionWorkflow
 from python_workflow_definition.shared import (
-    EDGES_LABEL,
     NODES_LABEL,
     SOURCE_LABEL,
     SOURCE_PORT_LABEL,
-    TARGET_LABEL,
+    WorkflowGraph,
     convert_nodes_list_to_dict,
-    get_kwargs,
+    get_container_nodes,
+    get_function,
+    get_output_link,
+    get_ready_sets,
+    get_value_hash,
+    import_modules,
+    inline_container_nodes,
     remove_result,
+    resolve_link,
 )
 
 
-def resort_total_lst(total_lst: list, nodes_dict: dict) -> list:
-    nodes_with_dep_lst = sorted([v[0] for v in total_lst])
-    nodes_without_dep_lst = [k for k in nodes_dict if k not in nodes_with_dep_lst]
-    ordered_lst: list = []
-    total_new_lst: list[list] = []
-    while len(total_new_lst) < len(total_lst):
-        for ind, connect in total_lst:
-            if ind not in ordered_lst:
-                source_lst = [sd[SOURCE_LABEL] for sd in connect.values()]
-                if all(
-                    s in ordered_lst or s in nodes_without_dep_lst for s in source_lst
-                ):
-                    ordered_lst.append(ind)
-                    total_new_lst.append([ind, connect])
-    return total_new_lst
-
-
-def group_edges(edges_lst: list) -> list:
-    edges_sorted_lst = sorted(edges_lst, key=lambda x: x[TARGET_LABEL], reverse=True)
-    total_lst, tmp_lst = [], []
-    target_id = edges_sorted_lst[0][TARGET_LABEL]
-    for ed in edges_sorted_lst:
-        if target_id == ed[TARGET_LABEL]:
-            tmp_lst.append(ed)
-        else:
-            total_lst.append((target_id, get_kwargs(lst=tmp_lst)))
-            target_id = ed[TARGET_LABEL]
-            tmp_lst = [ed]
-    total_lst.append((target_id, get_kwargs(lst=tmp_lst)))
-    return total_lst
-
-
 def _get_value(result_dict: dict, nodes_new_dict: dict, link_dict: dict):
     source, source_handle = link_dict[SOURCE_LABEL], link_dict[SOURCE_PORT_LABEL]
     if source in result_dict:
@@ -61,39 +42,77 @@ def _get_value(result_dict: dict, nodes_new_dict: dict, link_dict: dict):
         return result[source_handle]
 
 
-def load_workflow_json(file_name: str):
-    content = remove_result(
-        workflow_dict=PythonWorkflowDefinitionWorkflow.load_json_file(
-            file_name=file_name
-        )
-    )
+def load_workflow_json(
+    file_name: str,
+    exe: Executor | None = None,
+    cache: ResultCache | None = None,
+    inline_containers: bool = False,
+):
+    workflow_dict = PythonWorkflowDefinitionWorkflow.load_json_file(file_name=file_name)
+    output_link = get_output_link(workflow_dict=workflow_dict)
+    content = remove_result(workflow_dict=workflow_dict)
 
-    edges_new_lst = content[EDGES_LABEL]
     nodes_new_dict = {}
+    import_modules(nodes_list=content[NODES_LABEL])
     nodes_types_dict = {int(n["id"]): n["type"] for n in content[NODES_LABEL]}
     for k, v in convert_nodes_list_to_dict(nodes_list=content[NODES_LABEL]).items():
         if nodes_types_dict[int(k)] == "function" and isinstance(v, str) and "." in v:
-            p, m = v.rsplit(".", 1)
-            mod = import_module(p)
-            nodes_new_dict[int(k)] = getattr(mod, m)
+            nodes_new_dict[int(k)] = get_function(function_path=v)
         else:
             nodes_new_dict[int(k)] = v
 
-    total_lst = group_edges(edges_new_lst)
-    total_new_lst = resort_total_lst(total_lst=total_lst, nodes_dict=nodes_new_dict)
-
+    total_dict = WorkflowGraph(workflow_dict=content).get_total_dict()
+    if inline_containers:
+        total_dict = inline_container_nodes(
+            total_dict=total_dict,
+            container_dict=get_container_nodes(nodes_list=content[NODES_LABEL]),
+        )
+    hash_dict: dict[Any, str] = {}
+    if cache is not None:
+        hash_dict = {
+            k: (
+                get_function_hash(function=v)
+                if isfunction(v)
+                else get_value_hash(v).hex()
+            )
+            for k, v in nodes_new_dict.items()
+            if k not in total_dict
+        }
     result_dict: dict[Any, Any] = {}
-    last_key = None
-    for lst in total_new_lst:
-        node = nodes_new_dict[lst[0]]
-        if isfunction(node):
-            kwargs = {
-                k: _get_value(
-                    result_dict=result_dict, nodes_new_dict=nodes_new_dict, link_dict=v
+    for ready_lst in get_ready_sets(total_dict=total_dict, nodes_dict=nodes_new_dict):
+        function_lst = [ind for ind in ready_lst if isfunction(nodes_new_dict[ind])]
+        if cache is not None:
+            for ind in function_lst:
+                hash_dict[ind] = get_node_hash(
+                    function=nodes_new_dict[ind],
+                    link_dict=total_dict[ind],
+                    hash_dict=hash_dict,
                 )
-                for k, v in lst[1].items()
+                with contextlib.suppress(KeyError):
+                    result_dict[ind] = cache.load(key=hash_dict[ind])
+        get_value = partial(_get_value, result_dict, nodes_new_dict)
+        kwargs_dict = {
+            ind: {
+                k: resolve_link(link_dict=v, get_value=get_value)
+                for k, v in total_dict[ind].items()
             }
-            result_dict[lst[0]] = node(**kwargs)
-            last_key = lst[0]
+            for ind in function_lst
+            if ind not in result_dict
+        }
+        if exe is None:
+            for ind, kwargs in kwargs_dict.items():
+                result_dict[ind] = nodes_new_dict[ind](**kwargs)
+        else:
+            future_dict = {
+                ind: exe.submit(nodes_new_dict[ind], **kwargs)
+                for ind, kwargs in kwargs_dict.items()
+            }
+            for ind, future in future_dict.items():
+                result_dict[ind] = future.result()
+        if cache is not None:
+            for ind in kwargs_dict:
+                cache.store(key=hash_dict[ind], value=result_dict[ind])
 
-    return result_dict[last_key]
+    return _get_value(
+        result_dict=result_dict, nodes_new_dict=nodes_new_dict, link_dict=output_link
+    )
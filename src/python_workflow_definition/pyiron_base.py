@@ -1,8 +1,7 @@
-from importlib import import_module
 from inspect import isfunction
 from typing import Any
+from weakref import WeakKeyDictionary
 
-import numpy as np
 from pyiron_base import Project, job
 from pyiron_base.project.delayed import DelayedObject
 
@@ -10,51 +9,42 @@ from python_workflow_definition.models import PythonWorkflowDefinitionWorkflow
 from python_workflow_definition.shared import (
     EDGES_LABEL,
     NODES_LABEL,
+    RESOURCES_LABEL,
     SOURCE_LABEL,
     SOURCE_PORT_LABEL,
     TARGET_LABEL,
     TARGET_PORT_LABEL,
     VERSION_LABEL,
     VERSION_NUMBER,
+    WorkflowGraph,
     convert_nodes_list_to_dict,
-    get_kwargs,
-    get_source_handles,
+    get_container_nodes,
+    get_function,
+    get_input_value,
+    get_object_identity,
+    get_resources_dict,
+    get_value_hash,
+    get_value_key,
+    import_modules,
+    inline_container_nodes,
     remove_result,
+    resolve_link,
     set_result_node,
+    topological_sort,
     update_node_names,
 )
 
+# the pyiron server does not record which fields were set, so the fields set by
+# load_workflow_json() are tracked to export an explicit cores=1 or threads=1
+_server_kwargs_dict: WeakKeyDictionary = WeakKeyDictionary()
+
 
 def _resort_total_lst(total_lst: list, nodes_dict: dict) -> list:
-    nodes_with_dep_lst = sorted([v[0] for v in total_lst])
-    nodes_without_dep_lst = [k for k in nodes_dict if k not in nodes_with_dep_lst]
-    ordered_lst: list = []
-    total_new_lst: list[list] = []
-    while len(total_new_lst) < len(total_lst):
-        for ind, connect in total_lst:
-            if ind not in ordered_lst:
-                source_lst = [sd[SOURCE_LABEL] for sd in connect.values()]
-                if all(
-                    s in ordered_lst or s in nodes_without_dep_lst for s in source_lst
-                ):
-                    ordered_lst.append(ind)
-                    total_new_lst.append([ind, connect])
-    return total_new_lst
-
-
-def _group_edges(edges_lst: list) -> list:
-    edges_sorted_lst = sorted(edges_lst, key=lambda x: x[TARGET_LABEL], reverse=True)
-    total_lst, tmp_lst = [], []
-    target_id = edges_sorted_lst[0][TARGET_LABEL]
-    for ed in edges_sorted_lst:
-        if target_id == ed[TARGET_LABEL]:
-            tmp_lst.append(ed)
-        else:
-            total_lst.append((target_id, get_kwargs(lst=tmp_lst)))
-            target_id = ed[TARGET_LABEL]
-            tmp_lst = [ed]
-    total_lst.append((target_id, get_kwargs(lst=tmp_lst)))
-    return total_lst
+    total_dict = dict(total_lst)
+    return [
+        [ind, total_dict[ind]]
+        for ind in topological_sort(total_dict=total_dict, nodes_dict=nodes_dict)
+    ]
 
 
 def _get_source(
@@ -70,18 +60,78 @@ def _get_source(
         return nodes_dict[source]
 
 
+def _get_server_kwargs(resources: dict) -> dict:
+    server_kwargs = {
+        "cores": resources.get("cores"),
+        "threads": resources.get("threads"),
+        "gpus": resources.get("gpus"),
+        "run_time": resources.get("walltime"),
+    }
+    if resources.get("memory") is not None:
+        server_kwargs["memory_limit"] = str(resources["memory"]) + "MB"
+    return {k: v for k, v in server_kwargs.items() if v is not None}
+
+
+def _get_memory(memory_limit) -> int | None:
+    # a number without a unit is in megabytes, like the memory of the resources
+    if memory_limit is None:
+        return None
+    memory_str = str(memory_limit).strip().upper()
+    factor_dict = {"GB": 1024, "MB": 1}
+    factor = factor_dict.get(memory_str[-2:], 1)
+    if memory_str[-2:] in factor_dict:
+        memory_str = memory_str[:-2]
+    try:
+        return int(float(memory_str) * factor)
+    except ValueError:
+        raise ValueError(
+            f"The memory_limit {memory_limit!r} of the server is neither a number "
+            "of megabytes nor a value in MB or GB."
+        ) from None
+
+
+def _get_resources(server) -> dict | None:
+    # a value of 1 is the pyiron default for the cores and the threads
+    server_kwargs_set = _server_kwargs_dict.get(server, set())
+    resources = {
+        "cores": (
+            server.cores if server.cores != 1 or "cores" in server_kwargs_set else None
+        ),
+        "threads": (
+            server.threads
+            if server.threads != 1 or "threads" in server_kwargs_set
+            else None
+        ),
+        "gpus": server.gpus,
+        "walltime": server.run_time,
+    }
+    resources["memory"] = _get_memory(memory_limit=server.memory_limit)
+    resources = {k: v for k, v in resources.items() if v is not None}
+    if len(resources) > 0:
+        return resources
+    else:
+        return None
+
+
 def _get_delayed_object_dict(
-    total_lst: list, nodes_dict: dict, source_handle_dict: dict, pyiron_project: Project
+    total_lst: list,
+    nodes_dict: dict,
+    source_handle_dict: dict,
+    resources_dict: dict,
+    pyiron_project: Project,
 ) -> dict:
     delayed_object_dict: dict[Any, DelayedObject] = {}
     for item in total_lst:
         key, input_dict = item
         kwargs = {
-            k: _get_source(
-                nodes_dict=nodes_dict,
-                delayed_object_dict=delayed_object_dict,
-                source=v[SOURCE_LABEL],
-                source_handle=v[SOURCE_PORT_LABEL],
+            k: resolve_link(
+                link_dict=v,
+                get_value=lambda link: _get_source(
+                    nodes_dict=nodes_dict,
+                    delayed_object_dict=delayed_object_dict,
+                    source=link[SOURCE_LABEL],
+                    source_handle=link[SOURCE_PORT_LABEL],
+                ),
             )
             for k, v in input_dict.items()
         }
@@ -89,6 +139,11 @@ def _get_delayed_object_dict(
             funct=nodes_dict[key],
             output_key_lst=source_handle_dict.get(key, []),
         )(**kwargs, pyiron_project=pyiron_project)
+        server_kwargs = _get_server_kwargs(resources=resources_dict.get(key, {}))
+        for k, v in server_kwargs.items():
+            setattr(delayed_object_dict[key].server, k, v)
+        if len(server_kwargs) > 0:
+            _server_kwargs_dict[delayed_object_dict[key].server] = set(server_kwargs)
     return delayed_object_dict
 
 
@@ -101,10 +156,10 @@ def get_list(**kwargs) -> list:
 
 
 def _remove_server_obj(nodes_dict: dict, edges_lst: list):
-    server_lst = [k for k in nodes_dict if k.startswith("_server_obj_")]
-    for s in server_lst:
+    server_set = {k for k in nodes_dict if k.startswith("_server_obj_")}
+    for s in server_set:
         del nodes_dict[s]
-        edges_lst = [ep for ep in edges_lst if s not in ep]
+    edges_lst = [ep for ep in edges_lst if not any(el in server_set for el in ep)]
     return nodes_dict, edges_lst
 
 
@@ -115,6 +170,16 @@ def _get_nodes(connection_dict: dict, delayed_object_updated_dict: dict):
     }
 
 
+def _get_structural_key(delayed_object: DelayedObject) -> tuple:
+    return (
+        delayed_object._python_function,
+        get_value_key(
+            value={str(k): v for k, v in delayed_object._input.items()},
+            default=get_object_identity,
+        ),
+    )
+
+
 def _get_unique_objects(nodes_dict: dict):
     delayed_object_dict = {}
     for k, v in nodes_dict.items():
@@ -133,34 +198,28 @@ def _get_unique_objects(nodes_dict: dict):
             )
             delayed_object_dict[k]._python_function = get_dict
             delayed_object_dict[k]._input = v
-    unique_lst: list = []
+    unique_dict: dict[tuple, Any] = {}
     delayed_object_updated_dict: dict[Any, DelayedObject] = {}
     match_dict: dict[Any, Any] = {}
     for dobj, v in delayed_object_dict.items():
-        match = False
-        for obj in unique_lst:
-            if (
-                delayed_object_updated_dict[obj]._python_function == v._python_function
-                and v._input == delayed_object_dict[obj]._input
-            ):
-                delayed_object_updated_dict[obj] = delayed_object_dict[obj]
-                match_dict[dobj] = obj
-                match = True
-                break
-        if not match:
-            unique_lst.append(dobj)
+        key = _get_structural_key(delayed_object=v)
+        if key in unique_dict:
+            match_dict[dobj] = unique_dict[key]
+        else:
+            unique_dict[key] = dobj
             delayed_object_updated_dict[dobj] = v
     update_dict = {}
+    intern_dict: dict[bytes, Any] = {}
     for k, v in nodes_dict.items():
-        if not (
-            isinstance(v, DelayedObject)
-            or (isinstance(v, list) and any(isinstance(el, DelayedObject) for el in v))
-            or (
-                isinstance(v, dict)
-                and any(isinstance(el, DelayedObject) for el in v.values())
-            )
-        ):
-            update_dict[k] = v
+        if k not in delayed_object_dict:
+            # input nodes with the same value are merged like the delayed objects,
+            # objects without a canonical JSON representation only with themselves
+            value_hash = get_value_hash(v, default=get_object_identity)
+            if value_hash in intern_dict:
+                match_dict[k] = intern_dict[value_hash]
+            else:
+                intern_dict[value_hash] = k
+                update_dict[k] = v
     delayed_object_updated_dict.update(update_dict)
     return delayed_object_updated_dict, match_dict
 
@@ -185,13 +244,13 @@ def _get_edges_dict(
     edges_lst: list, nodes_dict: dict, connection_dict: dict, lookup_dict: dict
 ):
     edges_dict_lst = []
-    existing_connection_lst = []
+    existing_connection_set = set()
     for ep in edges_lst:
         input_name, output_name = ep
         target = connection_dict[input_name]
         target_handle = "_".join(output_name.split("_")[:-1])
         connection_name = lookup_dict[target] + "_" + target_handle
-        if connection_name not in existing_connection_lst:
+        if connection_name not in existing_connection_set:
             output = nodes_dict[output_name]
             if isinstance(output, DelayedObject):
                 if output._list_index is not None:
@@ -221,11 +280,13 @@ def _get_edges_dict(
                         SOURCE_PORT_LABEL: None,
                     }
                 )
-            existing_connection_lst.append(connection_name)
+            existing_connection_set.add(connection_name)
     return edges_dict_lst
 
 
-def load_workflow_json(file_name: str, project: Project | None = None):
+def load_workflow_json(
+    file_name: str, project: Project | None = None, inline_containers: bool = False
+):
     if project is None:
         project = Project(".")
 
@@ -235,7 +296,8 @@ def load_workflow_json(file_name: str, project: Project | None = None):
         )
     )
 
-    edges_new_lst = content[EDGES_LABEL]
+    graph = WorkflowGraph(workflow_dict=content)
+    import_modules(nodes_list=content[NODES_LABEL])
     nodes_types_dict = {int(n["id"]): n["type"] for n in content[NODES_LABEL]}
     nodes_new_dict = {}
     for k, v in convert_nodes_list_to_dict(nodes_list=content[NODES_LABEL]).items():
@@ -243,25 +305,33 @@ def load_workflow_json(file_name: str, project: Project | None = None):
             p, m = v.rsplit(".", 1)
             if p == "python_workflow_definition.shared":
                 p = "python_workflow_definition.pyiron_base"
-            mod = import_module(p)
-            nodes_new_dict[int(k)] = getattr(mod, m)
+            nodes_new_dict[int(k)] = get_function(function_path=p + "." + m)
         else:
             nodes_new_dict[int(k)] = v
 
-    total_lst = _group_edges(edges_new_lst)
+    total_dict = graph.get_total_dict()
+    if inline_containers:
+        total_dict = inline_container_nodes(
+            total_dict=total_dict,
+            container_dict=get_container_nodes(nodes_list=content[NODES_LABEL]),
+        )
+    total_lst = list(total_dict.items())
     total_new_lst = _resort_total_lst(total_lst=total_lst, nodes_dict=nodes_new_dict)
-    source_handle_dict = get_source_handles(edges_new_lst)
+    source_handle_dict = graph.get_source_handles()
     delayed_object_dict = _get_delayed_object_dict(
         total_lst=total_new_lst,
         nodes_dict=nodes_new_dict,
         source_handle_dict=source_handle_dict,
+        resources_dict=get_resources_dict(nodes_list=content[NODES_LABEL]),
         pyiron_project=project,
     )
     return list(delayed_object_dict.values())
 
 
 def write_workflow_json(
-    delayed_object: DelayedObject, file_name: str = "workflow.json"
+    delayed_object: DelayedObject,
+    file_name: str = "workflow.json",
+    array_threshold: int | None = None,
 ):
     nodes_dict, edges_lst = delayed_object.get_graph()
     nodes_dict, edges_lst = _remove_server_obj(
@@ -282,6 +352,12 @@ def write_workflow_json(
         lookup_dict=lookup_dict,
     )
 
+    resources_dict = {
+        connection_dict[k]: _get_resources(server=v.server)
+        for k, v in delayed_object_updated_dict.items()
+        if isinstance(v, DelayedObject)
+    }
+
     nodes_store_lst = []
     translate_dict = {}
     for i, k in enumerate(list(nodes_new_dict.keys())[::-1]):
@@ -291,15 +367,25 @@ def write_workflow_json(
             mod = v.__module__
             if mod == "python_workflow_definition.pyiron_base":
                 mod = "python_workflow_definition.shared"
+            function_node_dict = {
+                "id": i,
+                "type": "function",
+                "value": mod + "." + v.__name__,
+            }
+            if resources_dict.get(k) is not None:
+                function_node_dict[RESOURCES_LABEL] = resources_dict[k]
+            nodes_store_lst.append(function_node_dict)
+        else:
             nodes_store_lst.append(
-                {"id": i, "type": "function", "value": mod + "." + v.__name__}
+                {
+                    "id": i,
+                    "type": "input",
+                    "value": get_input_value(
+                        value=v, file_name=file_name, array_threshold=array_threshold
+                    ),
+                }
             )
-        elif isinstance(v, np.ndarray):
-            nodes_store_lst.append({"id": i, "type": "input", "value": v.tolist()})
-        else:
-            nodes_store_lst.append({"id": i, "type": "input", "value": v})
 
-    print(translate_dict)
     edges_store_lst = [
         {
             TARGET_LABEL: translate_dict[edge[TARGET_LABEL]],
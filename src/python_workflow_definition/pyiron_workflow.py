@@ -1,9 +1,10 @@
+import inspect
 from collections import Counter
-from importlib import import_module
+from collections.abc import Callable
+from functools import cache
 from inspect import isfunction
 from typing import Any
 
-import numpy as np
 from pyiron_workflow._legacy import Workflow, function_node
 from pyiron_workflow._legacy.api import Function
 
@@ -17,7 +18,13 @@ from python_workflow_definition.shared import (
     TARGET_PORT_LABEL,
     VERSION_LABEL,
     VERSION_NUMBER,
+    WorkflowGraph,
     get_dict,
+    get_function,
+    get_input_value,
+    get_value_hash,
+    import_modules,
+    intern_value,
     remove_result,
     set_result_node,
     update_node_names,
@@ -43,17 +50,13 @@ def get_linked_nodes(graph_dict):
 
 
 def extend_nodes_dict(nodes_dict, input_dict):
-    i = len(nodes_dict)
     nodes_links_dict = {}
-    nodes_values_str_lst = [str(s) for s in nodes_dict.values()]
+    intern_dict: dict[bytes, int] = {}
     for val_dict in input_dict.values():
         for k, v in val_dict.items():
-            if str(v) not in nodes_values_str_lst:
-                nodes_dict[i] = v
-                nodes_links_dict[k] = i
-                i += 1
-            else:
-                nodes_links_dict[k] = {tv: tk for tk, tv in nodes_dict.items()}[v]
+            nodes_links_dict[k] = intern_value(
+                value=v, nodes_dict=nodes_dict, intern_dict=intern_dict
+            )
     return nodes_links_dict
 
 
@@ -85,7 +88,11 @@ def get_edges(graph_dict, node_mapping_dict, nodes_links_dict):
     return edges_lst
 
 
-def write_workflow_json(graph_as_dict: dict, file_name: str = "workflow.json"):
+def write_workflow_json(
+    graph_as_dict: dict,
+    file_name: str = "workflow.json",
+    array_threshold: int | None = None,
+):
     nodes_dict, node_mapping_dict, input_dict = get_linked_nodes(
         graph_dict=graph_as_dict
     )
@@ -101,12 +108,16 @@ def write_workflow_json(graph_as_dict: dict, file_name: str = "workflow.json"):
         if isfunction(v) and "pyiron_workflow" in v.__module__:
             pyiron_workflow_modules[k] = v
 
-    cache_mapping_dict, remap_dict = {}, {}
+    cache_mapping_dict: dict[bytes, int] = {}
+    remap_dict = {}
     for k, v in nodes_dict.items():
-        if not isfunction(v) and str(v) not in cache_mapping_dict:
-            cache_mapping_dict[str(v)] = k
-        elif not isfunction(v):
-            remap_dict[k] = cache_mapping_dict[str(v)]
+        if isfunction(v):
+            continue
+        value_hash = get_value_hash(v)
+        if value_hash not in cache_mapping_dict:
+            cache_mapping_dict[value_hash] = k
+        else:
+            remap_dict[k] = cache_mapping_dict[value_hash]
 
     item_node_lst = [
         e[SOURCE_LABEL]
@@ -152,10 +163,16 @@ def write_workflow_json(graph_as_dict: dict, file_name: str = "workflow.json"):
             nodes_store_lst.append(
                 {"id": k, "type": "function", "value": mod + "." + v.__name__}
             )
-        elif isinstance(v, np.ndarray):
-            nodes_store_lst.append({"id": k, "type": "input", "value": v.tolist()})
         else:
-            nodes_store_lst.append({"id": k, "type": "input", "value": v})
+            nodes_store_lst.append(
+                {
+                    "id": k,
+                    "type": "input",
+                    "value": get_input_value(
+                        value=v, file_name=file_name, array_threshold=array_threshold
+                    ),
+                }
+            )
         nodes_final_order_dict[i] = k
 
     remap_get_list_remove_edges = [
@@ -283,34 +300,70 @@ def write_workflow_json(graph_as_dict: dict, file_name: str = "workflow.json"):
 
 
 def import_from_string(library_path: str) -> Any:
-    # Copied from bagofholding
-    split_path = library_path.split(".", 1)
-    if len(split_path) == 1:
-        module_name, path = split_path[0], ""
+    return get_function(function_path=library_path)
+
+
+@cache
+def get_container_function(function_name: str, port_tuple: tuple) -> Callable:
+    """
+    Build the get_dict() or get_list() function for a container node. The explicit
+    signature defines the input channels of the pyiron_workflow node, the functions
+    are cached and shared between all containers with the same ports.
+
+    Args:
+        function_name (str): Either "get_dict" or "get_list".
+        port_tuple (tuple): Names of the input ports in the order of the container.
+
+    Returns:
+        callable: Function returning the dictionary or list of its arguments.
+    """
+    if function_name == "get_dict":
+
+        def get_dict(**kwargs) -> dict:
+            return {port: kwargs[port] for port in port_tuple}
+
+        function: Callable = get_dict
+    elif function_name == "get_list":
+
+        def get_list(**kwargs) -> list:
+            return [kwargs[port] for port in port_tuple]
+
+        function = get_list
     else:
-        module_name, path = split_path
-    obj = import_module(module_name)
-    for k in path.split("."):
-        obj = getattr(obj, k)
-    return obj
+        raise ValueError("Unknown container function " + function_name + ".")
+    function.__signature__ = inspect.Signature(  # type: ignore[attr-defined]
+        [
+            inspect.Parameter(port, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+            for port in port_tuple
+        ]
+    )
+    return function
+
 
+def generate_get_dict_function(args_of_lst: list) -> Callable:
+    """
+    Args:
+        args_of_lst (list): Names of the input ports of the get_dict() node.
 
-def generate_get_dict_function(args_of_lst):
-    lines = "def get_dict(" + ", ".join(args_of_lst) + "):\n"
-    lines += "    return {\n"
-    for parameter in args_of_lst:
-        lines += '        "' + parameter + '": ' + parameter + ",\n"
-    lines += "    }"
-    return lines
+    Returns:
+        callable: The cached function of get_container_function().
+    """
+    return get_container_function(
+        function_name="get_dict", port_tuple=tuple(args_of_lst)
+    )
 
 
-def generate_get_list_function(args_of_lst):
-    lines = "def get_list(" + ", ".join(args_of_lst) + "):\n"
-    lines += "    return [\n"
-    for parameter in args_of_lst:
-        lines += "        " + parameter + ",\n"
-    lines += "    ]"
-    return lines
+def generate_get_list_function(args_of_lst: list) -> Callable:
+    """
+    Args:
+        args_of_lst (list): Names of the input ports of the get_list() node.
+
+    Returns:
+        callable: The cached function of get_container_function().
+    """
+    return get_container_function(
+        function_name="get_list", port_tuple=tuple(args_of_lst)
+    )
 
 
 def load_workflow_json(file_name: str) -> Workflow:
@@ -318,6 +371,8 @@ def load_workflow_json(file_name: str) -> Workflow:
         PythonWorkflowDefinitionWorkflow.load_json_file(file_name=file_name)
     )
 
+    import_modules(nodes_list=content[NODES_LABEL])
+    graph = WorkflowGraph(workflow_dict=content)
     input_values: dict[int, object] = {}
     nodes: dict[int, Function] = {}
     total_counter_dict = Counter(
@@ -329,27 +384,17 @@ def load_workflow_json(file_name: str) -> Workflow:
     for node_dict in content[NODES_LABEL]:
         if node_dict["type"] == "function":
             if node_dict["value"] == "python_workflow_definition.shared.get_dict":
-                exec(
-                    generate_get_dict_function(
-                        args_of_lst=[
-                            edge[TARGET_PORT_LABEL]
-                            for edge in content[EDGES_LABEL]
-                            if edge[TARGET_LABEL] == node_dict["id"]
-                        ]
-                    )
+                fnc = get_container_function(
+                    function_name="get_dict",
+                    port_tuple=tuple(graph.get_target_ports(node_dict["id"])),
                 )
-                fnc = eval("get_dict")
             elif node_dict["value"] == "python_workflow_definition.shared.get_list":
-                exec(
-                    generate_get_list_function(
-                        args_of_lst=[
-                            "s_" + edge[TARGET_PORT_LABEL]
-                            for edge in content[EDGES_LABEL]
-                            if edge[TARGET_LABEL] == node_dict["id"]
-                        ]
-                    )
+                fnc = get_container_function(
+                    function_name="get_list",
+                    port_tuple=tuple(
+                        "s_" + port for port in graph.get_target_ports(node_dict["id"])
+                    ),
                 )
-                fnc = eval("get_list")
             else:
                 fnc = import_from_string(node_dict["value"])
             if total_counter_dict[node_dict["value"]] > 1:
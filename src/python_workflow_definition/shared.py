@@ -1,6 +1,18 @@
+import hashlib
+import json
+import os
+import sys
+import time
+from array import array
 from collections import Counter
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from importlib import import_module
 from typing import Any
 
+import numpy as np
+
 NODES_LABEL = "nodes"
 EDGES_LABEL = "edges"
 SOURCE_LABEL = "source"
@@ -9,6 +21,10 @@ TARGET_LABEL = "target"
 TARGET_PORT_LABEL = "targetPort"
 VERSION_NUMBER = "0.1.0"
 VERSION_LABEL = "version"
+RESOURCES_LABEL = "resources"
+FUNCTION_LABEL = "function"
+KWARGS_LABEL = "kwargs"
+ARRAY_LABEL = "@array"
 
 
 def get_dict(**kwargs) -> dict:
@@ -29,7 +45,9 @@ def get_kwargs(lst: list) -> dict:
     }
 
 
-def get_source_handles(edges_lst: list) -> dict:
+def get_source_handles(edges_lst: "list | EdgeTable") -> dict:
+    if isinstance(edges_lst, EdgeTable):
+        return edges_lst.get_source_handles()
     source_handle_dict: dict[Any, list] = {}
     for ed in edges_lst:
         if ed[SOURCE_LABEL] not in source_handle_dict:
@@ -41,6 +59,701 @@ def get_source_handles(edges_lst: list) -> dict:
     }
 
 
+def _get_json_default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    elif isinstance(value, np.generic):
+        return value.item()
+    else:
+        # objects of different types with the same repr() are different values
+        value_type = type(value)
+        return {
+            "@type": value_type.__module__ + "." + value_type.__qualname__,
+            "@repr": repr(value),
+        }
+
+
+def get_value_key(value: Any, default: Callable[[Any], Any] | None = None) -> str:
+    """
+    Canonical JSON representation of an input value, which is used to intern
+    identical input values in a single input node.
+
+    Args:
+        value: Value of the input node.
+        default: Optional function converting objects, which are not JSON
+                 serializable, before the numpy arrays and the repr() fallback.
+
+    Returns:
+        JSON string with sorted keys and without whitespace.
+    """
+
+    def default_function(obj: Any) -> Any:
+        converted = obj if default is None else default(obj)
+        return _get_json_default(obj) if converted is obj else converted
+
+    return json.dumps(
+        value, sort_keys=True, separators=(",", ":"), default=default_function
+    )
+
+
+def get_object_identity(obj: Any) -> Any:
+    """
+    Default for get_value_key(), which keeps the identity of the objects without a
+    canonical JSON representation rather than comparing their repr().
+
+    Args:
+        obj: Object which is not JSON serializable.
+
+    Returns:
+        The numpy arrays and scalars unchanged, a dict with the id() of the object
+        for all other objects.
+    """
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj
+    return {"@id": id(obj)}
+
+
+def get_value_hash(value: Any, default: Callable[[Any], Any] | None = None) -> bytes:
+    """
+    Args:
+        value: Value of the input node.
+        default: Optional function converting objects, see get_value_key().
+
+    Returns:
+        SHA-256 digest of get_value_key(), so the interning tables do not keep a
+        second copy of large input values.
+    """
+    return hashlib.sha256(get_value_key(value, default=default).encode()).digest()
+
+
+def intern_value(value: Any, nodes_dict: dict, intern_dict: dict) -> int:
+    """
+    Look up the input node for a value in constant time, a new input node is added
+    to nodes_dict if no node with the same canonical value exists.
+
+    Args:
+        value: Value of the input node.
+        nodes_dict: Mapping of the consecutive node indices to the node values.
+        intern_dict: Mapping of get_value_hash() to the node indices, updated in
+                     place.
+
+    Returns:
+        Index of the input node in nodes_dict.
+    """
+    key = get_value_hash(value)
+    if key not in intern_dict:
+        intern_dict[key] = len(nodes_dict)
+        nodes_dict[len(nodes_dict)] = value
+    return intern_dict[key]
+
+
+def dump_array(value: np.ndarray, directory: str) -> dict:
+    """
+    Store an array in a .npy file next to the workflow JSON file. The file is named
+    by the hash of the content, so identical arrays share one file and files which
+    already exist are not written again.
+
+    Args:
+        value (np.ndarray): Array of the input node.
+        directory (str): Directory of the workflow JSON file.
+
+    Returns:
+        dict: Reference {ARRAY_LABEL: file name}, which replaces the value in the
+              workflow JSON file.
+    """
+    array = np.ascontiguousarray(value)
+    content_hash = hashlib.sha256((array.dtype.str + str(array.shape)).encode())
+    content_hash.update(array.data)
+    file_name = content_hash.hexdigest() + ".npy"
+    path = os.path.join(directory, file_name)
+    if not os.path.exists(path):
+        tmp_path = path + "." + str(os.getpid()) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, array, allow_pickle=False)
+        os.replace(tmp_path, path)
+    return {ARRAY_LABEL: file_name}
+
+
+def get_input_value(value: Any, file_name: str, array_threshold: int | None) -> Any:
+    """
+    Convert the value of an input node to its representation in the workflow JSON
+    file, arrays are converted to lists or stored in .npy files with dump_array().
+
+    Args:
+        value: Value of the input node.
+        file_name (str): Name of the workflow JSON file.
+        array_threshold (int): Arrays with at least this number of bytes are stored
+                               in .npy files, None keeps all arrays in the JSON file.
+
+    Returns:
+        JSON compatible value.
+    """
+    if not isinstance(value, np.ndarray):
+        return value
+    elif (
+        array_threshold is not None
+        and value.nbytes >= array_threshold
+        and not value.dtype.hasobject
+    ):
+        return dump_array(
+            value=value, directory=os.path.dirname(os.path.abspath(file_name))
+        )
+    else:
+        return value.tolist()
+
+
+def _load_array(file_name: str, directory: str) -> np.ndarray:
+    if os.path.basename(file_name) != file_name:
+        raise ValueError("The array file " + file_name + " is not a plain file name.")
+    path = os.path.join(directory, file_name)
+    try:
+        # copy on write, so the functions can still modify their arguments in place
+        return np.load(path, mmap_mode="c", allow_pickle=False)
+    except ValueError:  # empty arrays can not be memory mapped
+        return np.load(path, allow_pickle=False)
+
+
+def load_arrays(value: Any, directory: str) -> Any:
+    """
+    Replace the references written by dump_array() with the memory mapped arrays,
+    so the arrays are only read from the disk once they are accessed.
+
+    Args:
+        value: Value of the input node.
+        directory (str): Directory of the workflow JSON file.
+
+    Returns:
+        The value with the arrays.
+    """
+    if isinstance(value, dict):
+        if len(value) == 1 and isinstance(value.get(ARRAY_LABEL), str):
+            return _load_array(file_name=value[ARRAY_LABEL], directory=directory)
+        return {k: load_arrays(value=v, directory=directory) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [load_arrays(value=v, directory=directory) for v in value]
+    else:
+        return value
+
+
+def _get_csr(index_arr: np.ndarray, number_of_nodes: int) -> tuple:
+    # the edges of node i are edge_arr[pointer_arr[i] : pointer_arr[i + 1]]
+    pointer_arr = np.zeros(number_of_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(index_arr, minlength=number_of_nodes), out=pointer_arr[1:])
+    return pointer_arr, np.argsort(index_arr, kind="stable")
+
+
+class EdgeTable:
+    """
+    Columnar representation of the edges of a workflow. The target and the source
+    node ids and the indices of the target and the source ports are stored in the
+    rows of a single int32 array, the port names are interned in a list. An edge
+    takes 16 bytes instead of a dictionary with four keys.
+
+    The table behaves like the list of edge dictionaries for len(), indexing and
+    iteration, the dictionaries are built on access. to_edges() converts the whole
+    table back to the list of edge dictionaries.
+    """
+
+    def __init__(self, edge_arr: np.ndarray, port_lst: list):
+        """
+        Args:
+            edge_arr: int32 array with the rows target, target port index, source and
+                      source port index.
+            port_lst: Interned port names, including None for the default port.
+        """
+        self._edge_arr = edge_arr
+        self._port_lst = port_lst
+
+    @classmethod
+    def from_edges(cls, edges_lst: Iterable) -> "EdgeTable":
+        """
+        Args:
+            edges_lst: List or iterator of edge dictionaries with integer node ids,
+                       an iterator is consumed in a single pass.
+
+        Returns:
+            EdgeTable: Columnar representation of the edges.
+
+        Raises:
+            ValueError: If a node id does not fit into an int32.
+        """
+        port_dict: dict[Any, int] = {}
+        column_lst = [array("i") for _ in range(4)]
+        target_column, target_port_column, source_column, source_port_column = (
+            column_lst
+        )
+        try:
+            for e in edges_lst:
+                target_column.append(e[TARGET_LABEL])
+                target_port_column.append(
+                    port_dict.setdefault(e.get(TARGET_PORT_LABEL), len(port_dict))
+                )
+                source_column.append(e[SOURCE_LABEL])
+                source_port_column.append(
+                    port_dict.setdefault(e.get(SOURCE_PORT_LABEL), len(port_dict))
+                )
+        except OverflowError as e:
+            raise ValueError("The node ids do not fit into an int32 array.") from e
+        edge_arr = np.empty((4, len(target_column)), dtype=np.int32)
+        for row, column in zip(edge_arr, column_lst, strict=True):
+            row[:] = np.frombuffer(column, dtype=np.intc)
+        return cls(edge_arr=edge_arr, port_lst=list(port_dict))
+
+    @property
+    def target_arr(self) -> np.ndarray:
+        return self._edge_arr[0]
+
+    @property
+    def source_arr(self) -> np.ndarray:
+        return self._edge_arr[2]
+
+    @property
+    def nbytes(self) -> int:
+        return self._edge_arr.nbytes
+
+    def __len__(self) -> int:
+        return self._edge_arr.shape[1]
+
+    def __getitem__(self, index: int) -> dict:
+        target, target_port, source, source_port = self._edge_arr[:, index].tolist()
+        return {
+            TARGET_LABEL: target,
+            TARGET_PORT_LABEL: self._port_lst[target_port],
+            SOURCE_LABEL: source,
+            SOURCE_PORT_LABEL: self._port_lst[source_port],
+        }
+
+    def __iter__(self):
+        port_lst = self._port_lst
+        for target, target_port, source, source_port in zip(
+            *self._edge_arr.tolist(), strict=True
+        ):
+            yield {
+                TARGET_LABEL: target,
+                TARGET_PORT_LABEL: port_lst[target_port],
+                SOURCE_LABEL: source,
+                SOURCE_PORT_LABEL: port_lst[source_port],
+            }
+
+    def to_edges(self) -> list:
+        return list(self)
+
+    def append(self, edge: dict):
+        """
+        Append an edge, this copies the table, so it is only meant for single edges
+        like the one of the result node.
+
+        Args:
+            edge: Edge dictionary with integer node ids.
+        """
+        port_dict = {port: i for i, port in enumerate(self._port_lst)}
+        edge_column = [
+            edge[TARGET_LABEL],
+            port_dict.setdefault(edge.get(TARGET_PORT_LABEL), len(port_dict)),
+            edge[SOURCE_LABEL],
+            port_dict.setdefault(edge.get(SOURCE_PORT_LABEL), len(port_dict)),
+        ]
+        self._edge_arr = np.concatenate(
+            [self._edge_arr, np.array(edge_column, dtype=np.int32)[:, None]], axis=1
+        )
+        self._port_lst = list(port_dict)
+
+    def get_source_handles(self) -> dict:
+        """
+        Returns:
+            The same mapping of the nodes to their source ports as get_source_handles().
+        """
+        if len(self) == 0:
+            return {}
+        source_arr = self.source_arr
+        order_arr = np.argsort(source_arr, kind="stable")
+        sorted_source_arr = source_arr[order_arr]
+        start_arr = np.flatnonzero(
+            np.concatenate([[True], sorted_source_arr[1:] != sorted_source_arr[:-1]])
+        )
+        count_arr = np.diff(np.append(start_arr, len(source_arr)))
+        port_index_arr = self._edge_arr[3][order_arr]
+        none_index = self._port_lst.index(None) if None in self._port_lst else -1
+        all_none_arr = np.logical_and.reduceat(port_index_arr == none_index, start_arr)
+        port_lst = [self._port_lst[i] for i in port_index_arr.tolist()]
+        # the sources are ordered by their node id, like in WorkflowGraph
+        return {
+            source: (
+                list(range(count))
+                if count > 1 and all_none
+                else port_lst[start : start + count]
+            )
+            for source, start, count, all_none in zip(
+                sorted_source_arr[start_arr].tolist(),
+                start_arr.tolist(),
+                count_arr.tolist(),
+                all_none_arr.tolist(),
+                strict=True,
+            )
+        }
+
+    def get_end_nodes(self, node_ids: list) -> list:
+        """
+        Args:
+            node_ids: Integer ids of the nodes of the workflow.
+
+        Returns:
+            The node ids which are not the source of any edge, in the given order.
+        """
+        node_arr = np.asarray(node_ids, dtype=np.int64)
+        return node_arr[~np.isin(node_arr, self.source_arr)].tolist()
+
+
+def _get_index_arr(id_arr: np.ndarray, value_arr: np.ndarray) -> np.ndarray:
+    # id_arr is sorted, so the indices of the node ids are found by bisection
+    index_arr = np.searchsorted(id_arr, value_arr)
+    missing_arr = index_arr == len(id_arr)
+    missing_arr[~missing_arr] = (
+        id_arr[index_arr[~missing_arr]] != value_arr[~missing_arr]
+    )
+    if missing_arr.any():
+        raise ValueError(
+            f"An edge references node {value_arr[missing_arr][0]}, which is not part "
+            "of the workflow."
+        )
+    return index_arr
+
+
+class WorkflowGraph:
+    """
+    Index of the nodes and edges of a workflow, which is built once per workflow.
+
+    The node ids are mapped to consecutive integer indices and the incoming and the
+    outgoing edges of every node are stored in compressed sparse row (CSR) arrays,
+    so each query only touches the edges of the node it is asked for. Edges are
+    always returned in the order of the workflow.
+    """
+
+    def __init__(self, workflow_dict: dict):
+        """
+        Args:
+            workflow_dict: Workflow with the nodes and the edges, the edges are either
+                           a list of dictionaries or an EdgeTable.
+
+        Raises:
+            ValueError: If an edge references a node which is not part of the workflow.
+        """
+        self._nodes_lst = sorted(workflow_dict[NODES_LABEL], key=lambda n: n["id"])
+        self._index_dict = {n["id"]: i for i, n in enumerate(self._nodes_lst)}
+        if isinstance(workflow_dict[EDGES_LABEL], EdgeTable):
+            self._edges_lst: list | EdgeTable = workflow_dict[EDGES_LABEL]
+            id_arr = np.array([n["id"] for n in self._nodes_lst], dtype=np.int64)
+            source_arr = _get_index_arr(
+                id_arr=id_arr, value_arr=self._edges_lst.source_arr
+            )
+            target_arr = _get_index_arr(
+                id_arr=id_arr, value_arr=self._edges_lst.target_arr
+            )
+        else:
+            self._edges_lst = list(workflow_dict[EDGES_LABEL])
+            source_arr, target_arr = self._get_index_arrays()
+        self._in_pointer_arr, self._in_edge_arr = _get_csr(
+            index_arr=target_arr, number_of_nodes=len(self._nodes_lst)
+        )
+        self._out_pointer_arr, self._out_edge_arr = _get_csr(
+            index_arr=source_arr, number_of_nodes=len(self._nodes_lst)
+        )
+
+    def _get_index_arrays(self) -> tuple:
+        try:
+            source_arr = np.fromiter(
+                (self._index_dict[e[SOURCE_LABEL]] for e in self._edges_lst),
+                dtype=np.int64,
+                count=len(self._edges_lst),
+            )
+            target_arr = np.fromiter(
+                (self._index_dict[e[TARGET_LABEL]] for e in self._edges_lst),
+                dtype=np.int64,
+                count=len(self._edges_lst),
+            )
+        except KeyError as e:
+            raise ValueError(
+                f"An edge references node {e.args[0]}, which is not part of the workflow."
+            ) from None
+        return source_arr, target_arr
+
+    @property
+    def node_ids(self) -> list:
+        return [n["id"] for n in self._nodes_lst]
+
+    def get_node(self, node_id) -> dict:
+        return self._nodes_lst[self._index_dict[node_id]]
+
+    def get_in_edges(self, node_id) -> list:
+        i = self._index_dict[node_id]
+        return [
+            self._edges_lst[e]
+            for e in self._in_edge_arr[
+                self._in_pointer_arr[i] : self._in_pointer_arr[i + 1]
+            ].tolist()
+        ]
+
+    def get_out_edges(self, node_id) -> list:
+        i = self._index_dict[node_id]
+        return [
+            self._edges_lst[e]
+            for e in self._out_edge_arr[
+                self._out_pointer_arr[i] : self._out_pointer_arr[i + 1]
+            ].tolist()
+        ]
+
+    def get_predecessors(self, node_id) -> list:
+        return list(dict.fromkeys(e[SOURCE_LABEL] for e in self.get_in_edges(node_id)))
+
+    def get_successors(self, node_id) -> list:
+        return list(dict.fromkeys(e[TARGET_LABEL] for e in self.get_out_edges(node_id)))
+
+    def get_target_ports(self, node_id) -> list:
+        return list(
+            dict.fromkeys(e[TARGET_PORT_LABEL] for e in self.get_in_edges(node_id))
+        )
+
+    def get_source_ports(self, node_id) -> list:
+        return list(
+            dict.fromkeys(e[SOURCE_PORT_LABEL] for e in self.get_out_edges(node_id))
+        )
+
+    def get_kwargs(self, node_id) -> dict:
+        return get_kwargs(lst=self.get_in_edges(node_id))
+
+    def get_total_dict(self) -> dict:
+        """
+        Returns:
+            Mapping of every node with incoming edges to its keyword arguments as
+            returned by get_kwargs(), ordered by the node id.
+        """
+        in_degree_arr = np.diff(self._in_pointer_arr)
+        return {
+            self._nodes_lst[i]["id"]: self.get_kwargs(self._nodes_lst[i]["id"])
+            for i in np.flatnonzero(in_degree_arr).tolist()
+        }
+
+    def get_source_handles(self) -> dict:
+        """
+        Returns:
+            The same mapping of the nodes to their source ports as get_source_handles().
+        """
+        if isinstance(self._edges_lst, EdgeTable):
+            return self._edges_lst.get_source_handles()
+        out_degree_arr = np.diff(self._out_pointer_arr)
+        source_handle_dict = {}
+        for i in np.flatnonzero(out_degree_arr).tolist():
+            node_id = self._nodes_lst[i]["id"]
+            v = [e[SOURCE_PORT_LABEL] for e in self.get_out_edges(node_id)]
+            if len(v) > 1 and all(el is None for el in v):
+                source_handle_dict[node_id] = list(range(len(v)))
+            else:
+                source_handle_dict[node_id] = v
+        return source_handle_dict
+
+
+def get_container_nodes(nodes_list: list) -> dict:
+    container_function_dict = {
+        "python_workflow_definition.shared.get_dict": get_dict,
+        "python_workflow_definition.shared.get_list": get_list,
+    }
+    return {
+        int(n["id"]): container_function_dict[n["value"]]
+        for n in nodes_list
+        if n["type"] == "function" and n["value"] in container_function_dict
+    }
+
+
+def inline_container_nodes(total_dict: dict, container_dict: dict) -> dict:
+    """
+    Fold get_dict() and get_list() nodes into the keyword arguments of the nodes
+    which consume them, so they are not executed as separate tasks.
+
+    Args:
+        total_dict: Mapping of each target node to its keyword arguments.
+        container_dict: Mapping of the container node ids to get_dict() or get_list()
+                        as returned by get_container_nodes().
+
+    Returns:
+        Copy of total_dict without the inlined container nodes. The links to an
+        inlined container are replaced by {function: get_dict, kwargs: {port: link}}.
+        Containers which are accessed by a source port or which are not consumed by
+        another node are not inlined.
+    """
+    inline_set = {k for k in container_dict if k in total_dict}
+    consumed_set = set()
+    for connect in total_dict.values():
+        for link in connect.values():
+            if link[SOURCE_PORT_LABEL] is not None:
+                inline_set.discard(link[SOURCE_LABEL])
+            consumed_set.add(link[SOURCE_LABEL])
+    inline_set &= consumed_set
+
+    def inline_link(link: dict) -> dict:
+        source = link[SOURCE_LABEL]
+        if source in inline_set:
+            return {
+                FUNCTION_LABEL: container_dict[source],
+                KWARGS_LABEL: {
+                    k: inline_link(v) for k, v in total_dict[source].items()
+                },
+            }
+        else:
+            return link
+
+    return {
+        target: {k: inline_link(v) for k, v in connect.items()}
+        for target, connect in total_dict.items()
+        if target not in inline_set
+    }
+
+
+def get_link_sources(link_dict: dict) -> list:
+    if KWARGS_LABEL in link_dict:
+        return [
+            s for v in link_dict[KWARGS_LABEL].values() for s in get_link_sources(v)
+        ]
+    else:
+        return [link_dict[SOURCE_LABEL]]
+
+
+def resolve_link(link_dict: dict, get_value: Callable[[dict], Any]) -> Any:
+    """
+    Resolve a link, including the links inlined by inline_container_nodes().
+
+    Args:
+        link_dict: Link with source and sourcePort or an inlined container.
+        get_value: Function returning the value for a link with source and sourcePort.
+
+    Returns:
+        The value of the link.
+    """
+    if KWARGS_LABEL in link_dict:
+        return link_dict[FUNCTION_LABEL](
+            **{
+                k: resolve_link(link_dict=v, get_value=get_value)
+                for k, v in link_dict[KWARGS_LABEL].items()
+            }
+        )
+    else:
+        return get_value(link_dict)
+
+
+def get_ready_sets(total_dict: dict, nodes_dict: dict) -> list[list]:
+    """
+    Group the function nodes of a workflow into ready sets using Kahn's algorithm.
+
+    Args:
+        total_dict: Mapping of each target node to its keyword arguments as returned
+                    by get_kwargs(), i.e. {target: {port: {source, sourcePort}}}.
+        nodes_dict: Mapping of all node ids of the workflow to their values. Nodes
+                    which are not a target in total_dict have no dependencies.
+
+    Returns:
+        List of ready sets, every node in a ready set only depends on nodes in the
+        previous ready sets or on nodes without dependencies.
+
+    Raises:
+        ValueError: If a node depends on an unknown node or the graph contains a cycle.
+    """
+    successor_dict: dict[Any, list] = {k: [] for k in total_dict}
+    in_degree_dict: dict[Any, int] = {}
+    for target, connect in total_dict.items():
+        in_degree_dict[target] = 0
+        for source in {s for v in connect.values() for s in get_link_sources(v)}:
+            if source in successor_dict:
+                successor_dict[source].append(target)
+                in_degree_dict[target] += 1
+            elif source not in nodes_dict:
+                raise ValueError(
+                    f"Node {target} depends on node {source}, which is not part of the workflow."
+                )
+
+    ready_set_lst = []
+    ready_lst = [k for k, v in in_degree_dict.items() if v == 0]
+    while len(ready_lst) > 0:
+        ready_set_lst.append(ready_lst)
+        next_lst = []
+        for node in ready_lst:
+            for successor in successor_dict[node]:
+                in_degree_dict[successor] -= 1
+                if in_degree_dict[successor] == 0:
+                    next_lst.append(successor)
+        ready_lst = next_lst
+
+    if sum(len(ready_lst) for ready_lst in ready_set_lst) < len(total_dict):
+        cycle_lst = _get_cycle_nodes(
+            successor_dict=successor_dict,
+            node_set={k for k, v in in_degree_dict.items() if v > 0},
+        )
+        raise ValueError(
+            f"The workflow contains a cycle between the nodes {cycle_lst}."
+        )
+    return ready_set_lst
+
+
+def _get_cycle_nodes(successor_dict: dict, node_set: set) -> list:
+    # Tarjan's algorithm on the nodes which were never ready, only the strongly
+    # connected components with a cycle are reported, not the nodes downstream of
+    # them. It is iterative, so long chains do not reach the recursion limit.
+    index_dict: dict[Any, int] = {}
+    low_dict: dict[Any, int] = {}
+    stack_lst: list = []
+    stack_set: set = set()
+    cycle_lst: list = []
+    for root in node_set:
+        if root in index_dict:
+            continue
+        index_dict[root] = low_dict[root] = len(index_dict)
+        stack_lst.append(root)
+        stack_set.add(root)
+        work_lst = [(root, iter(successor_dict[root]))]
+        while len(work_lst) > 0:
+            node, successor_iter = work_lst[-1]
+            for successor in successor_iter:
+                if successor not in node_set:
+                    continue
+                elif successor not in index_dict:
+                    index_dict[successor] = low_dict[successor] = len(index_dict)
+                    stack_lst.append(successor)
+                    stack_set.add(successor)
+                    work_lst.append((successor, iter(successor_dict[successor])))
+                    break
+                elif successor in stack_set:
+                    low_dict[node] = min(low_dict[node], index_dict[successor])
+            else:
+                work_lst.pop()
+                if len(work_lst) > 0:
+                    parent = work_lst[-1][0]
+                    low_dict[parent] = min(low_dict[parent], low_dict[node])
+                if low_dict[node] == index_dict[node]:
+                    component_lst: list[Any] = []
+                    while len(component_lst) == 0 or component_lst[-1] != node:
+                        component_lst.append(stack_lst.pop())
+                        stack_set.discard(component_lst[-1])
+                    if len(component_lst) > 1 or node in successor_dict[node]:
+                        cycle_lst += component_lst
+    return sorted(cycle_lst)
+
+
+def topological_sort(total_dict: dict, nodes_dict: dict) -> list:
+    """
+    Order the function nodes of a workflow so each node follows its dependencies.
+
+    Args:
+        total_dict: Mapping of each target node to its keyword arguments.
+        nodes_dict: Mapping of all node ids of the workflow to their values.
+
+    Returns:
+        List of the node ids in total_dict in execution order.
+    """
+    return [
+        node
+        for ready_lst in get_ready_sets(total_dict=total_dict, nodes_dict=nodes_dict)
+        for node in ready_lst
+    ]
+
+
 def convert_nodes_list_to_dict(nodes_list: list) -> dict:
     return {
         str(el["id"]): el["value"] if "value" in el else el["name"]
@@ -48,19 +761,98 @@ def convert_nodes_list_to_dict(nodes_list: list) -> dict:
     }
 
 
+@cache
+def get_function(function_path: str) -> Any:
+    """
+    Resolve the dotted path of a python function, by importing the longest module
+    path and accessing the remaining attributes. The result is cached per process,
+    so repeated loads of the same functions skip the resolution.
+
+    Args:
+        function_path (str): Dotted path like "workflow.get_sum".
+
+    Returns:
+        The python function.
+    """
+    part_lst = function_path.split(".")
+    for i in range(max(len(part_lst) - 1, 1), 0, -1):
+        module_name = ".".join(part_lst[:i])
+        try:
+            obj = import_module(module_name)
+        except ModuleNotFoundError as error:
+            # only continue with the parent module, if the module itself is missing
+            if i == 1 or error.name != module_name:
+                raise
+            continue
+        for attribute in part_lst[i:]:
+            obj = getattr(obj, attribute)
+        return obj
+    raise ValueError("Invalid function path " + function_path + ".")
+
+
+_import_time_dict: dict[str, float] = {}
+
+
+def _import_module_with_time(module_name: str) -> float | None:
+    start_time = time.perf_counter()
+    try:
+        import_module(module_name)
+    except Exception:
+        # failed imports are repeated by get_function(), which raises the error
+        return None
+    return time.perf_counter() - start_time
+
+
+def import_modules(nodes_list: list, max_workers: int | None = None) -> dict:
+    """
+    Import the distinct modules of the function nodes up front, modules which are
+    not yet imported are imported in parallel threads.
+
+    Args:
+        nodes_list (list): List of node dictionaries.
+        max_workers (int): Maximum number of threads, 1 to import sequentially.
+
+    Returns:
+        dict: Import time in seconds of each module, measured when the module was
+              first imported by this function, 0.0 for modules imported elsewhere.
+    """
+    module_lst = list(
+        dict.fromkeys(
+            n["value"].rsplit(".", 1)[0]
+            for n in nodes_list
+            if n["type"] == "function"
+            and isinstance(n["value"], str)
+            and "." in n["value"]
+        )
+    )
+    import_lst = [m for m in module_lst if m not in sys.modules]
+    if len(import_lst) > 1 and max_workers != 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as exe:
+            time_lst = list(exe.map(_import_module_with_time, import_lst))
+    else:
+        time_lst = [_import_module_with_time(m) for m in import_lst]
+    for m, t in zip(import_lst, time_lst, strict=True):
+        if t is not None:
+            _import_time_dict[m] = t
+    return {m: _import_time_dict.get(m, 0.0) for m in module_lst}
+
+
+def get_resources_dict(nodes_list: list) -> dict:
+    return {
+        n["id"]: n[RESOURCES_LABEL]
+        for n in nodes_list
+        if n.get(RESOURCES_LABEL) is not None
+    }
+
+
 def update_node_names(workflow_dict: dict) -> dict:
     node_names_final_dict = {}
     input_nodes = [n for n in workflow_dict[NODES_LABEL] if n["type"] == "input"]
-    node_names_dict = {
-        n["id"]: list(
-            {
-                e[TARGET_PORT_LABEL]
-                for e in workflow_dict[EDGES_LABEL]
-                if e[SOURCE_LABEL] == n["id"]
-            }
-        )[0]
-        for n in input_nodes
-    }
+    # single pass over the edges, the first target port of each source is its name
+    target_port_dict: dict[Any, str] = {}
+    for e in workflow_dict[EDGES_LABEL]:
+        target_port_dict.setdefault(e[SOURCE_LABEL], e[TARGET_PORT_LABEL])
+    node_names_dict = {n["id"]: target_port_dict[n["id"]] for n in input_nodes}
 
     counter_dict = Counter(node_names_dict.values())
     node_names_useage_dict = dict.fromkeys(counter_dict.keys(), -1)
@@ -71,20 +863,31 @@ def update_node_names(workflow_dict: dict) -> dict:
         else:
             node_names_final_dict[k] = v
 
-    for n in workflow_dict[NODES_LABEL]:
-        if n["type"] == "input":
-            n["name"] = node_names_final_dict[n["id"]]
+    for n in input_nodes:
+        n["name"] = node_names_final_dict[n["id"]]
     return workflow_dict
 
 
-def set_result_node(workflow_dict):
-    node_id_lst = [n["id"] for n in workflow_dict[NODES_LABEL]]
-    source_lst = list({e[SOURCE_LABEL] for e in workflow_dict[EDGES_LABEL]})
+def get_end_nodes(workflow_dict: dict) -> list:
+    """
+    Args:
+        workflow_dict: Workflow with the nodes and the edges, the edges can be an
+                       EdgeTable.
+
+    Returns:
+        The ids of the nodes which are not the source of any edge.
+    """
+    edges = workflow_dict[EDGES_LABEL]
+    if isinstance(edges, EdgeTable):
+        return edges.get_end_nodes(
+            node_ids=[n["id"] for n in workflow_dict[NODES_LABEL]]
+        )
+    source_set = {e[SOURCE_LABEL] for e in edges}
+    return [n["id"] for n in workflow_dict[NODES_LABEL] if n["id"] not in source_set]
 
-    end_node_lst = []
-    for ni in node_id_lst:
-        if ni not in source_lst:
-            end_node_lst.append(ni)
+
+def set_result_node(workflow_dict):
+    end_node_lst = get_end_nodes(workflow_dict=workflow_dict)
 
     node_id = len(workflow_dict[NODES_LABEL])
     workflow_dict[NODES_LABEL].append(
@@ -102,6 +905,24 @@ def set_result_node(workflow_dict):
     return workflow_dict
 
 
+def get_output_link(workflow_dict) -> dict:
+    """
+    Args:
+        workflow_dict (dict): Workflow including the output node.
+
+    Returns:
+        dict: Source and source port of the edge into the output node.
+    """
+    node_output_id = [
+        n["id"] for n in workflow_dict[NODES_LABEL] if n["type"] == "output"
+    ][0]
+    return [
+        {SOURCE_LABEL: e[SOURCE_LABEL], SOURCE_PORT_LABEL: e[SOURCE_PORT_LABEL]}
+        for e in workflow_dict[EDGES_LABEL]
+        if e[TARGET_LABEL] == node_output_id
+    ][0]
+
+
 def remove_result(workflow_dict):
     node_output_id = [
         n["id"] for n in workflow_dict[NODES_LABEL] if n["type"] == "output"
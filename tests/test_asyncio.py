@@ -0,0 +1,101 @@
+import asyncio
+import json
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from python_workflow_definition.asyncio import load_workflow_json
+
+function_str = """
+def get_prod_and_div(x, y):
+    return {"prod": x * y, "div": x / y}
+
+
+def get_sum(x, y):
+    return x + y
+
+
+def get_square(x):
+    return x ** 2
+"""
+
+async_function_str = """
+import asyncio
+
+
+async def get_prod_and_div(x, y):
+    await asyncio.sleep(0)
+    return {"prod": x * y, "div": x / y}
+
+
+async def get_sum(x, y):
+    await asyncio.sleep(0)
+    return x + y
+
+
+def get_square(x):
+    return x ** 2
+"""
+
+workflow_str = """
+{
+  "version": "0.1.0",
+  "nodes": [
+    {"id": 0, "type": "function", "value": "MODULE.get_prod_and_div"},
+    {"id": 1, "type": "function", "value": "MODULE.get_sum"},
+    {"id": 2, "type": "function", "value": "MODULE.get_square"},
+    {"id": 3, "type": "input", "value": 1, "name": "x"},
+    {"id": 4, "type": "input", "value": 2, "name": "y"},
+    {"id": 5, "type": "output", "name": "result"}
+  ],
+  "edges": [
+    {"target": 0, "targetPort": "x", "source": 3, "sourcePort": null},
+    {"target": 0, "targetPort": "y", "source": 4, "sourcePort": null},
+    {"target": 1, "targetPort": "x", "source": 0, "sourcePort": "prod"},
+    {"target": 1, "targetPort": "y", "source": 0, "sourcePort": "div"},
+    {"target": 2, "targetPort": "x", "source": 1, "sourcePort": null},
+    {"target": 5, "targetPort": null, "source": 2, "sourcePort": null}
+  ]
+}"""
+
+
+class TestAsyncio(unittest.TestCase):
+    def test_asyncio(self):
+        with open("workflow.py", "w") as f:
+            f.write(function_str)
+
+        with open("workflow.json", "w") as f:
+            f.write(workflow_str.replace("MODULE", "workflow"))
+
+        self.assertEqual(
+            asyncio.run(load_workflow_json(file_name="workflow.json")), 6.25
+        )
+
+    def test_asyncio_coroutine_functions(self):
+        with open("async_workflow.py", "w") as f:
+            f.write(async_function_str)
+        sys.modules.pop("async_workflow", None)
+
+        with open("async_workflow.json", "w") as f:
+            f.write(workflow_str.replace("MODULE", "async_workflow"))
+
+        with ThreadPoolExecutor(max_workers=1) as exe:
+            result = asyncio.run(
+                load_workflow_json(
+                    file_name="async_workflow.json", max_concurrency=1, exe=exe
+                )
+            )
+        self.assertEqual(result, 6.25)
+
+    def test_asyncio_output_node(self):
+        with open("workflow.py", "w") as f:
+            f.write(function_str)
+
+        # the output node is connected to a node which is not the last one created
+        workflow_dict = json.loads(workflow_str.replace("MODULE", "workflow"))
+        workflow_dict["edges"][-1].update({"source": 0, "sourcePort": "prod"})
+        with open("output_workflow.json", "w") as f:
+            json.dump(workflow_dict, f)
+
+        self.assertEqual(
+            asyncio.run(load_workflow_json(file_name="output_workflow.json")), 2
+        )
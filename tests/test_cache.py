@@ -0,0 +1,161 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from python_workflow_definition.cache import (
+    ResultCache,
+    get_function_hash,
+    get_node_hash,
+)
+from python_workflow_definition.purepython import load_workflow_json
+from python_workflow_definition.shared import SOURCE_LABEL, SOURCE_PORT_LABEL, get_value_hash
+
+function_str = """
+import os
+
+
+def _log(name):
+    with open("calls.txt", "a") as f:
+        f.write(name + "\\n")
+
+
+def get_prod_and_div(x, y):
+    _log("get_prod_and_div")
+    return {"prod": x * y, "div": x / y}
+
+
+def get_sum(x, y):
+    _log("get_sum")
+    return x + y
+
+
+def get_square(x):
+    _log("get_square")
+    return x ** 2
+"""
+
+workflow_str = """
+{
+  "version": "0.1.0",
+  "nodes": [
+    {"id": 0, "type": "function", "value": "cached_workflow.get_prod_and_div"},
+    {"id": 1, "type": "function", "value": "cached_workflow.get_sum"},
+    {"id": 2, "type": "function", "value": "cached_workflow.get_square"},
+    {"id": 3, "type": "input", "value": 1, "name": "x"},
+    {"id": 4, "type": "input", "value": Y, "name": "y"},
+    {"id": 5, "type": "output", "name": "result"}
+  ],
+  "edges": [
+    {"target": 0, "targetPort": "x", "source": 3, "sourcePort": null},
+    {"target": 0, "targetPort": "y", "source": 4, "sourcePort": null},
+    {"target": 1, "targetPort": "x", "source": 0, "sourcePort": "prod"},
+    {"target": 1, "targetPort": "y", "source": 0, "sourcePort": "div"},
+    {"target": 2, "targetPort": "x", "source": 1, "sourcePort": null},
+    {"target": 5, "targetPort": null, "source": 2, "sourcePort": null}
+  ]
+}"""
+
+
+def get_calls():
+    with open("calls.txt") as f:
+        calls = f.read().split()
+    os.remove("calls.txt")
+    return calls
+
+
+class TestCache(unittest.TestCase):
+    def test_value_hash(self):
+        self.assertEqual(get_value_hash({"a": 1, "b": 2}), get_value_hash({"b": 2, "a": 1}))
+        self.assertNotEqual(get_value_hash(1), get_value_hash("1"))
+
+    def test_node_hash(self):
+        link_dict = {"x": {SOURCE_LABEL: 0, SOURCE_PORT_LABEL: None}}
+        hash_one = get_node_hash(
+            function=get_value_hash, link_dict=link_dict, hash_dict={0: get_value_hash(1).hex()}
+        )
+        hash_two = get_node_hash(
+            function=get_value_hash, link_dict=link_dict, hash_dict={0: get_value_hash(2).hex()}
+        )
+        self.assertNotEqual(hash_one, hash_two)
+
+    def test_value_hash_large_array(self):
+        # the repr() of large arrays is truncated
+        array = np.zeros(10000)
+        array_changed = array.copy()
+        array_changed[100] = 7
+        self.assertNotEqual(get_value_hash(array), get_value_hash(array_changed))
+        self.assertNotEqual(get_function_hash(get_value_hash), get_function_hash(get_node_hash))
+
+    def test_store_and_invalidate(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ResultCache(directory=tmpdir)
+            self.assertNotIn("a", cache)
+            with self.assertRaises(KeyError):
+                cache.load("a")
+            cache.store("a", [1, 2, 3])
+            self.assertIn("a", cache)
+            self.assertEqual(cache.load("a"), [1, 2, 3])
+            cache.store("b", 4)
+            cache.invalidate("a")
+            self.assertNotIn("a", cache)
+            self.assertIn("b", cache)
+            cache.invalidate()
+            self.assertNotIn("b", cache)
+
+    def test_load_partial_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ResultCache(directory=tmpdir)
+            cache.store("a", list(range(100)))
+            with open(os.path.join(tmpdir, "a.pickle"), "r+b") as f:
+                f.truncate(10)
+            with self.assertRaises(KeyError):
+                cache.load("a")
+
+    def test_eviction_scan(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ResultCache(directory=tmpdir, max_size=10**6)
+            with mock.patch.object(
+                ResultCache, "_get_entry_lst", wraps=cache._get_entry_lst
+            ) as get_entry_lst:
+                for key in "abcdef":
+                    cache.store(key, key * 1000)
+            self.assertEqual(1, get_entry_lst.call_count)
+
+    def test_lru_eviction(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ResultCache(directory=tmpdir, max_size=2500)
+            cache.store("a", b"a" * 1000)
+            os.utime(os.path.join(tmpdir, "a.pickle"), (1, 1))
+            cache.store("b", b"b" * 1000)
+            os.utime(os.path.join(tmpdir, "b.pickle"), (2, 2))
+            cache.load("a")
+            cache.store("c", b"c" * 1000)
+            self.assertIn("a", cache)
+            self.assertNotIn("b", cache)
+            self.assertIn("c", cache)
+
+    def test_purepython_cache(self):
+        with open("cached_workflow.py", "w") as f:
+            f.write(function_str)
+        sys.modules.pop("cached_workflow", None)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ResultCache(directory=tmpdir)
+            with open("cached_workflow.json", "w") as f:
+                f.write(workflow_str.replace("Y", "2"))
+            self.assertEqual(load_workflow_json(file_name="cached_workflow.json", cache=cache), 6.25)
+            self.assertEqual(get_calls(), ["get_prod_and_div", "get_sum", "get_square"])
+
+            self.assertEqual(load_workflow_json(file_name="cached_workflow.json", cache=cache), 6.25)
+            self.assertFalse(os.path.exists("calls.txt"))
+
+            with open("cached_workflow.json", "w") as f:
+                f.write(workflow_str.replace("Y", "4"))
+            self.assertEqual(load_workflow_json(file_name="cached_workflow.json", cache=cache), 18.0625)
+            self.assertEqual(get_calls(), ["get_prod_and_div", "get_sum", "get_square"])
+
+            cache.invalidate()
+            self.assertEqual(load_workflow_json(file_name="cached_workflow.json", cache=cache), 18.0625)
+            self.assertEqual(len(get_calls()), 3)
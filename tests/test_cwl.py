@@ -1,9 +1,26 @@
+import json
+import os
 import unittest
 import pickle
 import subprocess
+import sys
 import tempfile
+import time
 from pathlib import Path
-from python_workflow_definition.cwl import write_workflow
+from unittest import mock
+import numpy as np
+from python_workflow_definition.cwl import _get_chain_lst, write_workflow
+from python_workflow_definition.cwl.__main__ import _warm_up
+from python_workflow_definition.cwl_worker import get_worker_address, submit_step
+from python_workflow_definition.cwl import serializer
+from python_workflow_definition.cwl.serializer import (
+    dump_value,
+    get_serializer_reference,
+    load_value,
+    register_serializer,
+)
+from python_workflow_definition.models import PythonWorkflowDefinitionWorkflow
+from python_workflow_definition.shared import dump_array
 
 function_str = """
 def get_prod_and_div(x, y):
@@ -53,3 +70,356 @@ class TestCommonWorkflowLanguage(unittest.TestCase):
             subprocess.check_output(["cwltool", "workflow.cwl", "workflow.yml"], cwd=tmpdir)
             with open(tmp_path / "result.pickle", "rb") as f:
                 self.assertEqual(pickle.load(f), 6.25)
+
+    def test_common_workflow_language_worker(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            with open(tmp_path / "workflow.py", "w") as f:
+                f.write(function_str)
+
+            with open(tmp_path / "workflow.json", "w") as f:
+                f.write(workflow_str)
+
+            write_workflow(
+                file_name=str(tmp_path / "workflow.json"),
+                directory_path=tmpdir,
+                worker=True,
+            )
+            with open(tmp_path / "get_sum.cwl") as f:
+                self.assertIn("python_workflow_definition.cwl_worker", f.read())
+            subprocess.check_output(["cwltool", "workflow.cwl", "workflow.yml"], cwd=tmpdir)
+            with open(tmp_path / "result.pickle", "rb") as f:
+                self.assertEqual(pickle.load(f), 6.25)
+
+    def test_common_workflow_language_fuse(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            with open(tmp_path / "workflow.py", "w") as f:
+                f.write(function_str)
+
+            with open(tmp_path / "workflow.json", "w") as f:
+                f.write(workflow_str)
+
+            write_workflow(
+                file_name=str(tmp_path / "workflow.json"),
+                directory_path=tmpdir,
+                fuse=True,
+            )
+            self.assertEqual(
+                sorted(p.name for p in tmp_path.glob("*.cwl")),
+                ["get_square.cwl", "workflow.cwl"],
+            )
+            subprocess.check_output(["cwltool", "workflow.cwl", "workflow.yml"], cwd=tmpdir)
+            with open(tmp_path / "result.pickle", "rb") as f:
+                self.assertEqual(pickle.load(f), 6.25)
+
+    def test_common_workflow_language_serializer(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            with open(tmp_path / "workflow.py", "w") as f:
+                f.write(function_str)
+
+            with open(tmp_path / "workflow.json", "w") as f:
+                f.write(workflow_str)
+
+            write_workflow(
+                file_name=str(tmp_path / "workflow.json"),
+                directory_path=tmpdir,
+                serializer_dict={
+                    "x": "npy",
+                    (0, "prod"): "pickle5",
+                    (0, "div"): "npy",
+                    (2, None): "gzip",
+                },
+            )
+            self.assertTrue((tmp_path / "x.npy").exists())
+            self.assertTrue((tmp_path / "y.pickle").exists())
+            # the serializer only applies to the port of the given node
+            with open(tmp_path / "get_sum.cwl") as f:
+                self.assertIn("result.pickle", f.read())
+            with self.assertRaises(ValueError):
+                write_workflow(
+                    file_name=str(tmp_path / "workflow.json"),
+                    directory_path=tmpdir,
+                    serializer_dict={"result": "gzip"},
+                )
+            subprocess.check_output(["cwltool", "workflow.cwl", "workflow.yml"], cwd=tmpdir)
+            self.assertEqual(load_value(str(tmp_path / "result.pickle.gz")), 6.25)
+
+    def test_common_workflow_language_custom_serializer(self):
+        register_serializer(
+            name="custom",
+            extension=".custom.gz",
+            dump=serializer._dump_gzip,
+            load=serializer._load_gzip,
+        )
+        self.addCleanup(serializer._serializer_dict.pop, "custom")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            with open(tmp_path / "workflow.py", "w") as f:
+                f.write(function_str)
+
+            with open(tmp_path / "workflow.json", "w") as f:
+                f.write(workflow_str)
+
+            write_workflow(
+                file_name=str(tmp_path / "workflow.json"),
+                directory_path=tmpdir,
+                serializer_dict={"x": "custom", (0, "prod"): "custom", (2, None): "custom"},
+            )
+            with open(tmp_path / "get_square.cwl") as f:
+                self.assertIn("--serializer-import=", f.read())
+            # the steps run in separate processes, which register the serializer
+            subprocess.check_output(["cwltool", "workflow.cwl", "workflow.yml"], cwd=tmpdir)
+            self.assertEqual(load_value(str(tmp_path / "result.custom.gz")), 6.25)
+
+    def test_common_workflow_language_incremental(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            with open(tmp_path / "workflow.json", "w") as f:
+                f.write(workflow_str)
+
+            write_workflow(file_name=str(tmp_path / "workflow.json"), directory_path=tmpdir)
+            mtime_dict = {p.name: p.stat().st_mtime_ns for p in tmp_path.iterdir()}
+            time.sleep(0.01)
+            with open(tmp_path / "workflow.json", "w") as f:
+                f.write(workflow_str.replace('"value": 2', '"value": 3'))
+            write_workflow(file_name=str(tmp_path / "workflow.json"), directory_path=tmpdir)
+            changed_lst = sorted(
+                p.name
+                for p in tmp_path.iterdir()
+                if p.stat().st_mtime_ns != mtime_dict[p.name]
+            )
+            self.assertEqual(changed_lst, ["workflow.json", "y.pickle"])
+
+    def test_common_workflow_language_array(self):
+        array = np.arange(1000.0)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            with open(tmp_path / "workflow.py", "w") as f:
+                f.write(function_str)
+
+            reference = json.dumps(dump_array(value=array, directory=tmpdir))
+            with open(tmp_path / "workflow.json", "w") as f:
+                f.write(workflow_str.replace('"value": 1', '"value": ' + reference))
+
+            write_workflow(file_name=str(tmp_path / "workflow.json"), directory_path=tmpdir)
+            self.assertTrue(np.array_equal(load_value(str(tmp_path / "x.pickle")), array))
+            subprocess.check_output(["cwltool", "workflow.cwl", "workflow.yml"], cwd=tmpdir)
+            with open(tmp_path / "result.pickle", "rb") as f:
+                self.assertTrue(np.allclose(pickle.load(f), (2.5 * array) ** 2))
+
+    def test_common_workflow_language_binary(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            with open(tmp_path / "workflow.py", "w") as f:
+                f.write(function_str)
+
+            PythonWorkflowDefinitionWorkflow.model_validate_json(
+                workflow_str
+            ).dump_json_file(file_name=tmp_path / "workflow.msgpack")
+            write_workflow(
+                file_name=str(tmp_path / "workflow.msgpack"), directory_path=tmpdir
+            )
+            subprocess.check_output(["cwltool", "workflow.cwl", "workflow.yml"], cwd=tmpdir)
+            with open(tmp_path / "result.pickle", "rb") as f:
+                self.assertEqual(pickle.load(f), 6.25)
+
+    def test_common_workflow_language_reserved_name(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            with open(tmp_path / "workflow.py", "w") as f:
+                f.write(function_str + "\n\ndef workflow(x):\n    return x ** 2\n")
+
+            with open(tmp_path / "workflow.json", "w") as f:
+                f.write(workflow_str.replace("workflow.get_square", "workflow.workflow"))
+
+            write_workflow(file_name=str(tmp_path / "workflow.json"), directory_path=tmpdir)
+            self.assertTrue((tmp_path / "workflow_1.cwl").exists())
+            subprocess.check_output(["cwltool", "workflow.cwl", "workflow.yml"], cwd=tmpdir)
+            with open(tmp_path / "result.pickle", "rb") as f:
+                self.assertEqual(pickle.load(f), 6.25)
+
+    def test_get_chain_lst(self):
+        workflow = {
+            "nodes": [
+                {"id": 0, "type": "function", "value": "workflow.get_prod_and_div"},
+                {"id": 1, "type": "function", "value": "workflow.get_square"},
+                {"id": 2, "type": "function", "value": "workflow.get_square"},
+                {"id": 3, "type": "function", "value": "workflow.get_sum"},
+                {"id": 4, "type": "function", "value": "workflow.get_square"},
+                {"id": 5, "type": "input", "value": 1, "name": "x"},
+                {"id": 6, "type": "input", "value": 2, "name": "y"},
+                {"id": 7, "type": "output", "name": "result"},
+            ],
+            "edges": [
+                {"target": 0, "targetPort": "x", "source": 5, "sourcePort": None},
+                {"target": 0, "targetPort": "y", "source": 6, "sourcePort": None},
+                {"target": 1, "targetPort": "x", "source": 0, "sourcePort": "prod"},
+                {"target": 2, "targetPort": "x", "source": 0, "sourcePort": "div"},
+                {"target": 3, "targetPort": "x", "source": 1, "sourcePort": None},
+                {"target": 3, "targetPort": "y", "source": 2, "sourcePort": None},
+                {"target": 4, "targetPort": "x", "source": 3, "sourcePort": None},
+                {"target": 7, "targetPort": None, "source": 4, "sourcePort": None},
+            ],
+        }
+        self.assertEqual(_get_chain_lst(workflow=workflow), [[0], [1], [2], [3], [4]])
+        self.assertEqual(
+            _get_chain_lst(workflow=workflow, fuse=True), [[0], [1], [2], [3, 4]]
+        )
+
+    def test_submit_step(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            with open(tmp_path / "workflow.py", "w") as f:
+                f.write(function_str)
+            address = str(tmp_path / "worker" / "worker.sock")
+            os.mkdir(tmp_path / "worker", mode=0o700)
+            server = subprocess.Popen(
+                [sys.executable, "-c", "from python_workflow_definition.cwl.__main__ import serve; serve(address=" + repr(address) + ", idle_timeout=5)"],
+            )
+            try:
+                while not os.path.exists(address):
+                    time.sleep(0.01)
+                cwd = os.getcwd()
+                os.chdir(tmpdir)
+                try:
+                    for x, result in [(2, 4), (3, 9)]:
+                        exit_code = submit_step(
+                            argument_lst=[
+                                "--workflowfile=" + str(tmp_path / "workflow.py"),
+                                "--function=workflow.get_square",
+                                "--arg_x=" + str(x),
+                            ],
+                            address=address,
+                        )
+                        self.assertEqual(exit_code, 0)
+                        with open("result.pickle", "rb") as f:
+                            self.assertEqual(pickle.load(f), result)
+                    exit_code = submit_step(
+                        argument_lst=[
+                            "--workflowfile=" + str(tmp_path / "workflow.py"),
+                            "--function=workflow.get_square",
+                            "--arg_y=2",
+                        ],
+                        address=address,
+                    )
+                    self.assertEqual(exit_code, 1)
+                    # the server survives modules which exit or interrupt on import
+                    for i, line in enumerate(["import sys; sys.exit(3)", "raise KeyboardInterrupt"]):
+                        with open(tmp_path / ("exit_" + str(i) + ".py"), "w") as f:
+                            f.write(line + "\n" + function_str)
+                        exit_code = submit_step(
+                            argument_lst=[
+                                "--workflowfile=" + str(tmp_path / ("exit_" + str(i) + ".py")),
+                                "--function=workflow.get_square",
+                                "--arg_x=2",
+                            ],
+                            address=address,
+                        )
+                        self.assertEqual(exit_code, 1)
+                    self.assertIsNone(server.poll())
+                    exit_code = submit_step(
+                        argument_lst=[
+                            "--workflowfile=" + str(tmp_path / "workflow.py"),
+                            "--function=workflow.get_square",
+                            "--arg_x=4",
+                        ],
+                        address=address,
+                    )
+                    self.assertEqual(exit_code, 0)
+                finally:
+                    os.chdir(cwd)
+            finally:
+                server.terminate()
+                server.wait()
+
+    def test_warm_up_timeout(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(Path(tmpdir) / "blocking.py", "w") as f:
+                f.write("import time\ntime.sleep(30)\n")
+            cwd = os.getcwd()
+            workflow_module = sys.modules.get("workflow")
+            start_time = time.monotonic()
+            try:
+                _warm_up(
+                    request_dict={
+                        "cwd": tmpdir,
+                        "argv": [
+                            "--workflowfile=" + str(Path(tmpdir) / "blocking.py"),
+                            "--function=workflow.get_square",
+                        ],
+                    },
+                    timeout=0.1,
+                )
+            finally:
+                os.chdir(cwd)
+                if workflow_module is not None:
+                    sys.modules["workflow"] = workflow_module
+                else:
+                    sys.modules.pop("workflow", None)
+            self.assertLess(time.monotonic() - start_time, 10)
+
+    def test_worker_address(self):
+        address = get_worker_address()
+        self.assertEqual(address, get_worker_address())
+        with mock.patch.object(sys, "prefix", "/other/prefix"):
+            self.assertNotEqual(address, get_worker_address())
+
+    def test_worker_client_imports(self):
+        # the client is started for every step, it must not import the dependencies
+        module_lst = json.loads(
+            subprocess.check_output(
+                [
+                    sys.executable,
+                    "-c",
+                    "import json, sys, python_workflow_definition.cwl_worker; print(json.dumps(list(sys.modules)))",
+                ]
+            )
+        )
+        for module_name in ["numpy", "yaml", "python_workflow_definition.shared"]:
+            self.assertNotIn(module_name, module_lst)
+
+
+class TestSerializer(unittest.TestCase):
+    def test_round_trip(self):
+        value_dict = {
+            "pickle": {"a": np.arange(5), "b": "text"},
+            "pickle5": {"a": np.arange(5), "b": "text"},
+            "gzip": {"a": np.arange(5), "b": "text"},
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name, value in value_dict.items():
+                file_name = dump_value(
+                    value=value, file_stem=str(Path(tmpdir) / name), name=name
+                )
+                result = load_value(file_name=file_name)
+                self.assertEqual(result["b"], "text")
+                self.assertTrue(np.array_equal(result["a"], value["a"]))
+                result["a"][0] = 10
+
+    def test_memory_map(self):
+        array = np.arange(1000.0).reshape(10, 100)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ["pickle5", "npy"]:
+                file_name = dump_value(
+                    value=array, file_stem=str(Path(tmpdir) / name), name=name
+                )
+                result = load_value(file_name=file_name)
+                self.assertTrue(np.array_equal(result, array))
+                self.assertFalse(result.flags.owndata)
+                result[0, 0] = -1.0
+                self.assertEqual(load_value(file_name=file_name)[0, 0], 0.0)
+
+    def test_unknown_serializer(self):
+        self.assertIsNone(get_serializer_reference(name="pickle"))
+        register_serializer(
+            name="local", extension=".local", dump=lambda v, f: None, load=lambda f: None
+        )
+        self.addCleanup(serializer._serializer_dict.pop, "local")
+        with self.assertRaises(ValueError):
+            get_serializer_reference(name="local")
+        with self.assertRaises(ValueError):
+            dump_value(value=1, file_stem="x", name="unknown")
+        with self.assertRaises(ValueError):
+            load_value(file_name="x.unknown")
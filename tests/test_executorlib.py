@@ -1,7 +1,13 @@
+import json
 import sys
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from executorlib import SingleNodeExecutor
-from python_workflow_definition.executorlib import load_workflow_json
+from executorlib.executor.single import TestClusterExecutor
+from python_workflow_definition.executorlib import (
+    _get_resource_dict,
+    load_workflow_json,
+)
 
 function_str = """
 def get_prod_and_div(x, y):
@@ -56,6 +62,82 @@ filename_workflow_str = """
   ]
 }"""
 
+fan_out_workflow_str = """
+{
+  "version": "0.1.0",
+  "nodes": [
+    {"id": 0, "type": "function", "value": "workflow.get_prod_and_div"},
+    {"id": 1, "type": "function", "value": "workflow.get_square"},
+    {"id": 2, "type": "function", "value": "workflow.get_square"},
+    {"id": 3, "type": "function", "value": "workflow.get_square"},
+    {"id": 4, "type": "function", "value": "workflow.get_sum"},
+    {"id": 5, "type": "function", "value": "workflow.get_sum"},
+    {"id": 6, "type": "input", "value": 1, "name": "x"},
+    {"id": 7, "type": "input", "value": 2, "name": "y"},
+    {"id": 8, "type": "output", "name": "result"}
+  ],
+  "edges": [
+    {"target": 0, "targetPort": "x", "source": 6, "sourcePort": null},
+    {"target": 0, "targetPort": "y", "source": 7, "sourcePort": null},
+    {"target": 1, "targetPort": "x", "source": 0, "sourcePort": "prod"},
+    {"target": 2, "targetPort": "x", "source": 0, "sourcePort": "div"},
+    {"target": 3, "targetPort": "x", "source": 7, "sourcePort": null},
+    {"target": 4, "targetPort": "x", "source": 1, "sourcePort": null},
+    {"target": 4, "targetPort": "y", "source": 2, "sourcePort": null},
+    {"target": 5, "targetPort": "x", "source": 4, "sourcePort": null},
+    {"target": 5, "targetPort": "y", "source": 3, "sourcePort": null},
+    {"target": 8, "targetPort": null, "source": 5, "sourcePort": null}
+  ]
+}"""
+
+container_function_str = """
+def get_prod_and_div(x, y):
+    return {"prod": x * y, "div": x / y}
+
+
+def get_total(data):
+    return sum(data["values"]) + data["offset"]
+"""
+
+container_workflow_str = """
+{
+  "version": "0.1.0",
+  "nodes": [
+    {"id": 0, "type": "function", "value": "container_module.get_prod_and_div"},
+    {"id": 1, "type": "function", "value": "python_workflow_definition.shared.get_list"},
+    {"id": 2, "type": "function", "value": "python_workflow_definition.shared.get_dict"},
+    {"id": 3, "type": "function", "value": "container_module.get_total"},
+    {"id": 4, "type": "input", "value": 1, "name": "x"},
+    {"id": 5, "type": "input", "value": 2, "name": "y"},
+    {"id": 6, "type": "input", "value": 10, "name": "offset"},
+    {"id": 7, "type": "output", "name": "result"}
+  ],
+  "edges": [
+    {"target": 0, "targetPort": "x", "source": 4, "sourcePort": null},
+    {"target": 0, "targetPort": "y", "source": 5, "sourcePort": null},
+    {"target": 1, "targetPort": "0", "source": 0, "sourcePort": "prod"},
+    {"target": 1, "targetPort": "1", "source": 0, "sourcePort": "div"},
+    {"target": 1, "targetPort": "2", "source": 4, "sourcePort": null},
+    {"target": 2, "targetPort": "values", "source": 1, "sourcePort": null},
+    {"target": 2, "targetPort": "offset", "source": 6, "sourcePort": null},
+    {"target": 3, "targetPort": "data", "source": 2, "sourcePort": null},
+    {"target": 7, "targetPort": null, "source": 3, "sourcePort": null}
+  ]
+}"""
+
+
+def record_submissions(exe) -> list:
+    # the submitted functions and keyword arguments are appended to the list
+    submitted_lst = []
+    submit = exe.submit
+
+    def record_submit(fn, *args, **kwargs):
+        submitted_lst.append((fn, kwargs))
+        return submit(fn, *args, **kwargs)
+
+    exe.submit = record_submit
+    return submitted_lst
+
 
 class TestExecutorlib(unittest.TestCase):
     def test_executorlib(self):
@@ -68,6 +150,18 @@ class TestExecutorlib(unittest.TestCase):
         with SingleNodeExecutor(max_workers=1) as exe:
             self.assertEqual(load_workflow_json(file_name="workflow.json", exe=exe).result(), 6.25)
 
+    def test_executorlib_one_task_per_function_node(self):
+        with open("workflow.py", "w") as f:
+            f.write(function_str)
+
+        with open("workflow.json", "w") as f:
+            f.write(workflow_str)
+
+        with SingleNodeExecutor(max_workers=1) as exe:
+            submitted_lst = record_submissions(exe=exe)
+            self.assertEqual(load_workflow_json(file_name="workflow.json", exe=exe).result(), 6.25)
+        self.assertEqual(len(submitted_lst), 3)
+
     def test_executorlib_filename_input(self):
         """A filename string like 'image.png' must be passed through as a plain
         string input, not interpreted as a Python module path or a float."""
@@ -83,3 +177,144 @@ class TestExecutorlib(unittest.TestCase):
                 file_name="filename_workflow.json", exe=exe
             ).result()
         self.assertEqual(result, "image.png")
+
+    def test_executorlib_batch_size(self):
+        with open("workflow.py", "w") as f:
+            f.write(function_str)
+
+        with open("fan_out_workflow.json", "w") as f:
+            f.write(fan_out_workflow_str)
+
+        for batch_size, number_of_submissions in [(1, 6), (2, 5)]:
+            with self.subTest(batch_size=batch_size):
+                with SingleNodeExecutor(max_workers=1) as exe:
+                    submitted_lst = record_submissions(exe=exe)
+                    result = load_workflow_json(
+                        file_name="fan_out_workflow.json", exe=exe, batch_size=batch_size
+                    ).result()
+                self.assertEqual(result, 8.25)
+                self.assertEqual(len(submitted_lst), number_of_submissions)
+        with self.assertRaises(ValueError):
+            load_workflow_json(file_name="fan_out_workflow.json", exe=None, batch_size=0)
+
+    def test_executorlib_batch_size_file_executor(self):
+        with open("workflow.py", "w") as f:
+            f.write(function_str)
+
+        with open("fan_out_workflow.json", "w") as f:
+            f.write(fan_out_workflow_str)
+
+        # the file based executor only resolves futures passed as keyword arguments
+        with TestClusterExecutor(cache_directory="executorlib_cache_batch") as exe:
+            result = load_workflow_json(
+                file_name="fan_out_workflow.json", exe=exe, batch_size=2
+            ).result()
+        self.assertEqual(result, 8.25)
+
+    def test_executorlib_batch_size_resources(self):
+        with open("workflow.py", "w") as f:
+            f.write(function_str)
+
+        workflow_dict = json.loads(fan_out_workflow_str)
+        workflow_dict["nodes"][1]["resources"] = {"cores": 1}
+        with open("fan_out_resources_workflow.json", "w") as f:
+            json.dump(workflow_dict, f)
+
+        with SingleNodeExecutor(max_workers=1) as exe:
+            submitted_lst = record_submissions(exe=exe)
+            result = load_workflow_json(
+                file_name="fan_out_resources_workflow.json", exe=exe, batch_size=3
+            ).result()
+        self.assertEqual(result, 8.25)
+        # the node with the resource request is not batched with the other squares
+        self.assertEqual(len(submitted_lst), 6)
+        self.assertEqual(
+            [kwargs.get("resource_dict") for _, kwargs in submitted_lst].count({"cores": 1}),
+            1,
+        )
+
+    def test_executorlib_resources(self):
+        with open("workflow.py", "w") as f:
+            f.write(function_str)
+
+        workflow_dict = json.loads(workflow_str)
+        workflow_dict["nodes"][0]["resources"] = {"cores": 1, "threads": 1, "memory": 100}
+        with open("resources_workflow.json", "w") as f:
+            json.dump(workflow_dict, f)
+
+        with SingleNodeExecutor(max_workers=1) as exe:
+            submitted_lst = record_submissions(exe=exe)
+            self.assertEqual(load_workflow_json(file_name="resources_workflow.json", exe=exe).result(), 6.25)
+        self.assertEqual(
+            [kwargs.get("resource_dict") for _, kwargs in submitted_lst],
+            [{"cores": 1, "threads_per_core": 1}, None, None],
+        )
+
+    def test_executorlib_gpus(self):
+        self.assertEqual(
+            _get_resource_dict(resources={"cores": 2, "gpus": 4}),
+            {"cores": 2, "gpus_per_core": 2},
+        )
+        self.assertEqual(_get_resource_dict(resources={"gpus": 1}), {"gpus_per_core": 1})
+        self.assertEqual(
+            _get_resource_dict(resources={"cores": 8, "gpus": 1}),
+            {"cores": 8, "gpus_per_core": 1},
+        )
+
+    def test_executorlib_resources_thread_pool(self):
+        with open("workflow.py", "w") as f:
+            f.write(function_str)
+
+        workflow_dict = {
+            "version": "0.1.0",
+            "nodes": [
+                {"id": 0, "type": "function", "value": "workflow.get_square", "resources": {"cores": 2}},
+                {"id": 1, "type": "input", "value": 3, "name": "x"},
+                {"id": 2, "type": "output", "name": "result"},
+            ],
+            "edges": [
+                {"target": 0, "targetPort": "x", "source": 1, "sourcePort": None},
+                {"target": 2, "targetPort": None, "source": 0, "sourcePort": None},
+            ],
+        }
+        with open("resources_thread_workflow.json", "w") as f:
+            json.dump(workflow_dict, f)
+
+        # the resource_dict is not passed on to the function
+        with ThreadPoolExecutor(max_workers=1) as exe:
+            self.assertEqual(load_workflow_json(file_name="resources_thread_workflow.json", exe=exe).result(), 9)
+
+    def test_executorlib_inline_containers(self):
+        with open("container_module.py", "w") as f:
+            f.write(container_function_str)
+        sys.modules.pop("container_module", None)
+
+        with open("container_workflow.json", "w") as f:
+            f.write(container_workflow_str)
+
+        for inline_containers, number_of_submissions in [(False, 4), (True, 2)]:
+            with self.subTest(inline_containers=inline_containers):
+                with SingleNodeExecutor(max_workers=1) as exe:
+                    submitted_lst = record_submissions(exe=exe)
+                    result = load_workflow_json(
+                        file_name="container_workflow.json",
+                        exe=exe,
+                        inline_containers=inline_containers,
+                    ).result()
+                self.assertEqual(result, 13.5)
+                self.assertEqual(len(submitted_lst), number_of_submissions)
+
+    def test_executorlib_inline_containers_file_executor(self):
+        with open("container_module.py", "w") as f:
+            f.write(container_function_str)
+        sys.modules.pop("container_module", None)
+
+        with open("container_workflow.json", "w") as f:
+            f.write(container_workflow_str)
+
+        # the members of the inlined containers are passed as keyword arguments
+        with TestClusterExecutor(cache_directory="executorlib_cache_container") as exe:
+            result = load_workflow_json(
+                file_name="container_workflow.json", exe=exe, inline_containers=True
+            ).result()
+        self.assertEqual(result, 13.5)
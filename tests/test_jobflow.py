@@ -1,6 +1,7 @@
 import json
 import os
 import unittest
+import numpy as np
 from jobflow import job, Flow
 from jobflow.managers.local import run_locally
 from python_workflow_definition.jobflow import load_workflow_json, write_workflow_json
@@ -18,6 +19,10 @@ def get_square(x):
     return x ** 2
 
 
+def get_sum_of_list(x):
+    return sum(x)
+
+
 def echo(filename):
     return filename
 
@@ -39,6 +44,115 @@ class TestJobflow(unittest.TestCase):
         self.assertTrue(os.path.exists(workflow_json_filename))
         self.assertEqual(result[list(result.keys())[-1]][1].output, 6.25)
 
+    def test_jobflow_resources(self):
+        workflow_json_filename = "jobflow_resources.json"
+        get_sum_job = job(get_sum)
+        get_square_job = job(get_square)
+        tmp_sum = get_sum_job(x=1, y=2)
+        tmp_sum.config.manager_config = {"resources": {"cores": 4, "walltime": 60}}
+        result = get_square_job(x=tmp_sum.output)
+        write_workflow_json(flow=Flow([tmp_sum, result]), file_name=workflow_json_filename)
+
+        with open(workflow_json_filename) as f:
+            saved = json.load(f)
+        resources_lst = [
+            n.get("resources") for n in saved["nodes"] if n["type"] == "function"
+        ]
+        self.assertEqual(resources_lst, [{"cores": 4, "walltime": 60}, None])
+
+        flow = load_workflow_json(file_name=workflow_json_filename)
+        self.assertEqual(
+            [j.config.manager_config.get("resources") for j in flow.jobs],
+            [{"cores": 4, "walltime": 60}, None],
+        )
+        result = run_locally(flow)
+        self.assertEqual(result[list(result.keys())[-1]][1].output, 9)
+
+    def test_jobflow_remote_resources(self):
+        workflow_json_filename = "jobflow_remote_resources.json"
+        get_sum_job = job(get_sum)
+        get_square_job = job(get_square)
+        tmp_sum = get_sum_job(x=1, y=2)
+        tmp_sum.config.manager_config = {
+            "resources": {"nodes": 1, "processes": 4, "time_limit": 3600, "qos": "debug"}
+        }
+        result = get_square_job(x=tmp_sum.output)
+        result.config.manager_config = {
+            "resources": {"nodes": 2, "processes_per_node": 8, "memory_per_thread": 100}
+        }
+        with self.assertWarnsRegex(UserWarning, "qos"):
+            write_workflow_json(flow=Flow([tmp_sum, result]), file_name=workflow_json_filename)
+
+        with open(workflow_json_filename) as f:
+            saved = json.load(f)
+        self.assertEqual(
+            [n.get("resources") for n in saved["nodes"] if n["type"] == "function"],
+            [{"cores": 4, "walltime": 3600}, {"cores": 16, "memory": 1600}],
+        )
+
+    def test_jobflow_inline_containers(self):
+        workflow_json_filename = "jobflow_containers.json"
+        get_prod_and_div_job = job(get_prod_and_div)
+        get_sum_of_list_job = job(get_sum_of_list)
+        prod_and_div = get_prod_and_div_job(x=1, y=2)
+        result = get_sum_of_list_job(
+            x=[prod_and_div.output.prod, prod_and_div.output.div]
+        )
+        write_workflow_json(
+            flow=Flow([prod_and_div, result]), file_name=workflow_json_filename
+        )
+
+        flow = load_workflow_json(file_name=workflow_json_filename)
+        self.assertEqual(len(flow.jobs), 3)
+        flow = load_workflow_json(
+            file_name=workflow_json_filename, inline_containers=True
+        )
+        self.assertEqual(len(flow.jobs), 2)
+        result = run_locally(flow)
+        self.assertEqual(result[list(result.keys())[-1]][1].output, 2.5)
+
+    def test_jobflow_shared_inputs(self):
+        workflow_json_filename = "jobflow_shared_inputs.json"
+        get_sum_of_list_job = job(get_sum_of_list)
+        get_sum_job = job(get_sum)
+        first = get_sum_of_list_job(x=[1, 2])
+        second = get_sum_of_list_job(x=[1, 2])
+        result = get_sum_job(x=first.output, y=second.output)
+        write_workflow_json(
+            flow=Flow([first, second, result]), file_name=workflow_json_filename
+        )
+
+        with open(workflow_json_filename) as f:
+            saved = json.load(f)
+        self.assertEqual(
+            [[1, 2]], [n["value"] for n in saved["nodes"] if n["type"] == "input"]
+        )
+        result = run_locally(load_workflow_json(file_name=workflow_json_filename))
+        self.assertEqual(result[list(result.keys())[-1]][1].output, 6)
+
+    def test_jobflow_array_input(self):
+        workflow_json_filename = "jobflow_array_input.json"
+        get_sum_of_list_job = job(get_sum_of_list)
+        get_sum_job = job(get_sum)
+        first = get_sum_of_list_job(x=np.arange(100.0))
+        second = get_sum_of_list_job(x=np.arange(100.0))
+        result = get_sum_job(x=first.output, y=second.output)
+        write_workflow_json(
+            flow=Flow([first, second, result]),
+            file_name=workflow_json_filename,
+            array_threshold=800,
+        )
+
+        with open(workflow_json_filename) as f:
+            saved = json.load(f)
+        input_values = [n["value"] for n in saved["nodes"] if n["type"] == "input"]
+        self.assertEqual(1, len(input_values))
+        self.assertEqual(["@array"], list(input_values[0].keys()))
+        self.assertTrue(os.path.exists(input_values[0]["@array"]))
+        result = run_locally(load_workflow_json(file_name=workflow_json_filename))
+        self.assertEqual(result[list(result.keys())[-1]][1].output, 9900.0)
+        os.remove(input_values[0]["@array"])
+
     def test_jobflow_filename_input(self):
         """A filename string like 'image.png' must be passed through as a plain
         string input, not interpreted as a Python module path or a float."""
@@ -1,5 +1,9 @@
+import os
+import tempfile
 import unittest
 import json
+import msgpack
+import numpy as np
 from pathlib import Path
 from unittest import mock
 from pydantic import ValidationError
@@ -8,10 +12,12 @@ from python_workflow_definition.models import (
     PythonWorkflowDefinitionInputNode,
     PythonWorkflowDefinitionOutputNode,
     PythonWorkflowDefinitionFunctionNode,
+    PythonWorkflowDefinitionResources,
     PythonWorkflowDefinitionEdge,
     PythonWorkflowDefinitionWorkflow,
     INTERNAL_DEFAULT_HANDLE,
 )
+from python_workflow_definition.shared import EdgeTable
 
 
 class _NoTrivialSerialization:
@@ -161,6 +167,34 @@ class TestModels(unittest.TestCase):
         with self.assertRaises(ValidationError):
             PythonWorkflowDefinitionFunctionNode(id=1, type="function", value="module.")
 
+    def test_function_node_resources(self):
+        node = PythonWorkflowDefinitionFunctionNode(
+            id=1,
+            type="function",
+            value="module.function",
+            resources={"cores": 8, "walltime": 3600},
+        )
+        self.assertIsInstance(node.resources, PythonWorkflowDefinitionResources)
+        self.assertEqual(node.resources.cores, 8)
+        self.assertIsNone(node.resources.threads)
+        self.assertEqual(
+            node.model_dump(mode="json")["resources"], {"cores": 8, "walltime": 3600}
+        )
+        self.assertNotIn(
+            "resources",
+            PythonWorkflowDefinitionFunctionNode(
+                id=1, type="function", value="module.function"
+            ).model_dump(mode="json"),
+        )
+
+    def test_function_node_invalid_resources(self):
+        for resources in ({"cores": 0}, {"gpus": -1}, {"memory": "4GB"}, {"nodes": 2}):
+            with self.subTest(resources=resources):
+                with self.assertRaises(ValidationError):
+                    PythonWorkflowDefinitionFunctionNode(
+                        id=1, type="function", value="module.function", resources=resources
+                    )
+
     def test_edge(self):
         edge = PythonWorkflowDefinitionEdge(source=1, target=2)
         self.assertEqual(edge.source, 1)
@@ -233,6 +267,84 @@ class TestModels(unittest.TestCase):
         with self.assertRaises(ValidationError):
             PythonWorkflowDefinitionWorkflow.load_json_str(123)
 
+    def test_load_json_str_fast(self):
+        workflow_dict = {
+            "version": "1.0",
+            "nodes": [
+                {"id": 1, "type": "input", "name": "a", "value": [1, {"b": None}]},
+                {"id": "4", "type": "input", "name": "c", "extra": True},
+                {"id": 2, "type": "function", "value": "math.add"},
+                {"id": 5, "type": "function", "value": "math.sub", "resources": None},
+                {"id": 6, "type": "function", "value": "math.mul", "resources": {"cores": 2, "gpus": None}},
+                {"id": 3, "type": "output", "name": "result"},
+            ],
+            "edges": [
+                {"source": 1, "target": 2, "targetPort": "x"},
+                {"source": 4, "target": 2, "targetPort": "y", "sourcePort": "z"},
+                {"source": 2, "target": 3, "sourcePort": None},
+            ],
+        }
+        json_str = json.dumps(workflow_dict)
+        self.assertEqual(
+            json.dumps(PythonWorkflowDefinitionWorkflow.load_json_str(json_str)),
+            json.dumps(PythonWorkflowDefinitionWorkflow.load_json_str(json_str, fast=True)),
+        )
+
+    def test_binary_roundtrip(self):
+        workflow = PythonWorkflowDefinitionWorkflow(
+            **dict(
+                self.valid_workflow_dict,
+                nodes=[
+                    {"id": 1, "type": "input", "name": "a", "value": [1, 2.0, {"b": None}]},
+                    {"id": 2, "type": "function", "value": "math.add", "resources": {"cores": 2}},
+                    {"id": 3, "type": "output", "name": "result"},
+                ],
+            )
+        )
+        binary_data = workflow.dump_binary()
+        self.assertLess(len(binary_data), len(workflow.dump_json(indent=None)))
+        json_dict = PythonWorkflowDefinitionWorkflow.load_json_str(workflow.dump_json())
+        for fast in [False, True]:
+            with self.subTest(fast=fast):
+                binary_dict = PythonWorkflowDefinitionWorkflow.load_binary(binary_data, fast=fast)
+                self.assertEqual(json.dumps(json_dict), json.dumps(binary_dict))
+
+    def test_binary_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / "workflow.msgpack"
+            self.workflow.dump_json_file(file_path)
+            self.assertEqual(file_path.read_bytes(), self.workflow.dump_binary())
+            self.assertEqual(
+                PythonWorkflowDefinitionWorkflow.load_json_str(self.workflow.dump_json()),
+                PythonWorkflowDefinitionWorkflow.load_json_file(file_path),
+            )
+
+    def test_load_binary_invalid(self):
+        workflow_dict = json.loads(self.workflow.dump_json())
+        for edges in ["not_a_list", [[1, "x", 2]], [{"source": 1}]]:
+            binary_data = msgpack.packb(dict(workflow_dict, edges=edges))
+            with self.subTest(edges=edges):
+                with self.assertRaises(ValidationError):
+                    PythonWorkflowDefinitionWorkflow.load_binary(binary_data)
+                with self.assertRaises(ValidationError):
+                    PythonWorkflowDefinitionWorkflow.load_binary(binary_data, fast=True)
+
+    def test_load_json_str_fast_invalid(self):
+        for nodes, edges in [
+            ([{"id": 1, "type": "function", "value": "add"}], []),
+            ([{"id": 1, "type": "function", "value": "math.add", "resources": {"cores": 0}}], []),
+            ([{"id": 1, "type": "function", "value": "math.add", "resources": {"nodes": 1}}], []),
+            ([{"id": 1, "type": "unknown", "name": "a"}], []),
+            ([], [{"source": 1, "target": 2, "sourcePort": INTERNAL_DEFAULT_HANDLE}]),
+            ([], [{"source": 1}]),
+        ]:
+            json_str = json.dumps({"version": "1.0", "nodes": nodes, "edges": edges})
+            with self.subTest(json_str=json_str):
+                with self.assertRaises(ValidationError):
+                    PythonWorkflowDefinitionWorkflow.load_json_str(json_str)
+                with self.assertRaises(ValidationError):
+                    PythonWorkflowDefinitionWorkflow.load_json_str(json_str, fast=True)
+
     def test_load_json_file(self):
         file_path = Path("test_workflow.json")
         self.workflow.dump_json_file(file_path)
@@ -241,6 +353,86 @@ class TestModels(unittest.TestCase):
         self.assertEqual(reloaded_workflow.edges[1].sourcePort, INTERNAL_DEFAULT_HANDLE)
         file_path.unlink()
 
+    def test_load_json_file_array(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / "workflow.json"
+            np.save(os.path.join(tmp_dir, "array.npy"), np.arange(3))
+            workflow_dict = dict(self.valid_workflow_dict)
+            workflow_dict["nodes"] = [
+                dict(workflow_dict["nodes"][0], value={"@array": "array.npy"})
+            ] + workflow_dict["nodes"][1:]
+            with open(file_path, "w") as f:
+                json.dump(workflow_dict, f)
+            for stream in [False, True]:
+                with self.subTest(stream=stream):
+                    loaded_workflow_dict = PythonWorkflowDefinitionWorkflow.load_json_file(
+                        file_path, stream=stream
+                    )
+                    self.assertEqual(
+                        [0, 1, 2], loaded_workflow_dict["nodes"][0]["value"].tolist()
+                    )
+
+    def test_load_json_file_stream(self):
+        file_path = Path("test_workflow_stream.json")
+        workflow_dict = dict(self.valid_workflow_dict, extra={"key": [1, 2.5e3, None]})
+        workflow_dict["nodes"][0]["value"] = {"a": [True, "b\"}"]}
+        with open(file_path, "w") as f:
+            json.dump(workflow_dict, f, indent=4)
+        stream_dict = PythonWorkflowDefinitionWorkflow.load_json_file(file_path, stream=True)
+        self.assertIsInstance(stream_dict["edges"], EdgeTable)
+        self.assertEqual(
+            json.dumps(PythonWorkflowDefinitionWorkflow.load_json_file(file_path)),
+            json.dumps(dict(stream_dict, edges=stream_dict["edges"].to_edges())),
+        )
+        self.assertEqual(
+            [("version", "1.0"), ("nodes", 1), ("nodes", 2), ("nodes", 3), ("edges", 2), ("edges", 3)],
+            [
+                (key, value) if key == "version" else (key, value.get("id", value.get("target")))
+                for key, value in PythonWorkflowDefinitionWorkflow.iter_json_file(file_path, chunk_size=3)
+            ],
+        )
+        file_path.unlink()
+
+    def test_load_json_file_stream_large_value(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / "workflow.json"
+            value = {"list": list(range(10000)), "text": "a\\\"" * 1000}
+            workflow_dict = {
+                "version": "1.0",
+                "nodes": [{"id": 1, "type": "input", "name": "a", "value": value}],
+                "edges": [],
+            }
+            with open(file_path, "w") as f:
+                json.dump(workflow_dict, f)
+            with mock.patch.object(
+                json.JSONDecoder,
+                "raw_decode",
+                autospec=True,
+                side_effect=json.JSONDecoder.raw_decode,
+            ) as raw_decode:
+                item_lst = list(
+                    PythonWorkflowDefinitionWorkflow.iter_json_file(file_path, chunk_size=7)
+                )
+            self.assertEqual(value, item_lst[1][1]["value"])
+            # the keys, the version and the node are each decoded at most twice, once
+            # in the current chunk and once after the end of the value was found
+            self.assertLessEqual(raw_decode.call_count, 10)
+
+    def test_load_json_file_stream_invalid(self):
+        file_path = Path("test_workflow_stream_invalid.json")
+        for content, error in [
+            ('{"version": "1.0", "nodes": []', json.JSONDecodeError),
+            ('{"version": "1.0", "nodes": [] "edges": []}', json.JSONDecodeError),
+            ('{"version": "1.0", "nodes": [{"id": 1, "type": "function", "value": "add"}], "edges": []}', ValidationError),
+            ('{"version": "1.0", "nodes": []}', ValidationError),
+            ('{"version": 1, "nodes": [], "edges": []}', ValidationError),
+        ]:
+            with self.subTest(content=content):
+                file_path.write_text(content)
+                with self.assertRaises(error):
+                    PythonWorkflowDefinitionWorkflow.load_json_file(file_path, stream=True)
+        file_path.unlink()
+
     def test_load_json_file_not_found(self):
         with self.assertRaises(FileNotFoundError):
             PythonWorkflowDefinitionWorkflow.load_json_file("non_existent_file.json")
@@ -1,5 +1,7 @@
+import json
 import sys
 import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from python_workflow_definition.purepython import load_workflow_json
 
 function_str = """
@@ -55,6 +57,41 @@ filename_workflow_str = """
   ]
 }"""
 
+container_function_str = """
+def get_prod_and_div(x, y):
+    return {"prod": x * y, "div": x / y}
+
+
+def get_total(data):
+    return sum(data["values"]) + data["offset"]
+"""
+
+container_workflow_str = """
+{
+  "version": "0.1.0",
+  "nodes": [
+    {"id": 0, "type": "function", "value": "container_module.get_prod_and_div"},
+    {"id": 1, "type": "function", "value": "python_workflow_definition.shared.get_list"},
+    {"id": 2, "type": "function", "value": "python_workflow_definition.shared.get_dict"},
+    {"id": 3, "type": "function", "value": "container_module.get_total"},
+    {"id": 4, "type": "input", "value": 1, "name": "x"},
+    {"id": 5, "type": "input", "value": 2, "name": "y"},
+    {"id": 6, "type": "input", "value": 10, "name": "offset"},
+    {"id": 7, "type": "output", "name": "result"}
+  ],
+  "edges": [
+    {"target": 0, "targetPort": "x", "source": 4, "sourcePort": null},
+    {"target": 0, "targetPort": "y", "source": 5, "sourcePort": null},
+    {"target": 1, "targetPort": "0", "source": 0, "sourcePort": "prod"},
+    {"target": 1, "targetPort": "1", "source": 0, "sourcePort": "div"},
+    {"target": 1, "targetPort": "2", "source": 4, "sourcePort": null},
+    {"target": 2, "targetPort": "values", "source": 1, "sourcePort": null},
+    {"target": 2, "targetPort": "offset", "source": 6, "sourcePort": null},
+    {"target": 3, "targetPort": "data", "source": 2, "sourcePort": null},
+    {"target": 7, "targetPort": null, "source": 3, "sourcePort": null}
+  ]
+}"""
+
 
 class TestPurePython(unittest.TestCase):
     def test_pure_python(self):
@@ -66,6 +103,30 @@ class TestPurePython(unittest.TestCase):
 
         self.assertEqual(load_workflow_json(file_name="workflow.json"), 6.25)
 
+    def test_pure_python_thread_pool(self):
+        with open("workflow.py", "w") as f:
+            f.write(function_str)
+
+        with open("workflow.json", "w") as f:
+            f.write(workflow_str)
+
+        with ThreadPoolExecutor(max_workers=2) as exe:
+            self.assertEqual(
+                load_workflow_json(file_name="workflow.json", exe=exe), 6.25
+            )
+
+    def test_pure_python_process_pool(self):
+        with open("workflow.py", "w") as f:
+            f.write(function_str)
+
+        with open("workflow.json", "w") as f:
+            f.write(workflow_str)
+
+        with ProcessPoolExecutor(max_workers=2) as exe:
+            self.assertEqual(
+                load_workflow_json(file_name="workflow.json", exe=exe), 6.25
+            )
+
     def test_purepython_filename_input(self):
         """A filename string like 'image.png' must be passed through as a plain
         string input, not interpreted as a Python module path or a float."""
@@ -104,3 +165,33 @@ class TestPurePython(unittest.TestCase):
 
         result = load_workflow_json(file_name="multi_dot_workflow.json")
         self.assertEqual(result, "archive.tar.gz")
+
+    def test_pure_python_inline_containers(self):
+        with open("container_module.py", "w") as f:
+            f.write(container_function_str)
+        sys.modules.pop("container_module", None)
+
+        with open("container_workflow.json", "w") as f:
+            f.write(container_workflow_str)
+
+        for inline_containers in [False, True]:
+            with self.subTest(inline_containers=inline_containers):
+                self.assertEqual(
+                    load_workflow_json(
+                        file_name="container_workflow.json",
+                        inline_containers=inline_containers,
+                    ),
+                    13.5,
+                )
+
+    def test_pure_python_output_node(self):
+        with open("workflow.py", "w") as f:
+            f.write(function_str)
+
+        # the output node is connected to a node which is not the last one executed
+        workflow_dict = json.loads(workflow_str)
+        workflow_dict["edges"][-1].update({"source": 0, "sourcePort": "prod"})
+        with open("output_workflow.json", "w") as f:
+            json.dump(workflow_dict, f)
+
+        self.assertEqual(load_workflow_json(file_name="output_workflow.json"), 2)
@@ -2,7 +2,12 @@ import json
 import os
 import unittest
 from pyiron_base import job
-from python_workflow_definition.pyiron_base import load_workflow_json, write_workflow_json
+from python_workflow_definition.pyiron_base import (
+    _get_memory,
+    _get_unique_objects,
+    load_workflow_json,
+    write_workflow_json,
+)
 
 
 def get_prod_and_div(x, y):
@@ -17,10 +22,22 @@ def get_square(x):
     return x ** 2
 
 
+def get_sum_of_list(x):
+    return sum(x)
+
+
 def echo(filename):
     return filename
 
 
+class Label:
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return "Label()"
+
+
 class TestPyironBase(unittest.TestCase):
     def test_pyiron_base(self):
         workflow_json_filename = "pyiron_arithmetic.json"
@@ -37,6 +54,143 @@ class TestPyironBase(unittest.TestCase):
         self.assertTrue(os.path.exists(workflow_json_filename))
         self.assertEqual(delayed_object_lst[-1].pull(), 6.25)
 
+    def test_pyiron_base_resources(self):
+        workflow_json_filename = "pyiron_resources.json"
+        get_sum_job_wrapper = job(get_sum)
+        get_square_job_wrapper = job(get_square)
+        tmp_sum = get_sum_job_wrapper(x=1, y=2)
+        tmp_sum.server.cores = 2
+        tmp_sum.server.run_time = 60
+        tmp_sum.server.memory_limit = "1GB"
+        result = get_square_job_wrapper(x=tmp_sum)
+        write_workflow_json(delayed_object=result, file_name=workflow_json_filename)
+
+        with open(workflow_json_filename) as f:
+            saved = json.load(f)
+        resources_dict = {
+            n["value"]: n.get("resources")
+            for n in saved["nodes"]
+            if n["type"] == "function"
+        }
+        self.assertEqual(
+            resources_dict,
+            {
+                "test_pyiron_base.get_sum": {"cores": 2, "memory": 1024, "walltime": 60},
+                "test_pyiron_base.get_square": None,
+            },
+        )
+
+        delayed_object_lst = load_workflow_json(file_name=workflow_json_filename)
+        self.assertEqual(delayed_object_lst[0].server.cores, 2)
+        self.assertEqual(delayed_object_lst[0].server.run_time, 60)
+        self.assertEqual(delayed_object_lst[0].server.memory_limit, "1024MB")
+        self.assertEqual(delayed_object_lst[-1].server.cores, 1)
+
+    def test_pyiron_base_memory(self):
+        get_square_job_wrapper = job(get_square)
+        result = get_square_job_wrapper(x=2)
+        result.server.memory_limit = 2048
+        write_workflow_json(delayed_object=result, file_name="pyiron_memory.json")
+        with open("pyiron_memory.json") as f:
+            saved = json.load(f)
+        self.assertEqual(
+            [n.get("resources") for n in saved["nodes"] if n["type"] == "function"],
+            [{"memory": 2048}],
+        )
+        self.assertEqual(_get_memory(memory_limit="1.5GB"), 1536)
+        self.assertEqual(_get_memory(memory_limit="512"), 512)
+        with self.assertRaises(ValueError):
+            _get_memory(memory_limit="2TB")
+
+    def test_pyiron_base_resources_explicit_default(self):
+        workflow_json_filename = "pyiron_resources_default.json"
+        with open(workflow_json_filename, "w") as f:
+            json.dump(
+                {
+                    "version": "0.1.0",
+                    "nodes": [
+                        {
+                            "id": 0,
+                            "type": "function",
+                            "value": "test_pyiron_base.get_square",
+                            "resources": {"cores": 1, "threads": 1, "gpus": 2},
+                        },
+                        {"id": 1, "type": "input", "value": 2, "name": "x"},
+                        {"id": 2, "type": "output", "name": "result"},
+                    ],
+                    "edges": [
+                        {"target": 0, "targetPort": "x", "source": 1, "sourcePort": None},
+                        {"target": 2, "targetPort": None, "source": 0, "sourcePort": None},
+                    ],
+                },
+                f,
+            )
+        delayed_object_lst = load_workflow_json(file_name=workflow_json_filename)
+        self.assertEqual(delayed_object_lst[-1].server.gpus, 2)
+        write_workflow_json(
+            delayed_object=delayed_object_lst[-1], file_name=workflow_json_filename
+        )
+        with open(workflow_json_filename) as f:
+            saved = json.load(f)
+        self.assertEqual(
+            [n.get("resources") for n in saved["nodes"] if n["type"] == "function"],
+            [{"cores": 1, "threads": 1, "gpus": 2}],
+        )
+
+    def test_pyiron_base_inline_containers(self):
+        workflow_json_filename = "pyiron_containers.json"
+        get_prod_and_div_job_wrapper = job(get_prod_and_div, output_key_lst=["prod", "div"])
+        get_sum_of_list_job_wrapper = job(get_sum_of_list)
+        prod_and_div = get_prod_and_div_job_wrapper(x=1, y=2)
+        result = get_sum_of_list_job_wrapper(
+            x=[prod_and_div.output.prod, prod_and_div.output.div]
+        )
+        write_workflow_json(delayed_object=result, file_name=workflow_json_filename)
+
+        delayed_object_lst = load_workflow_json(file_name=workflow_json_filename)
+        self.assertEqual(len(delayed_object_lst), 3)
+        delayed_object_lst = load_workflow_json(
+            file_name=workflow_json_filename, inline_containers=True
+        )
+        self.assertEqual(len(delayed_object_lst), 2)
+        self.assertEqual(delayed_object_lst[-1].pull(), 2.5)
+
+    def test_pyiron_base_unique_objects(self):
+        workflow_json_filename = "pyiron_unique.json"
+        get_sum_job_wrapper = job(get_sum)
+        sum_a = get_sum_job_wrapper(x=1, y=2)
+        sum_b = get_sum_job_wrapper(x=2, y=1)
+        sum_c = get_sum_job_wrapper(x=1, y=2)
+        result = get_sum_job_wrapper(
+            x=get_sum_job_wrapper(x=sum_a, y=sum_b),
+            y=get_sum_job_wrapper(x=sum_a, y=sum_c),
+        )
+        write_workflow_json(delayed_object=result, file_name=workflow_json_filename)
+
+        with open(workflow_json_filename) as f:
+            saved = json.load(f)
+        self.assertEqual(
+            len([n for n in saved["nodes"] if n["type"] == "function"]), 5
+        )
+        delayed_object_lst = load_workflow_json(file_name=workflow_json_filename)
+        self.assertEqual(delayed_object_lst[-1].pull(), 12)
+
+    def test_pyiron_base_unique_objects_repr(self):
+        # objects with the same repr() are different values
+        echo_job_wrapper = job(echo)
+        first, second = Label(value=1), Label(value=2)
+        nodes_dict = {
+            0: echo_job_wrapper(filename=first),
+            1: echo_job_wrapper(filename=second),
+            2: first,
+            3: second,
+            4: "image.png",
+            5: "image.png",
+        }
+        delayed_object_updated_dict, match_dict = _get_unique_objects(nodes_dict=nodes_dict)
+        self.assertEqual(match_dict, {5: 4})
+        self.assertEqual(sorted(delayed_object_updated_dict), [0, 1, 2, 3, 4])
+
     def test_pyiron_base_filename_input(self):
         """A filename string like 'image.png' must be passed through as a plain
         string input, not interpreted as a Python module path or a float."""
@@ -3,7 +3,15 @@ import os
 import sys
 import unittest
 from pyiron_workflow._legacy import Workflow, to_function_node
-from python_workflow_definition.pyiron_workflow import load_workflow_json, write_workflow_json
+import numpy as np
+from python_workflow_definition.pyiron_workflow import (
+    extend_nodes_dict,
+    generate_get_dict_function,
+    generate_get_list_function,
+    get_container_function,
+    load_workflow_json,
+    write_workflow_json,
+)
 
 function_str = """
 def get_prod_and_div(x, y):
@@ -37,6 +45,28 @@ filename_workflow_str = """
   ]
 }"""
 
+container_workflow_str = """
+{
+  "version": "0.1.0",
+  "nodes": [
+    {"id": 0, "type": "function", "value": "python_workflow_definition.shared.get_list"},
+    {"id": 1, "type": "function", "value": "python_workflow_definition.shared.get_dict"},
+    {"id": 2, "type": "function", "value": "python_workflow_definition.shared.get_dict"},
+    {"id": 3, "type": "input", "value": 1, "name": "a"},
+    {"id": 4, "type": "input", "value": 2, "name": "b"},
+    {"id": 5, "type": "output", "name": "result"}
+  ],
+  "edges": [
+    {"target": 0, "targetPort": "0", "source": 3, "sourcePort": null},
+    {"target": 0, "targetPort": "1", "source": 4, "sourcePort": null},
+    {"target": 1, "targetPort": "x", "source": 0, "sourcePort": null},
+    {"target": 1, "targetPort": "y", "source": 4, "sourcePort": null},
+    {"target": 2, "targetPort": "x", "source": 3, "sourcePort": null},
+    {"target": 2, "targetPort": "y", "source": 4, "sourcePort": null},
+    {"target": 5, "targetPort": null, "source": 1, "sourcePort": null}
+  ]
+}"""
+
 
 class TestPyironWorkflow(unittest.TestCase):
     def test_pyiron_workflow(self):
@@ -117,3 +147,46 @@ class TestPyironWorkflow(unittest.TestCase):
         wf2 = load_workflow_json(file_name=workflow_json_filename)
         wf2.run()
         self.assertTrue(os.path.exists(workflow_json_filename))
+
+    def test_pyiron_workflow_container_nodes(self):
+        workflow_json_filename = "pyiron_workflow_container.json"
+        with open(workflow_json_filename, "w") as f:
+            f.write(container_workflow_str)
+
+        wf = load_workflow_json(file_name=workflow_json_filename)
+        self.assertEqual(
+            wf.run(),
+            {
+                "get_dict_0__get_dict_0": {"x": [1, 2], "y": 2},
+                "get_dict_1__get_dict_1": {"x": 1, "y": 2},
+            },
+        )
+        self.assertIs(
+            get_container_function(function_name="get_dict", port_tuple=("x", "y")),
+            get_container_function(function_name="get_dict", port_tuple=("x", "y")),
+        )
+        self.assertEqual(
+            get_container_function(function_name="get_list", port_tuple=("s_0", "s_1"))(
+                s_0=1, s_1=2
+            ),
+            [1, 2],
+        )
+        with self.assertRaises(ValueError):
+            get_container_function(function_name="get_set", port_tuple=())
+        self.assertIs(
+            generate_get_dict_function(args_of_lst=["x", "y"]),
+            get_container_function(function_name="get_dict", port_tuple=("x", "y")),
+        )
+        self.assertEqual(generate_get_list_function(args_of_lst=["a", "b"])(a=1, b=2), [1, 2])
+
+    def test_extend_nodes_dict(self):
+        nodes_dict = {0: np.sum}
+        nodes_links_dict = extend_nodes_dict(
+            nodes_dict=nodes_dict,
+            input_dict={
+                "a": {"a.x": np.array([1, 2]), "a.y": 1},
+                "b": {"b.x": np.array([1, 2]), "b.y": 1.0},
+            },
+        )
+        self.assertEqual({"a.x": 1, "a.y": 2, "b.x": 1, "b.y": 3}, nodes_links_dict)
+        self.assertEqual(4, len(nodes_dict))
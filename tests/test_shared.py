@@ -1,4 +1,7 @@
+import os
+import tempfile
 import unittest
+import numpy as np
 from python_workflow_definition.shared import (
     get_dict,
     get_list,
@@ -8,6 +11,22 @@ from python_workflow_definition.shared import (
     update_node_names,
     set_result_node,
     remove_result,
+    get_ready_sets,
+    topological_sort,
+    get_container_nodes,
+    inline_container_nodes,
+    resolve_link,
+    WorkflowGraph,
+    EdgeTable,
+    get_end_nodes,
+    get_value_hash,
+    get_value_key,
+    intern_value,
+    get_function,
+    import_modules,
+    get_input_value,
+    load_arrays,
+    ARRAY_LABEL,
     EDGES_LABEL,
     NODES_LABEL,
     SOURCE_LABEL,
@@ -17,6 +36,10 @@ from python_workflow_definition.shared import (
 )
 
 
+def get_sum(x, y):
+    return x + y
+
+
 class TestShared(unittest.TestCase):
     def test_get_dict(self):
         self.assertEqual({"a": 1, "b": 2, "c": 3}, get_dict(a=1, b=2, c=3))
@@ -101,6 +124,17 @@ class TestShared(unittest.TestCase):
         self.assertEqual("b", workflow_dict[NODES_LABEL][1]["name"])
         self.assertEqual("a_1", workflow_dict[NODES_LABEL][2]["name"])
 
+    def test_update_node_names_first_target_port(self):
+        workflow_dict = {
+            NODES_LABEL: [{"id": 0, "type": "input", "name": ""}],
+            EDGES_LABEL: [
+                {SOURCE_LABEL: 0, TARGET_PORT_LABEL: "b"},
+                {SOURCE_LABEL: 0, TARGET_PORT_LABEL: "a"},
+            ],
+        }
+        update_node_names(workflow_dict)
+        self.assertEqual("b", workflow_dict[NODES_LABEL][0]["name"])
+
     def test_set_result_node(self):
         workflow_dict = {
             NODES_LABEL: [{"id": 0, "type": "input"}],
@@ -154,3 +188,238 @@ class TestShared(unittest.TestCase):
         }
         with self.assertRaises(IndexError):
             remove_result(workflow_dict)
+
+    def test_get_ready_sets(self):
+        total_dict = {
+            2: {"x": {SOURCE_LABEL: 1, SOURCE_PORT_LABEL: None}},
+            1: {
+                "x": {SOURCE_LABEL: 0, SOURCE_PORT_LABEL: "prod"},
+                "y": {SOURCE_LABEL: 0, SOURCE_PORT_LABEL: "div"},
+            },
+            0: {
+                "x": {SOURCE_LABEL: 3, SOURCE_PORT_LABEL: None},
+                "y": {SOURCE_LABEL: 4, SOURCE_PORT_LABEL: None},
+            },
+            5: {"x": {SOURCE_LABEL: 3, SOURCE_PORT_LABEL: None}},
+        }
+        nodes_dict = dict.fromkeys(range(6))
+        self.assertEqual([[0, 5], [1], [2]], get_ready_sets(total_dict, nodes_dict))
+        self.assertEqual([0, 5, 1, 2], topological_sort(total_dict, nodes_dict))
+
+    def test_get_ready_sets_empty(self):
+        self.assertEqual([], get_ready_sets({}, {}))
+
+    def test_get_ready_sets_cycle(self):
+        total_dict = {
+            0: {"x": {SOURCE_LABEL: 1, SOURCE_PORT_LABEL: None}},
+            1: {"x": {SOURCE_LABEL: 0, SOURCE_PORT_LABEL: None}},
+            2: {"x": {SOURCE_LABEL: 3, SOURCE_PORT_LABEL: None}},
+        }
+        with self.assertRaisesRegex(ValueError, r"cycle between the nodes \[0, 1\]"):
+            topological_sort(total_dict, dict.fromkeys(range(4)))
+
+    def test_get_ready_sets_cycle_downstream(self):
+        # nodes 3 and 5 only depend on the cycles, so they are not reported
+        total_dict = {
+            0: {"x": {SOURCE_LABEL: 2, SOURCE_PORT_LABEL: None}},
+            1: {"x": {SOURCE_LABEL: 0, SOURCE_PORT_LABEL: None}},
+            2: {"x": {SOURCE_LABEL: 1, SOURCE_PORT_LABEL: None}},
+            3: {"x": {SOURCE_LABEL: 2, SOURCE_PORT_LABEL: None}},
+            4: {"x": {SOURCE_LABEL: 4, SOURCE_PORT_LABEL: None}},
+            5: {
+                "x": {SOURCE_LABEL: 3, SOURCE_PORT_LABEL: None},
+                "y": {SOURCE_LABEL: 4, SOURCE_PORT_LABEL: None},
+            },
+        }
+        with self.assertRaisesRegex(ValueError, r"cycle between the nodes \[0, 1, 2, 4\]"):
+            get_ready_sets(total_dict, dict.fromkeys(range(6)))
+
+    def test_get_ready_sets_unknown_source(self):
+        total_dict = {0: {"x": {SOURCE_LABEL: 7, SOURCE_PORT_LABEL: None}}}
+        with self.assertRaisesRegex(ValueError, "node 7"):
+            topological_sort(total_dict, {0: None})
+
+    def test_inline_container_nodes(self):
+        nodes_list = [
+            {"id": 0, "type": "function", "value": "workflow.get_sum"},
+            {"id": 1, "type": "function", "value": "python_workflow_definition.shared.get_list"},
+            {"id": 2, "type": "function", "value": "python_workflow_definition.shared.get_dict"},
+            {"id": 3, "type": "input", "value": 1, "name": "x"},
+        ]
+        container_dict = get_container_nodes(nodes_list)
+        self.assertEqual({1: get_list, 2: get_dict}, container_dict)
+        total_dict = {
+            0: {"x": {SOURCE_LABEL: 1, SOURCE_PORT_LABEL: None}},
+            1: {
+                "0": {SOURCE_LABEL: 3, SOURCE_PORT_LABEL: None},
+                "1": {SOURCE_LABEL: 2, SOURCE_PORT_LABEL: None},
+            },
+            2: {"a": {SOURCE_LABEL: 3, SOURCE_PORT_LABEL: None}},
+        }
+        inline_dict = inline_container_nodes(total_dict, container_dict)
+        self.assertEqual([0], list(inline_dict.keys()))
+        self.assertEqual([[0]], get_ready_sets(inline_dict, dict.fromkeys(range(4))))
+        self.assertEqual(
+            [1, {"a": 1}],
+            resolve_link(inline_dict[0]["x"], lambda link: link[SOURCE_LABEL] - 2),
+        )
+
+    def test_inline_container_nodes_source_port(self):
+        container_dict = {1: get_dict}
+        total_dict = {
+            0: {"x": {SOURCE_LABEL: 1, SOURCE_PORT_LABEL: "a"}},
+            1: {"a": {SOURCE_LABEL: 2, SOURCE_PORT_LABEL: None}},
+        }
+        self.assertEqual(total_dict, inline_container_nodes(total_dict, container_dict))
+
+    def test_workflow_graph(self):
+        edges_lst = [
+            {TARGET_LABEL: 0, TARGET_PORT_LABEL: "x", SOURCE_LABEL: 3, SOURCE_PORT_LABEL: None},
+            {TARGET_LABEL: 0, TARGET_PORT_LABEL: "y", SOURCE_LABEL: 4, SOURCE_PORT_LABEL: None},
+            {TARGET_LABEL: 1, TARGET_PORT_LABEL: "x", SOURCE_LABEL: 0, SOURCE_PORT_LABEL: "prod"},
+            {TARGET_LABEL: 1, TARGET_PORT_LABEL: "y", SOURCE_LABEL: 0, SOURCE_PORT_LABEL: "div"},
+            {TARGET_LABEL: 2, TARGET_PORT_LABEL: "x", SOURCE_LABEL: 1, SOURCE_PORT_LABEL: None},
+            {TARGET_LABEL: 2, TARGET_PORT_LABEL: "y", SOURCE_LABEL: 3, SOURCE_PORT_LABEL: None},
+        ]
+        nodes_lst = [{"id": i, "type": "function", "value": "a.b"} for i in [4, 2, 1, 0, 3]]
+        graph = WorkflowGraph({NODES_LABEL: nodes_lst, EDGES_LABEL: edges_lst})
+        self.assertEqual([0, 1, 2, 3, 4], graph.node_ids)
+        self.assertEqual(nodes_lst[0], graph.get_node(4))
+        self.assertEqual(edges_lst[2:4], graph.get_in_edges(1))
+        self.assertEqual([edges_lst[0], edges_lst[5]], graph.get_out_edges(3))
+        self.assertEqual([0], graph.get_predecessors(1))
+        self.assertEqual([0, 2], graph.get_successors(3))
+        self.assertEqual(["x", "y"], graph.get_target_ports(2))
+        self.assertEqual(["prod", "div"], graph.get_source_ports(0))
+        self.assertEqual([], graph.get_in_edges(3))
+        self.assertEqual(
+            {k: get_kwargs([e for e in edges_lst if e[TARGET_LABEL] == k]) for k in [0, 1, 2]},
+            graph.get_total_dict(),
+        )
+        self.assertEqual(get_source_handles(edges_lst), graph.get_source_handles())
+
+    def test_workflow_graph_unknown_node(self):
+        edges_lst = [{TARGET_LABEL: 0, TARGET_PORT_LABEL: "x", SOURCE_LABEL: 7, SOURCE_PORT_LABEL: None}]
+        with self.assertRaisesRegex(ValueError, "node 7"):
+            WorkflowGraph({NODES_LABEL: [{"id": 0}], EDGES_LABEL: edges_lst})
+
+    def test_edge_table(self):
+        edges_lst = [
+            {TARGET_LABEL: 0, TARGET_PORT_LABEL: "x", SOURCE_LABEL: 3, SOURCE_PORT_LABEL: None},
+            {TARGET_LABEL: 0, TARGET_PORT_LABEL: "y", SOURCE_LABEL: 4, SOURCE_PORT_LABEL: None},
+            {TARGET_LABEL: 1, TARGET_PORT_LABEL: "x", SOURCE_LABEL: 0, SOURCE_PORT_LABEL: "prod"},
+            {TARGET_LABEL: 1, TARGET_PORT_LABEL: "y", SOURCE_LABEL: 0, SOURCE_PORT_LABEL: "div"},
+            {TARGET_LABEL: 2, TARGET_PORT_LABEL: "x", SOURCE_LABEL: 1, SOURCE_PORT_LABEL: None},
+            {TARGET_LABEL: 2, TARGET_PORT_LABEL: "y", SOURCE_LABEL: 3, SOURCE_PORT_LABEL: None},
+        ]
+        edge_table = EdgeTable.from_edges(edges_lst)
+        self.assertEqual(6, len(edge_table))
+        self.assertEqual(6 * 16, edge_table.nbytes)
+        self.assertEqual(edges_lst, edge_table.to_edges())
+        self.assertEqual(edges_lst[2], edge_table[2])
+        self.assertEqual([3, 4, 0, 0, 1, 3], edge_table.source_arr.tolist())
+        self.assertEqual(get_source_handles(edges_lst), get_source_handles(edge_table))
+        self.assertEqual({}, get_source_handles(EdgeTable.from_edges([])))
+        nodes_lst = [{"id": i} for i in range(5)]
+        self.assertEqual(
+            get_end_nodes({NODES_LABEL: nodes_lst, EDGES_LABEL: edges_lst}),
+            get_end_nodes({NODES_LABEL: nodes_lst, EDGES_LABEL: edge_table}),
+        )
+        workflow_dict = set_result_node({NODES_LABEL: nodes_lst, EDGES_LABEL: edge_table})
+        self.assertEqual(
+            {TARGET_LABEL: 5, TARGET_PORT_LABEL: None, SOURCE_LABEL: 2, SOURCE_PORT_LABEL: None},
+            workflow_dict[EDGES_LABEL][6],
+        )
+        with self.assertRaises(ValueError):
+            EdgeTable.from_edges([{TARGET_LABEL: 2**31, SOURCE_LABEL: 0}])
+
+    def test_workflow_graph_edge_table(self):
+        edges_lst = [
+            {TARGET_LABEL: 0, TARGET_PORT_LABEL: "x", SOURCE_LABEL: 2, SOURCE_PORT_LABEL: None},
+            {TARGET_LABEL: 0, TARGET_PORT_LABEL: "y", SOURCE_LABEL: 2, SOURCE_PORT_LABEL: None},
+            {TARGET_LABEL: 1, TARGET_PORT_LABEL: "x", SOURCE_LABEL: 0, SOURCE_PORT_LABEL: None},
+        ]
+        nodes_lst = [{"id": i} for i in [2, 0, 1]]
+        graph = WorkflowGraph({NODES_LABEL: nodes_lst, EDGES_LABEL: edges_lst})
+        table_graph = WorkflowGraph(
+            {NODES_LABEL: nodes_lst, EDGES_LABEL: EdgeTable.from_edges(edges_lst)}
+        )
+        self.assertEqual(graph.get_total_dict(), table_graph.get_total_dict())
+        self.assertEqual({2: [0, 1], 0: [None]}, table_graph.get_source_handles())
+        self.assertEqual(graph.get_source_handles(), table_graph.get_source_handles())
+        self.assertEqual(graph.get_out_edges(2), table_graph.get_out_edges(2))
+        with self.assertRaisesRegex(ValueError, "node 7"):
+            WorkflowGraph({NODES_LABEL: nodes_lst, EDGES_LABEL: EdgeTable.from_edges(edges_lst + [{TARGET_LABEL: 7, SOURCE_LABEL: 0}])})
+        with self.assertRaisesRegex(ValueError, "node 3"):
+            WorkflowGraph({NODES_LABEL: nodes_lst, EDGES_LABEL: EdgeTable.from_edges([{TARGET_LABEL: 3, SOURCE_LABEL: 0}])})
+
+    def test_intern_value(self):
+        nodes_dict, intern_dict = {0: get_sum}, {}
+        self.assertEqual(1, intern_value({"a": 1, "b": [2]}, nodes_dict, intern_dict))
+        self.assertEqual(1, intern_value({"b": [2], "a": 1}, nodes_dict, intern_dict))
+        self.assertEqual(2, intern_value(1, nodes_dict, intern_dict))
+        self.assertEqual(3, intern_value(1.0, nodes_dict, intern_dict))
+        self.assertEqual(4, intern_value(True, nodes_dict, intern_dict))
+        self.assertEqual(2, intern_value(1, nodes_dict, intern_dict))
+        self.assertEqual([get_sum, {"a": 1, "b": [2]}, 1, 1.0, True], list(nodes_dict.values()))
+
+    def test_get_value_key_numpy(self):
+        self.assertEqual(get_value_key([1, 2]), get_value_key(np.array([1, 2])))
+        self.assertEqual(get_value_key(2.5), get_value_key(np.float64(2.5)))
+
+    def test_get_value_key_type(self):
+        class Value:
+            def __repr__(self):
+                return "1"
+
+        self.assertNotEqual(get_value_key(Value()), get_value_key(1))
+        self.assertNotEqual(get_value_key(Value()), get_value_key("1"))
+        self.assertNotEqual(get_value_hash(0.0), get_value_hash(-0.0))
+        self.assertEqual(get_value_hash({"a": 1, "b": 2}), get_value_hash({"b": 2, "a": 1}))
+
+    def test_get_input_value_array(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, "workflow.json")
+            array = np.arange(12.0).reshape(3, 4)
+            self.assertEqual([1, 2], get_input_value(np.array([1, 2]), file_name, None))
+            self.assertEqual([1, 2], get_input_value(np.array([1, 2]), file_name, 1000))
+            self.assertEqual("a", get_input_value("a", file_name, 0))
+            reference = get_input_value(array, file_name, 64)
+            self.assertEqual(reference, get_input_value(array.copy(), file_name, 64))
+            self.assertNotEqual(reference, get_input_value(array.T, file_name, 64))
+            self.assertEqual([ARRAY_LABEL], list(reference.keys()))
+            self.assertTrue(os.path.exists(os.path.join(tmp_dir, reference[ARRAY_LABEL])))
+            value = load_arrays({"a": [reference, 1], "b": {"c": "d"}}, tmp_dir)
+            self.assertIsInstance(value["a"][0], np.memmap)
+            self.assertTrue(np.array_equal(array, value["a"][0]))
+            self.assertEqual({"c": "d"}, value["b"])
+            with self.assertRaises(ValueError):
+                load_arrays({ARRAY_LABEL: "../" + reference[ARRAY_LABEL]}, tmp_dir)
+
+    def test_get_function(self):
+        self.assertIs(get_function("python_workflow_definition.shared.get_dict"), get_dict)
+        self.assertIs(
+            get_function("python_workflow_definition.shared.WorkflowGraph.get_node"),
+            WorkflowGraph.get_node,
+        )
+        self.assertIs(get_function("os.path"), __import__("os").path)
+        with self.assertRaises(AttributeError):
+            get_function("python_workflow_definition.shared.does_not_exist")
+        with self.assertRaises(ModuleNotFoundError):
+            get_function("module_which_does_not_exist.get_sum")
+
+    def test_import_modules(self):
+        time_dict = import_modules(
+            nodes_list=[
+                {"id": 0, "type": "function", "value": "python_workflow_definition.shared.get_dict"},
+                {"id": 1, "type": "function", "value": "json.decoder.JSONDecoder"},
+                {"id": 2, "type": "function", "value": "module_which_does_not_exist.get_sum"},
+                {"id": 3, "type": "input", "value": "not.a.function", "name": "x"},
+            ]
+        )
+        self.assertEqual(
+            list(time_dict.keys()),
+            ["python_workflow_definition.shared", "json.decoder", "module_which_does_not_exist"],
+        )
+        self.assertEqual(time_dict["python_workflow_definition.shared"], 0.0)
+        self.assertEqual(time_dict["module_which_does_not_exist"], 0.0)
@@ -0,0 +1,11 @@
+
+def get_prod_and_div(x, y):
+    return {"prod": x * y, "div": x / y}
+
+
+def get_sum(x, y):
+    return x + y
+
+
+def get_square(x):
+    return x ** 2